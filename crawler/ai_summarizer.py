@@ -4,14 +4,12 @@ AI Summarizer - The Info Club v3.0
 Reddit 포스트를 분석하여 유튜버를 위한 상세 인사이트를 생성합니다.
 OpenAI REST API를 requests로 직접 호출 (Python 3.14 호환)
 """
-import os
 import requests
 from typing import Optional
-from dotenv import load_dotenv
+from settings import settings
+import resilience
 
-load_dotenv()
-
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_API_KEY = settings.openai_api_key
 
 SYSTEM_PROMPT = """당신은 상위 1% 유튜브 크리에이터 전문 수석 전략 애널리스트입니다.
 Reddit에서 수집된 최상위 유튜브 정책, 수익창출, 관련 글을 심층 분석하여,
@@ -47,6 +45,11 @@ def generate_insight(title: str, content: str, subreddit: str) -> Optional[str]:
         print("  [WARN] OPENAI_API_KEY not set, skipping AI insight.")
         return None
 
+    breaker = resilience.get_breaker("openai")
+    if not breaker.allow():
+        print("  [SKIP] OpenAI circuit open - saving without AI insight")
+        return None
+
     headers = {
         "Authorization": f"Bearer {OPENAI_API_KEY}",
         "Content-Type": "application/json"
@@ -70,8 +73,9 @@ def generate_insight(title: str, content: str, subreddit: str) -> Optional[str]:
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=payload,
-            timeout=15          # 응답 시간 여유 확보 (5 -> 15초)
+            timeout=resilience.timeout(15)  # 응답 시간 여유 확보 (5 -> 15초), 실행 마감이 더 가까우면 그만큼만
         )
+        breaker.record_status(resp.status_code)
         if resp.status_code == 200:
             insight = resp.json()["choices"][0]["message"]["content"].strip()
             print(f"  [OK] AI Insight generated successfully!")
@@ -80,9 +84,11 @@ def generate_insight(title: str, content: str, subreddit: str) -> Optional[str]:
             print(f"  [ERROR] AI Insight failed: {resp.status_code} - {resp.text[:100]}")
             return None
     except requests.exceptions.Timeout:
-        print("  [TIMEOUT] AI Insight timeout (15s) - skipping")
+        breaker.record_failure()
+        print("  [TIMEOUT] AI Insight timeout - skipping")
         return None
     except requests.exceptions.ConnectionError:
+        breaker.record_failure()
         print("  [CONN ERROR] AI Insight connection failed - skipping")
         return None
     except Exception as e:
@@ -0,0 +1,82 @@
+"""
+Import-time Benchmark - The Info Club v2.0
+각 스크립트를 새 프로세스에서 import할 때 걸리는 시간을 `python -X importtime`으로 측정합니다.
+cron으로 매번 새 프로세스가 뜨므로, 무거운 의존성이 다시 모듈 최상단으로 올라오면 여기서 바로 보입니다.
+
+사용법:
+    python bench_imports.py                  # 기본 대상 전체, 5회 중앙값
+    python bench_imports.py crawler -n 10    # 특정 모듈만
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+TARGETS = [
+    "crawler",
+    "test_crawler",
+    "youtube_trending",
+    "google_trends",
+    "trend_analyzer",
+    "weekly_report_generator",
+    "orchestrator",
+]
+
+CRAWLER_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def measure(module):
+    """
+    새 프로세스에서 module을 import하고 -X importtime 출력을 파싱합니다.
+
+    Returns:
+        (module 누적 μs, [(module이 직접 import한 모듈, 누적 μs)])
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=CRAWLER_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # importtime은 하위 import를 먼저(후위 순회), 깊이만큼 들여써서 출력합니다.
+    children = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue    # 헤더 줄
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == module:
+                return int(cumulative), children
+            children = []
+        elif depth == 1:
+            children.append((name.strip(), int(cumulative)))
+    raise RuntimeError(f"{module} import 기록을 찾지 못했습니다.")
+
+
+def run_benchmark(modules, repeat=5, top_n=5):
+    print(f"⏱️ import 시간 측정 ({repeat}회 중앙값, ms)")
+    print(f"{'모듈':<26}{'중앙값':>9}{'최소':>9}   가장 무거운 의존성")
+    for module in modules:
+        try:
+            runs = [measure(module) for _ in range(repeat)]
+        except RuntimeError as e:
+            print(f"{module:<26}  ❌ {e}")
+            continue
+
+        totals = [total for total, _ in runs]
+        heavy = sorted(runs[-1][1], key=lambda item: item[1], reverse=True)[:top_n]
+        heavy_text = ", ".join(f"{name} {us / 1000:.0f}" for name, us in heavy)
+        print(f"{module:<26}{statistics.median(totals) / 1000:>9.1f}{min(totals) / 1000:>9.1f}   {heavy_text}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="크롤러 스크립트 import 시간 측정")
+    parser.add_argument("modules", nargs="*", default=TARGETS)
+    parser.add_argument("-n", "--repeat", type=int, default=5)
+    args = parser.parse_args()
+    run_benchmark(args.modules, args.repeat)
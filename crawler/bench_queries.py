@@ -0,0 +1,294 @@
+"""
+Query Plan Benchmark - The Info Club v2.0
+로컬 Postgres에 운영과 비슷한 규모(수백만 행)의 데이터를 채우고,
+크롤러/분석 스크립트의 반복 조회를 sql/migrate_v8.sql 인덱스 적용 전/후로 EXPLAIN ANALYZE 합니다.
+
+psql 클라이언트만 있으면 되며 Python DB 드라이버는 필요 없습니다.
+대상 DB의 테이블을 지우고 다시 만드므로 반드시 벤치마크 전용 DB를 사용하세요.
+
+사용법:
+    createdb infoclub_bench
+    BENCH_DATABASE_URL=postgresql://localhost/infoclub_bench python bench_queries.py
+    python bench_queries.py --posts 5000000 --output bench_queries.json
+    python bench_queries.py --skip-seed        # 이미 채운 데이터로 다시 측정
+"""
+import os
+import re
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sql")
+INDEX_MIGRATION = os.path.join(SQL_DIR, "migrate_v8.sql")
+
+# 운영 스키마(schema.sql + migrate_v2/v3/v7)에서 조회에 쓰이는 컬럼만 옮긴 벤치마크용 테이블
+SCHEMA = """
+DROP TABLE IF EXISTS posts, youtube_trends, google_trends, youtube_video_snapshots, youtube_rising CASCADE;
+
+CREATE TABLE posts (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  title text NOT NULL,
+  content text,
+  subreddit text NOT NULL,
+  url text,
+  author text,
+  post_id text UNIQUE NOT NULL,
+  upvotes int DEFAULT 0,
+  comment_count int DEFAULT 0,
+  upvote_ratio real DEFAULT 1.0,
+  top_comments jsonb DEFAULT '[]'::jsonb,
+  ai_insight text,
+  created_at timestamptz DEFAULT now(),
+  crawled_at timestamptz DEFAULT now()
+);
+
+CREATE TABLE youtube_trends (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  video_id text UNIQUE NOT NULL,
+  title text,
+  channel_title text,
+  category text,
+  view_count bigint DEFAULT 0,
+  like_count bigint DEFAULT 0,
+  comment_count bigint DEFAULT 0,
+  region text DEFAULT 'KR',
+  thumbnail_url text,
+  trending_date date DEFAULT CURRENT_DATE,
+  crawled_at timestamptz DEFAULT now()
+);
+
+CREATE TABLE google_trends (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  keyword text NOT NULL,
+  region text DEFAULT 'south_korea',
+  traffic_volume text,
+  related_topics text,
+  trending_date date DEFAULT CURRENT_DATE,
+  crawled_at timestamptz DEFAULT now(),
+  UNIQUE(keyword, region, trending_date)
+);
+
+CREATE TABLE youtube_video_snapshots (
+  id bigserial PRIMARY KEY,
+  video_id text NOT NULL,
+  category text,
+  region text,
+  view_count bigint DEFAULT 0,
+  like_count bigint DEFAULT 0,
+  comment_count bigint DEFAULT 0,
+  captured_at timestamptz NOT NULL DEFAULT now()
+);
+CREATE INDEX youtube_video_snapshots_captured_at_idx ON youtube_video_snapshots (captured_at);
+
+CREATE TABLE youtube_rising (
+  video_id text PRIMARY KEY,
+  title text,
+  channel_title text,
+  category text,
+  region text,
+  view_count bigint DEFAULT 0,
+  views_per_hour real DEFAULT 0,
+  like_rate real DEFAULT 0,
+  acceleration real DEFAULT 0,
+  computed_at timestamptz DEFAULT now()
+);
+"""
+
+# 기록 기간 2년, 포스트는 고르게 분포 (오래된 기록이 쌓인 상태를 재현)
+SEED = """
+INSERT INTO posts (title, content, subreddit, url, author, post_id, upvotes, comment_count, upvote_ratio,
+                   top_comments, ai_insight, created_at, crawled_at)
+SELECT
+  'Post title ' || i,
+  repeat(md5(i::text), 20),
+  (ARRAY['NewTubers','YouTubers','PartneredYoutube','smallyoutubers','youtube'])[1 + i % 5],
+  'https://www.reddit.com/r/x/comments/' || i,
+  'user' || (i % 5000),
+  'p' || i,
+  (random() * 2000)::int,
+  (random() * 300)::int,
+  0.8 + random() * 0.2,
+  '[{{"author": "a", "ups": 10, "body": "comment"}}]'::jsonb,
+  repeat('insight ', 40),
+  now() - (random() * interval '730 days'),
+  now() - (i::float / {posts} * interval '730 days')
+FROM generate_series(1, {posts}) AS i;
+
+INSERT INTO youtube_trends (video_id, title, channel_title, category, view_count, like_count, comment_count,
+                            region, trending_date, crawled_at)
+SELECT
+  'v' || i,
+  'Video title ' || i,
+  'Channel ' || (i % 20000),
+  (ARRAY['Gaming','Music','Education','Entertainment','People & Blogs','Howto & Style'])[1 + i % 6],
+  (random() * 5e7)::bigint,
+  (random() * 1e6)::bigint,
+  (random() * 1e5)::bigint,
+  (ARRAY['KR','US'])[1 + i % 2],
+  current_date - (i::float / {youtube} * 730)::int,
+  now() - (i::float / {youtube} * interval '730 days')
+FROM generate_series(1, {youtube}) AS i;
+
+INSERT INTO google_trends (keyword, region, traffic_volume, related_topics, trending_date, crawled_at)
+SELECT
+  'keyword ' || (i % 1000),
+  (ARRAY['KR','US'])[1 + (i / 1000) % 2],
+  ((random() * 100)::int)::text,
+  'related ' || i,
+  current_date - (i / 2000),
+  now() - ((i / 2000) * interval '1 day') + ((i % 2000) * interval '1 second')
+FROM generate_series(1, {google}) AS i;
+
+INSERT INTO youtube_video_snapshots (video_id, category, region, view_count, like_count, comment_count, captured_at)
+SELECT
+  'v' || (i % 20000),
+  'Gaming',
+  'KR',
+  i * 10,
+  i,
+  i / 10,
+  now() - (i::float / {snapshots} * interval '365 days')
+FROM generate_series(1, {snapshots}) AS i;
+
+INSERT INTO youtube_rising (video_id, title, channel_title, category, region, view_count, views_per_hour, like_rate)
+SELECT 'v' || i, 'Video ' || i, 'Channel', 'Gaming', 'KR', i * 1000, random() * 1e5, random() * 0.1
+FROM generate_series(1, 100) AS i;
+
+VACUUM ANALYZE;
+"""
+
+# 각 스크립트가 PostgREST로 보내는 조회를 SQL로 옮긴 것
+QUERIES = {
+    "trend_analyzer: 최근 Reddit 포스트": """
+        SELECT title, subreddit, ai_insight FROM posts
+        WHERE crawled_at >= now() - interval '7 days'
+        ORDER BY crawled_at DESC LIMIT 50""",
+    "weekly_report: 첫 페이지": """
+        SELECT id, created_at, post_id, subreddit, title, left(content, 800), upvotes, upvote_ratio,
+               comment_count, top_comments, ai_insight FROM posts
+        WHERE created_at >= now() - interval '7 days'
+        ORDER BY created_at, id LIMIT 100""",
+    "weekly_report: 키셋 다음 페이지": """
+        SELECT id, created_at, post_id, subreddit, title, left(content, 800), upvotes, upvote_ratio,
+               comment_count, top_comments, ai_insight FROM posts
+        WHERE created_at >= now() - interval '7 days'
+          AND (created_at > now() - interval '3 days'
+               OR (created_at = now() - interval '3 days' AND id > '00000000-0000-0000-0000-000000000000'))
+        ORDER BY created_at, id LIMIT 100""",
+    "regen_insights: 최신 10개": """
+        SELECT id, post_id, title, content, subreddit FROM posts
+        ORDER BY created_at DESC LIMIT 10""",
+    "trend_analyzer: YouTube 인기 영상": """
+        SELECT title, channel_title, category, view_count, region FROM youtube_trends
+        WHERE trending_date >= current_date - 7
+        ORDER BY view_count DESC LIMIT 50""",
+    "trend_analyzer: Google 키워드": """
+        SELECT keyword, region, traffic_volume FROM google_trends
+        WHERE trending_date >= current_date - 7
+        ORDER BY crawled_at DESC LIMIT 50""",
+    "trend_analyzer: 급상승 영상": """
+        SELECT title, channel_title, category, region, views_per_hour, like_rate FROM youtube_rising
+        ORDER BY views_per_hour DESC LIMIT 20""",
+    "youtube_velocity: 48시간 스냅샷": """
+        SELECT video_id, category, region, view_count, like_count, captured_at FROM youtube_video_snapshots
+        WHERE captured_at >= now() - interval '48 hours'
+        ORDER BY id LIMIT 1000""",
+}
+
+
+def psql(database_url, sql):
+    """psql로 SQL을 실행하고 출력(tuples only)을 반환합니다."""
+    result = subprocess.run(
+        ["psql", database_url, "-X", "-q", "-A", "-t", "-v", "ON_ERROR_STOP=1"],
+        input=sql, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip())
+    return result.stdout
+
+
+def index_names():
+    with open(INDEX_MIGRATION, encoding="utf-8") as f:
+        return re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", f.read())
+
+
+def explain(database_url, sql, repeat):
+    """
+    EXPLAIN (ANALYZE, BUFFERS)를 repeat번 실행합니다 (첫 실행은 캐시 워밍업으로 버림).
+
+    Returns:
+        {"ms": 실행 시간 중앙값, "plan": 최상위 노드 요약, "buffers": 읽은 블록 수}
+    """
+    timings, plan = [], None
+    for _ in range(repeat + 1):
+        output = psql(database_url, f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}")
+        plan = json.loads(output)[0]
+        timings.append(plan["Execution Time"])
+
+    def describe(node):
+        label = node["Node Type"]
+        if "Index Name" in node:
+            label += f" [{node['Index Name']}]"
+        children = [describe(child) for child in node.get("Plans", [])]
+        return label + (f" ← {' + '.join(children)}" if children else "")
+
+    root = plan["Plan"]
+    return {
+        "ms": round(statistics.median(timings[1:]), 3),
+        "plan": describe(root),
+        "buffers": root.get("Shared Hit Blocks", 0) + root.get("Shared Read Blocks", 0),
+    }
+
+
+def measure_all(database_url, repeat):
+    return {name: explain(database_url, sql, repeat) for name, sql in QUERIES.items()}
+
+
+def run_benchmark(database_url, sizes, repeat=5, skip_seed=False, output=None):
+    if not skip_seed:
+        print(f"🌱 데이터 생성: posts {sizes['posts']:,} / youtube_trends {sizes['youtube']:,} / "
+              f"google_trends {sizes['google']:,} / snapshots {sizes['snapshots']:,}")
+        psql(database_url, SCHEMA)
+        psql(database_url, SEED.format(**sizes))
+
+    print("📉 인덱스 적용 전 측정...")
+    psql(database_url, "".join(f"DROP INDEX IF EXISTS {name};\n" for name in index_names()) + "ANALYZE;")
+    before = measure_all(database_url, repeat)
+
+    print("📈 migrate_v8.sql 적용 후 측정...")
+    with open(INDEX_MIGRATION, encoding="utf-8") as f:
+        psql(database_url, f.read())
+    after = measure_all(database_url, repeat)
+
+    print(f"\n{'조회':<36}{'전(ms)':>10}{'후(ms)':>10}{'배율':>8}")
+    for name in QUERIES:
+        b, a = before[name]["ms"], after[name]["ms"]
+        print(f"{name:<36}{b:>10.2f}{a:>10.2f}{b / a if a else 0:>7.0f}x")
+        print(f"    전: {before[name]['plan']} ({before[name]['buffers']} blocks)")
+        print(f"    후: {after[name]['plan']} ({after[name]['buffers']} blocks)")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"sizes": sizes, "before": before, "after": after}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="migrate_v8 인덱스 전/후 EXPLAIN ANALYZE 비교")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--posts", type=int, default=2_000_000)
+    parser.add_argument("--youtube", type=int, default=1_000_000)
+    parser.add_argument("--google", type=int, default=1_000_000)
+    parser.add_argument("--snapshots", type=int, default=2_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        sys.exit("BENCH_DATABASE_URL 또는 --database-url로 벤치마크 전용 DB를 지정하세요.")
+
+    sizes = {"posts": args.posts, "youtube": args.youtube, "google": args.google, "snapshots": args.snapshots}
+    run_benchmark(args.database_url, sizes, args.repeat, args.skip_seed, args.output)
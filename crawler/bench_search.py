@@ -0,0 +1,162 @@
+"""
+Search Benchmark - The Info Club v2.0
+로컬 Postgres에 영어/한국어가 섞인 포스트를 채우고, 전문 검색을 sql/migrate_v14.sql(tsvector + GIN) 적용 전/후로 비교합니다.
+- 전: 인덱스 없이 제목/원문/인사이트/번역을 ILIKE로 훑는 조회 (업보트 순 상위 20개)
+- 후: GIN 인덱스 조회 + ts_rank_cd 순위, 그리고 search_posts RPC 전체 (발췌 포함)
+
+bench_queries.py와 마찬가지로 psql 클라이언트만 필요하며, 대상 DB의 테이블을 지우고 다시 만듭니다.
+
+사용법:
+    BENCH_DATABASE_URL=postgresql://localhost/infoclub_bench python bench_search.py
+    python bench_search.py --posts 2000000 --output bench_search.json
+    python bench_search.py --skip-seed        # 이미 채운 데이터로 다시 측정
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+from bench_queries import SCHEMA, SQL_DIR, psql, explain
+
+SEARCH_MIGRATION = os.path.join(SQL_DIR, "migrate_v14.sql")
+
+# migrate_v10.sql 이후 컬럼
+SCHEMA_EXTRA = """
+ALTER TABLE posts ADD COLUMN content_original text;
+ALTER TABLE posts ADD COLUMN content_ko text;
+ALTER TABLE posts ADD COLUMN preview text;
+"""
+
+# 크리에이터 커뮤니티 어휘를 앞쪽일수록 자주 뽑고(편중 분포), 30%는 희귀 단어(w0~w49999)로 채워
+# 실제 글처럼 흔한 단어와 드문 단어가 섞이게 합니다.
+SEED = """
+CREATE OR REPLACE FUNCTION bench_words(vocab text[], n integer) RETURNS text
+LANGUAGE sql VOLATILE AS $$
+    SELECT string_agg(
+        CASE WHEN random() < 0.7
+             THEN vocab[1 + floor(power(random(), 2) * array_length(vocab, 1))::int]
+             ELSE 'w' || floor(power(random(), 2) * 50000)::int END,
+        ' ')
+    FROM generate_series(1, n)
+$$;
+
+INSERT INTO posts (title, content_original, content_ko, ai_insight, subreddit, url, author, post_id,
+                   upvotes, comment_count, created_at, crawled_at)
+SELECT
+  bench_words(v.ko, 8 + i % 5),
+  bench_words(v.en, 40 + i % 120),
+  bench_words(v.ko, 30 + i % 80),
+  CASE WHEN i % 3 = 0 THEN bench_words(v.ko, 40) END,
+  (ARRAY['NewTubers','YouTubers','PartneredYoutube','smallyoutubers','youtube'])[1 + i % 5],
+  'https://www.reddit.com/r/x/comments/' || i,
+  'user' || (i % 5000),
+  'p' || i,
+  (random() * 2000)::int,
+  (random() * 300)::int,
+  now() - (random() * interval '730 days'),
+  now() - (i::float / {posts} * interval '730 days')
+FROM generate_series(1, {posts}) AS i,
+     (SELECT
+        ARRAY['the','my','channel','video','views','youtube','subscribers','shorts','upload','help',
+              'growth','thumbnail','algorithm','title','content','watch','time','audience','retention','editing',
+              'niche','monetization','monetized','revenue','rpm','cpm','drop','dropped','adsense','sponsor',
+              'analytics','ctr','impressions','partner','program','copyright','strike','claim','camera','microphone',
+              'gaming','vlog','tutorial','collab','comments','community','live','stream','seo','tags',
+              'trending','viral','burnout','schedule','consistency','feedback','longform','hook','intro','brand'] AS en,
+        ARRAY['유튜브','채널','영상','조회수가','조회수','구독자','쇼츠','업로드','성장','썸네일',
+              '알고리즘이','알고리즘','제목','시청','시간','시청자','편집','주제','수익화','수익화가',
+              '수익화를','수익이','광고','떨어졌다','줄었다','협찬','분석','노출','클릭률','파트너',
+              '저작권','경고','게임','브이로그','강의','댓글','커뮤니티','라이브','트렌드','꾸준히'] AS ko
+     ) AS v;
+
+UPDATE posts SET preview = left(content_ko, 300);
+VACUUM ANALYZE posts;
+"""
+
+# 검색어별 조회: 단어가 모두 들어간 포스트 (검색 대상 컬럼 어디든)
+SEARCHES = ["rpm drop", "shorts monetization", "copyright strike claim", "쇼츠 수익화", "조회수 떨어졌다", "w12345"]
+
+DOCUMENT = "concat_ws(' ', title, ai_insight, content_original, content_ko)"
+
+
+def ilike_sql(query):
+    conditions = " AND ".join(f"{DOCUMENT} ILIKE '%{word}%'" for word in query.split())
+    return f"""
+        SELECT id, title, upvotes FROM posts
+        WHERE {conditions}
+        ORDER BY upvotes DESC LIMIT 20"""
+
+
+def gin_sql(query):
+    return f"""
+        SELECT id, ts_rank_cd(search_tsv, q) AS score
+        FROM posts, public.post_search_query('{query}') AS q
+        WHERE search_tsv @@ q
+        ORDER BY score DESC, upvotes DESC, created_at DESC LIMIT 20"""
+
+
+def rpc_sql(query):
+    return f"SELECT * FROM public.search_posts('{query}', 20)"
+
+
+def count_matches(database_url, query):
+    output = psql(database_url, f"SELECT count(*) FROM posts WHERE search_tsv @@ public.post_search_query('{query}')")
+    return int(output.strip())
+
+
+def run_benchmark(database_url, posts, repeat=5, skip_seed=False, output=None):
+    if not skip_seed:
+        print(f"🌱 데이터 생성: posts {posts:,}")
+        psql(database_url, SCHEMA + SCHEMA_EXTRA)
+        psql(database_url, SEED.format(posts=posts))
+
+    print("📉 migrate_v14 적용 전 (ILIKE 전체 스캔) 측정...")
+    psql(database_url, "DROP FUNCTION IF EXISTS public.search_posts(text, integer, text);\n"
+                       "DROP INDEX IF EXISTS posts_search_tsv_idx;\n"
+                       "ALTER TABLE posts DROP COLUMN IF EXISTS search_tsv;")
+    before = {query: explain(database_url, ilike_sql(query), repeat) for query in SEARCHES}
+
+    print("📈 migrate_v14.sql 적용...")
+    started = time.perf_counter()
+    with open(SEARCH_MIGRATION, encoding="utf-8") as f:
+        psql(database_url, f.read() + "\nANALYZE posts;")
+    migration_seconds = round(time.perf_counter() - started, 1)
+    index_size = psql(database_url, "SELECT pg_size_pretty(pg_relation_size('posts_search_tsv_idx'))").strip()
+    print(f"  ⏱️ 생성 컬럼 + GIN 인덱스 {migration_seconds}초, 인덱스 크기 {index_size}")
+
+    after = {}
+    for query in SEARCHES:
+        after[query] = {
+            "gin": explain(database_url, gin_sql(query), repeat),
+            "rpc": explain(database_url, rpc_sql(query), repeat),
+            "matches": count_matches(database_url, query),
+        }
+
+    print(f"\n{'검색어':<26}{'일치':>10}{'ILIKE(ms)':>12}{'GIN(ms)':>10}{'RPC(ms)':>10}{'배율':>8}")
+    for query in SEARCHES:
+        b, g, r = before[query]["ms"], after[query]["gin"]["ms"], after[query]["rpc"]["ms"]
+        print(f"{query:<26}{after[query]['matches']:>10,}{b:>12.2f}{g:>10.2f}{r:>10.2f}{b / r if r else 0:>7.0f}x")
+        print(f"    전: {before[query]['plan']} ({before[query]['buffers']} blocks)")
+        print(f"    후: {after[query]['gin']['plan']} ({after[query]['gin']['buffers']} blocks)")
+
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump({"posts": posts, "migration_seconds": migration_seconds, "index_size": index_size,
+                       "before": before, "after": after}, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 결과 저장: {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="migrate_v14 전문 검색 전/후 EXPLAIN ANALYZE 비교")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    parser.add_argument("--posts", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--skip-seed", action="store_true")
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        sys.exit("BENCH_DATABASE_URL 또는 --database-url로 벤치마크 전용 DB를 지정하세요.")
+
+    run_benchmark(args.database_url, args.posts, args.repeat, args.skip_seed, args.output)
@@ -0,0 +1,47 @@
+"""
+pytest 공용 fixture - The Info Club v2.0
+fake_postgrest.py 서버를 테스트마다 새로 띄우고, 그 주소를 쓰는 SupabaseClient를 공유 클라이언트로 등록합니다.
+clock은 resilience/job_lease에 넣는 가짜 monotonic 시계입니다.
+"""
+import pytest
+
+import resilience
+import supabase_client
+from fake_postgrest import FakePostgREST
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def reset_breakers():
+    """서킷 브레이커는 프로세스 전역이므로 테스트 사이에 상태가 넘어가지 않게 비웁니다."""
+    resilience._breakers.clear()
+    yield
+    resilience._breakers.clear()
+
+
+@pytest.fixture
+def fake():
+    with FakePostgREST() as server:
+        yield server
+
+
+@pytest.fixture
+def client(fake, monkeypatch):
+    client = supabase_client.SupabaseClient(url=fake.url, key="fake-key", retries=0)
+    monkeypatch.setattr(supabase_client, "_client", client)
+    return client
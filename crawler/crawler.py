@@ -1,19 +1,12 @@
 import os
 import time
-import requests
-import xml.etree.ElementTree as ET
-from dotenv import load_dotenv
 from datetime import datetime
 import re
-from deep_translator import GoogleTranslator
-from ai_summarizer import generate_insight
+import resilience
+from job_lease import exclusive, lease_lost
 
-# Load environment variables
-load_dotenv()
-
-# Supabase Configuration
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# requests, deep_translator, ai_summarizer, supabase_client는 실제 수집 경로에서만 import합니다.
+# (validate_post 같은 필터만 쓰는 스크립트의 시작 시간을 줄이기 위해)
 
 # Target Subreddits (RSS URLs)
 TARGET_SUBREDDITS = [
@@ -30,6 +23,20 @@ MIN_CONTENT_LENGTH = 500  # 🚀 (UPGRADED) 400 -> 500: 더욱 긴 전문 분석
 MIN_CHAR_DIVERSITY = 0.15 
 SPAM_KEYWORDS = ["check out my", "new video", "sub4sub", "watch my", "please subscribe", "channel review", "my first video"]
 
+# 피드 카드 미리보기 길이 (posts.preview)
+PREVIEW_LENGTH = 300
+
+# 글자 중 한글 비율이 이 값 이상이면 이미 한국어로 보고 번역하지 않음
+KOREAN_RATIO_THRESHOLD = 0.3
+
+# 한 번의 실행이 넘지 않을 시간 (초). 다음 실행 전에 반드시 끝나도록 주기보다 짧게 잡습니다.
+RUN_BUDGET_SECONDS = int(os.getenv("CRAWLER_RUN_BUDGET_SECONDS", "3000"))
+# 마감 전 로컬 버퍼 플러시에 남겨 둘 시간 (초)
+FLUSH_RESERVE_SECONDS = 60
+# 외부 호출 타임아웃 (초, 남은 실행 시간보다 길어지지 않음)
+REDDIT_TIMEOUT = 15
+TRANSLATE_TIMEOUT = 10
+
 # 🚀 (신규) 뻔한/초보적인 질문성 글 필터링용 블랙리스트
 QUESTION_BLACKLIST = [
     "help me", "why is my", "how do i", "is it normal", "anyone else",
@@ -58,14 +65,6 @@ YOUTUBE_RELEVANT_KEYWORDS = [
     "analytics", "metrics", "growth", "strategy", "tips", "guide"
 ]
 
-def get_supabase_headers():
-    return {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates"
-    }
-
 import html
 
 def clean_html(raw_html):
@@ -121,43 +120,122 @@ def get_text(element, tag, ns):
     if found is not None and found.text: return found.text
     return ""
 
+def make_preview(text, length=PREVIEW_LENGTH):
+    """피드 카드용 미리보기 (목록 조회는 본문 대신 이 값만 가져감)"""
+    text = " ".join(text.split())
+    return text if len(text) <= length else text[:length].rstrip() + "…"
+
+def is_korean(text):
+    """
+    외부 호출 없이 한국어 여부를 판단합니다 (문자/숫자 중 한글 음절·자모 비율).
+    번역 전에 호출해 이미 한국어인 제목/본문을 번역기에 보내지 않습니다.
+    """
+    letters = [ch for ch in text or "" if ch.isalnum()]
+    if not letters:
+        return False
+    hangul = sum(1 for ch in letters if "\uac00" <= ch <= "\ud7a3" or "\u3131" <= ch <= "\u318e")
+    return hangul / len(letters) >= KOREAN_RATIO_THRESHOLD
+
+def fetch_stored_posts(supabase, post_ids):
+    """이미 저장된 포스트의 제목/미리보기 (post_id → 행). 다시 수집된 글은 제목을 다시 번역하지 않습니다."""
+    if not post_ids:
+        return {}
+    from supabase_client import quote_value
+    rows = supabase.select("posts", {
+        "select": "post_id,title,preview",
+        "post_id": f"in.({','.join(quote_value(pid) for pid in post_ids)})",
+    })
+    return {row["post_id"]: row for row in rows}
+
 def translate_text(text):
-    """Translate text to Korean"""
+    """
+    Translate text to Korean.
+    번역기가 실패하거나 느리면(서킷 브레이커 열림 포함) None을 반환하고, 호출부는 원문으로 저장합니다.
+    """
     if not text:
         return ""
+    breaker = resilience.get_breaker("translator")
+    if not breaker.allow():
+        return None
     try:
+        from deep_translator import GoogleTranslator
         # Translate title or short content
         # deep-translator handles limits internally usually, but best to keep short or chunk
         translator = GoogleTranslator(source='auto', target='ko')
-        return translator.translate(text[:4500]) # Limit to 4500 to be safe
+        # deep_translator에는 타임아웃 옵션이 없어 별도 스레드에서 기다림
+        translated = resilience.call_with_timeout(
+            translator.translate, resilience.timeout(TRANSLATE_TIMEOUT), text[:4500]  # Limit to 4500 to be safe
+        )
     except Exception as e:
+        breaker.record_failure()
         print(f"  Translation Failed: {e}")
-        return text
-
+        return None
+    breaker.record_success()
+    return translated
+
+def reddit_get(url, headers):
+    """Reddit GET (서킷 브레이커 + 실행 마감 시간에 맞춘 타임아웃). 브레이커가 열려 있으면 None"""
+    import requests
+    breaker = resilience.get_breaker("reddit")
+    if not breaker.allow():
+        return None
+    try:
+        response = requests.get(url, headers=headers, timeout=resilience.timeout(REDDIT_TIMEOUT))
+    except requests.RequestException:
+        breaker.record_failure()
+        raise
+    breaker.record_status(response.status_code)
+    return response
+
+@exclusive("reddit")
+@resilience.budgeted(RUN_BUDGET_SECONDS, "crawler")
 def run_crawler():
     print(f"[{datetime.now()}] Starting JSON API crawler cycle...")
-    
-    if not SUPABASE_URL or not SUPABASE_KEY:
+
+    from ai_summarizer import generate_insight
+    from supabase_client import get_client, refresh_trend_views
+    from write_buffer import get_buffer
+
+    supabase = get_client()
+    if not supabase.configured:
         print("Error: Missing Supabase environment variables.")
         return
 
+    # 지난 실행에서 Supabase 장애로 남은 행부터 재전송
+    buffer = get_buffer()
+    if buffer.pending():
+        print(f"  🚚 로컬 버퍼에 남은 {buffer.pending()}개 행 재전송...")
+        buffer.flush()
+
     for subreddit in TARGET_SUBREDDITS:
         for json_suffix in ["top.json?t=month&limit=100", "hot.json?limit=100"]:
+            if resilience.out_of_time(FLUSH_RESERVE_SECONDS) or lease_lost():
+                break
             json_url = f"https://www.reddit.com/r/{subreddit}/{json_suffix}"
             print(f"Fetching JSON: {json_url}")
             
             try:
                 headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 YoutuSchool/2.0'}
-                response = requests.get(json_url, headers=headers)
-                
+                response = reddit_get(json_url, headers)
+
+                if response is None:
+                    print(f"  ⏭️ Reddit circuit open, skipping {subreddit}")
+                    continue
                 if response.status_code != 200:
                     print(f"  Failed to fetch JSON for {subreddit}: {response.status_code}")
                     continue
 
                 data = response.json()
                 posts = data.get('data', {}).get('children', [])
+                stored = fetch_stored_posts(supabase, [p.get('data', {}).get('id') for p in posts if p.get('data', {}).get('id')])
                 
                 for post in posts:
+                    if resilience.out_of_time(FLUSH_RESERVE_SECONDS):
+                        print("  ⏰ Run budget almost spent, stopping collection to flush.")
+                        break
+                    if lease_lost():
+                        print("  ⛔ Job lease lost, stopping collection to flush.")
+                        break
                     post_info = post.get('data', {})
                     title = post_info.get('title', '')
                     content_raw = post_info.get('selftext', '')
@@ -187,8 +265,8 @@ def run_crawler():
                     if comment_count > 0:
                         comments_url = f"https://www.reddit.com{permalink}.json?limit=5&depth=1"
                         try:
-                            c_resp = requests.get(comments_url, headers=headers)
-                            if c_resp.status_code == 200:
+                            c_resp = reddit_get(comments_url, headers)
+                            if c_resp is not None and c_resp.status_code == 200:
                                 c_data = c_resp.json()
                                 if len(c_data) > 1:
                                     c_children = c_data[1].get('data', {}).get('children', [])
@@ -205,9 +283,16 @@ def run_crawler():
                             print(f"  Failed to fetch comments for {post_id}: {ce}")
                         time.sleep(0.5) # API rate limit protection
 
-                    # Translate title and content
-                    translated_title = translate_text(title)
-                    translated_content = translate_text(cleaned_content)
+                    # 제목만 번역 (이미 한국어이거나 저장된 번역이 있으면 건너뜀, 번역기 장애 시 원문 제목).
+                    # 본문(content_ko)은 translate_bodies.py가 나중에 번역하므로 여기서는 보내지 않습니다.
+                    existing = stored.get(post_id)
+                    if existing and is_korean(existing.get('title')):
+                        translated_title = existing['title']
+                    elif is_korean(title):
+                        translated_title = title
+                    else:
+                        translated_title = translate_text(title) or title
+                    preview = (existing or {}).get('preview') or make_preview(cleaned_content)
 
                     # Generate AI Insight
                     print(f"  🤖 Generating AI Insight for: {title[:50]}...")
@@ -222,7 +307,8 @@ def run_crawler():
                         "post_id": post_id,
                         "subreddit": subreddit,
                         "title": translated_title,
-                        "content": f"### 🇰🇷 요약\n{translated_content}\n\n---\n### 🇺🇸 원문\n{cleaned_content}",
+                        "content_original": cleaned_content,
+                        "preview": preview,
                         "url": link,
                         "author": author,
                         "upvotes": upvotes,
@@ -236,12 +322,9 @@ def run_crawler():
                     if ai_insight:
                         post_data["ai_insight"] = ai_insight
 
-                    # Insert into Supabase
-                    endpoint = f"{SUPABASE_URL}/rest/v1/posts?on_conflict=post_id"
-                    upsert_response = requests.post(endpoint, json=post_data, headers=get_supabase_headers())
-
-                    if upsert_response.status_code not in range(200, 300):
-                        print(f"  Failed to save: {upsert_response.status_code} - {upsert_response.text}")
+                    # 로컬 버퍼에 먼저 기록 (Supabase 장애 시에도 번역/인사이트 보존), 쌓이면 일괄 upsert
+                    buffer.put("posts", post_data, on_conflict="post_id")
+                    buffer.flush_if_needed()
                     
                     time.sleep(1) # API limit safety
                     
@@ -249,7 +332,12 @@ def run_crawler():
                 print(f"Error processing {subreddit} - {json_suffix}: {e}")
                 import traceback
                 traceback.print_exc()
-            
+
+    saved = buffer.flush()
+    print(f"  💾 Supabase 반영 {saved}개" + (f", 로컬 버퍼 대기 {buffer.pending()}개" if buffer.pending() else ""))
+    if saved:
+        # 새 포스트/AI 인사이트를 서브레딧 활동량 집계에 반영
+        refresh_trend_views(["subreddit_activity"])
     print("Crawler cycle finished.")
 
 if __name__ == "__main__":
@@ -257,7 +345,11 @@ if __name__ == "__main__":
     
     if len(sys.argv) > 1 and sys.argv[1] == "--once":
         print("🚀 Running crawler once (GitHub Actions Mode)...")
-        run_crawler()
+        if "--profile" in sys.argv:
+            from profiler import profile_call
+            profile_call(run_crawler, "crawler")
+        else:
+            run_crawler()
         print("✅ Crawler cycle completed.")
     else:
         print("🚀 RSS Crawler initialized (Korean Translation Enabled 🇰🇷).")
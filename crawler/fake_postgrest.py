@@ -0,0 +1,852 @@
+"""
+Fake PostgREST - The Info Club v2.0
+로컬/통합 테스트와 부하 테스트용으로 우리가 쓰는 PostgREST 기능만 SQLite로 흉내 내는 HTTP 서버입니다.
+SUPABASE_URL을 이 서버 주소로 바꾸면 모든 모듈이 실제 코드 경로 그대로 오프라인에서 동작합니다.
+
+지원 범위:
+- POST: 단건/일괄 INSERT, on_conflict + Prefer: resolution=merge-duplicates / ignore-duplicates upsert
+- GET: select 프로젝션(별칭 a:b, 계산 컬럼 content_head), eq/neq/gt/gte/lt/lte/like/ilike/in/is 필터,
+       not. 접두사, or/and 논리식, order, limit, offset
+- 리소스 임베딩: posts?select=id,comments(author,ups)&comments.order=ups.desc&comments.limit=3
+- PATCH / DELETE: 같은 필터 문법
+- RPC: POST /rest/v1/rpc/<함수> — sql/ 마이그레이션의 함수들을 Python으로 옮긴 RPC_FUNCTIONS
+       (작업 임대, 참여 지표/댓글 워터마크/번역 일괄 갱신, 본문 백필, 집계 뷰, 검색). 없는 함수는 404
+- Prefer: return=representation / return=minimal
+- posts/weekly_reports.updated_at: 쓰기마다 현재 시각으로 갱신 (touch_updated_at 트리거)
+- 지연(latency_ms)과 오류 주입(error_rate, 503 응답)
+
+테이블은 스키마 없이 첫 INSERT 때 만들어지고, 새 컬럼은 필요할 때 추가됩니다.
+id가 없는 행에는 자동 증가 정수 id가 부여됩니다.
+
+사용법:
+    python fake_postgrest.py --port 54321                 # 서버 실행 후 SUPABASE_URL=http://127.0.0.1:54321
+    python fake_postgrest.py --latency-ms 20 --error-rate 0.05
+    python fake_postgrest.py --bench 100000               # 실제 supabase_client 경로로 부하 테스트
+"""
+import os
+import re
+import sys
+import json
+import inspect
+import time
+import random
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qsl
+
+# PostgREST 계산 컬럼 흉내 (sql/migrate_v6.sql, migrate_v10.sql): 이름 → (SQL 식, 참조하는 컬럼)
+COMPUTED_COLUMNS = {
+    "content_head": ('substr(coalesce("content_original", "content"), 1, 800)', ("content_original", "content")),
+}
+
+# PostgREST 리소스 임베딩 흉내 (외래 키): (부모 테이블, 자식 테이블) → (부모 컬럼, 자식 컬럼)
+EMBEDDED_RESOURCES = {
+    ("posts", "comments"): ("id", "post_id"),
+}
+
+# touch_updated_at 트리거 흉내 (sql/migrate_v16.sql, migrate_v17.sql): INSERT/UPDATE마다 updated_at을 현재 시각으로
+TOUCHED_TABLES = ("posts", "weekly_reports")
+NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+OPERATORS = {"eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=", "like": "LIKE", "ilike": "LIKE"}
+
+IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+class PostgrestError(Exception):
+    def __init__(self, status, message, code="PGRST000"):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.code = code
+
+
+def quote_ident(name):
+    if not IDENTIFIER.match(name):
+        raise PostgrestError(400, f"invalid identifier: {name}", "PGRST100")
+    return f'"{name}"'
+
+
+def split_top_level(text):
+    """괄호/큰따옴표 밖의 쉼표 기준으로 나눕니다."""
+    parts, depth, quoted, current = [], 0, False, []
+    i = 0
+    while i < len(text):
+        ch = text[i]
+        if quoted:
+            current.append(ch)
+            if ch == "\\" and i + 1 < len(text):
+                current.append(text[i + 1])
+                i += 1
+            elif ch == '"':
+                quoted = False
+        elif ch == '"':
+            quoted = True
+            current.append(ch)
+        elif ch == "(":
+            depth += 1
+            current.append(ch)
+        elif ch == ")":
+            depth -= 1
+            current.append(ch)
+        elif ch == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(ch)
+        i += 1
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"').replace("\\\\", "\\")
+    return value
+
+
+def json_type(value):
+    """새 컬럼의 SQLite 선언 타입 (TEXT/INT/REAL 친화도를 살려 문자열 필터 값이 올바르게 비교되도록)"""
+    if isinstance(value, bool):
+        return "BOOL_INTEGER"
+    if isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    if isinstance(value, (dict, list)):
+        return "JSON_TEXT"
+    return "TEXT"
+
+
+class Store:
+    """SQLite 기반 테이블 저장소 (요청 하나 = 트랜잭션 하나)"""
+
+    def __init__(self, db_path=":memory:"):
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.lock = threading.Lock()
+        self.columns = {}   # table → {column: 선언 타입}
+        for (table,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"):
+            self._load_columns(table)
+
+    def _load_columns(self, table):
+        info = self.conn.execute(f"PRAGMA table_info({quote_ident(table)})").fetchall()
+        self.columns[table] = {row[1]: (row[2] or "").upper() for row in info}
+
+    def ensure_table(self, table):
+        if table not in self.columns:
+            self.conn.execute(f"CREATE TABLE {quote_ident(table)} (\"id\" INTEGER PRIMARY KEY AUTOINCREMENT)")
+            if table in TOUCHED_TABLES:
+                self.conn.execute(f"ALTER TABLE {quote_ident(table)} ADD COLUMN \"updated_at\" TEXT")
+                for event in ("INSERT", "UPDATE"):
+                    self.conn.execute(
+                        f"CREATE TRIGGER {quote_ident(f'{table}_touch_on_{event.lower()}')} AFTER {event} ON {quote_ident(table)} "
+                        f"BEGIN UPDATE {quote_ident(table)} SET \"updated_at\" = {NOW_SQL} WHERE \"id\" = NEW.\"id\"; END"
+                    )
+            self._load_columns(table)
+
+    def ensure_columns(self, table, samples):
+        """samples: {column: 예시 값}. 없는 컬럼을 추가합니다."""
+        existing = self.columns[table]
+        for column, value in samples.items():
+            if column not in existing and column not in COMPUTED_COLUMNS:
+                self.conn.execute(f"ALTER TABLE {quote_ident(table)} ADD COLUMN {quote_ident(column)} {json_type(value)}")
+                existing[column] = json_type(value)
+
+    # ---- 값 변환 ----
+
+    def encode(self, table, column, value):
+        if isinstance(value, (dict, list)):
+            return json.dumps(value, ensure_ascii=False)
+        if isinstance(value, bool):
+            return int(value)
+        return value
+
+    def decode_row(self, table, names, sources, row):
+        types = self.columns.get(table, {})
+        result = {}
+        for name, source, value in zip(names, sources, row):
+            declared = types.get(source, "")
+            if declared == "JSON_TEXT" and isinstance(value, str):
+                value = json.loads(value)
+            elif declared == "BOOL_INTEGER" and value is not None:
+                value = bool(value)
+            result[name] = value
+        return result
+
+    # ---- 필터 ----
+
+    def column_expr(self, table, column):
+        if column in COMPUTED_COLUMNS:
+            expression, sources = COMPUTED_COLUMNS[column]
+            self.ensure_columns(table, {source: None for source in sources if source not in self.columns[table]})
+            return expression
+        if column not in self.columns[table]:
+            self.ensure_columns(table, {column: None})
+        return quote_ident(column)
+
+    def condition(self, table, column, expression, args):
+        """column + 'op.value' (또는 'not.op.value') → SQL 조건"""
+        negate = False
+        if expression.startswith("not."):
+            negate, expression = True, expression[4:]
+        op, _, raw = expression.partition(".")
+        col = self.column_expr(table, column)
+
+        if op in OPERATORS:
+            value = unquote(raw)
+            if op in ("like", "ilike"):
+                value = value.replace("*", "%")
+            if op == "ilike":
+                sql = f"lower({col}) LIKE lower(?)"
+            else:
+                sql = f"{col} {OPERATORS[op]} ?"
+            args.append(value)
+        elif op == "in":
+            values = [unquote(v) for v in split_top_level(raw.strip()[1:-1])] if raw.strip("()") else []
+            if not values:
+                sql = "0"
+            else:
+                sql = f"{col} IN ({','.join('?' * len(values))})"
+                args.extend(values)
+        elif op == "is":
+            keyword = raw.lower()
+            if keyword == "null":
+                sql = f"{col} IS NULL"
+            elif keyword in ("true", "false"):
+                sql = f"{col} = {1 if keyword == 'true' else 0}"
+            else:
+                raise PostgrestError(400, f"invalid is value: {raw}", "PGRST100")
+        else:
+            raise PostgrestError(400, f"unsupported operator: {op}", "PGRST100")
+        return f"NOT ({sql})" if negate else sql
+
+    def logic_tree(self, table, kind, body, args):
+        """or=(a.eq.1,and(b.gt.2,c.lt.3)) 형식의 논리식"""
+        body = body.strip()
+        if not (body.startswith("(") and body.endswith(")")):
+            raise PostgrestError(400, f"invalid logic tree: {body}", "PGRST100")
+        clauses = []
+        for part in split_top_level(body[1:-1]):
+            part = part.strip()
+            match = re.match(r"^(not\.)?(and|or)(\(.*\))$", part, re.S)
+            if match:
+                clause = self.logic_tree(table, match.group(2), match.group(3), args)
+                clauses.append(f"NOT {clause}" if match.group(1) else clause)
+            else:
+                column, _, expression = part.partition(".")
+                clauses.append(self.condition(table, column, expression, args))
+        joiner = " OR " if kind == "or" else " AND "
+        return f"({joiner.join(clauses)})"
+
+    def where(self, table, params):
+        args, clauses = [], []
+        for key, value in params:
+            if key in RESERVED_PARAMS or self.embedded_param(table, key):
+                continue
+            if key in ("or", "and", "not.or", "not.and"):
+                clause = self.logic_tree(table, key.split(".")[-1], value, args)
+                clauses.append(f"NOT {clause}" if key.startswith("not.") else clause)
+            else:
+                clauses.append(self.condition(table, key, value, args))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", args
+
+    @staticmethod
+    def embedded_param(table, key):
+        """comments.order=... 처럼 임베딩된 자식 리소스에 대한 파라미터인지"""
+        prefix = key.split(".", 1)[0]
+        return "." in key and (table, prefix) in EMBEDDED_RESOURCES
+
+    def embed(self, table, rows, embeds, params):
+        """부모 행마다 자식 리소스를 조회해 붙입니다 (운영 PostgREST의 LATERAL 조인과 같은 결과)."""
+        for name, child, child_select in embeds:
+            parent_key, child_key = EMBEDDED_RESOURCES[(table, child)]
+            child_params = [(key.split(".", 1)[1], value) for key, value in params if key.startswith(f"{name}.")]
+            for row in rows:
+                if row.get(parent_key) is None:
+                    row[name] = []
+                    continue
+                row[name] = self.select(child, [("select", child_select), (child_key, f"eq.{row[parent_key]}")] + child_params)
+        return rows
+
+    # ---- 요청 처리 ----
+
+    def select(self, table, params):
+        if table not in self.columns:
+            return []
+        query = dict(params)
+        names, sources, exprs, embeds = [], [], [], []
+        for item in split_top_level(query.get("select", "*")):
+            item = item.strip()
+            embedded = re.match(r"^(?:([A-Za-z_][A-Za-z0-9_]*):)?([A-Za-z_][A-Za-z0-9_]*)\((.*)\)$", item, re.S)
+            if embedded:
+                alias, child, child_select = embedded.groups()
+                if (table, child) not in EMBEDDED_RESOURCES:
+                    raise PostgrestError(400, f"no relationship between {table} and {child}", "PGRST200")
+                embeds.append((alias or child, child, child_select or "*"))
+                continue
+            if item == "*":
+                for column in self.columns[table]:
+                    names.append(column)
+                    sources.append(column)
+                    exprs.append(quote_ident(column))
+                continue
+            alias, _, source = item.partition(":")
+            source = source or alias
+            names.append(alias)
+            sources.append(source)
+            exprs.append(self.column_expr(table, source))
+
+        # 임베딩할 자식 리소스를 찾을 부모 키 (선택하지 않았으면 응답에서 뺍니다)
+        hidden = []
+        for _, child, _ in embeds:
+            parent_key = EMBEDDED_RESOURCES[(table, child)][0]
+            if parent_key not in names:
+                names.append(parent_key)
+                sources.append(parent_key)
+                exprs.append(self.column_expr(table, parent_key))
+                hidden.append(parent_key)
+
+        sql = f"SELECT {', '.join(exprs)} FROM {quote_ident(table)}"
+        where, args = self.where(table, params)
+        sql += where
+
+        if "order" in query:
+            # 운영 DB처럼 정렬 컬럼 인덱스를 두어 키셋 페이지가 전체 스캔이 되지 않게 합니다.
+            order_columns = [term.split(".")[0] for term in query["order"].split(",")]
+            if all(c in self.columns[table] for c in order_columns):
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {quote_ident('ix_' + table + '_' + '_'.join(order_columns))} "
+                    f"ON {quote_ident(table)} ({', '.join(quote_ident(c) for c in order_columns)})"
+                )
+            terms = []
+            for term in query["order"].split(","):
+                column, *modifiers = term.split(".")
+                direction = "DESC" if "desc" in modifiers else "ASC"
+                nulls = " NULLS FIRST" if "nullsfirst" in modifiers else (" NULLS LAST" if "nullslast" in modifiers else "")
+                terms.append(f"{self.column_expr(table, column)} {direction}{nulls}")
+            sql += " ORDER BY " + ", ".join(terms)
+        if "limit" in query or "offset" in query:
+            sql += " LIMIT ? OFFSET ?"
+            args += [int(query.get("limit", -1)), int(query.get("offset", 0))]
+
+        rows = [self.decode_row(table, names, sources, row) for row in self.conn.execute(sql, args).fetchall()]
+        if embeds:
+            self.embed(table, rows, embeds, params)
+            for row in rows:
+                for key in hidden:
+                    row.pop(key, None)
+        return rows
+
+    def insert(self, table, rows, on_conflict=None, resolution=None):
+        self.ensure_table(table)
+        samples = {}
+        for row in rows:
+            for column, value in row.items():
+                if samples.get(column) is None:
+                    samples[column] = value
+        self.ensure_columns(table, samples)
+
+        columns = list(samples)
+        conflict_cols = [c.strip() for c in on_conflict.split(",")] if on_conflict else ["id"]
+
+        if resolution and on_conflict:
+            index_name = f"uq_{table}_{'_'.join(conflict_cols)}"
+            self.conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {quote_ident(index_name)} "
+                f"ON {quote_ident(table)} ({', '.join(quote_ident(c) for c in conflict_cols)})"
+            )
+
+        if resolution == "merge-duplicates":
+            keys = [tuple(row.get(c) for c in conflict_cols) for row in rows]
+            if len(set(keys)) != len(keys):
+                # Postgres와 동일하게 한 요청 안의 중복 키는 오류
+                raise PostgrestError(500, "ON CONFLICT DO UPDATE command cannot affect row a second time", "21000")
+
+        placeholders = ", ".join("?" * len(columns))
+        sql = f"INSERT INTO {quote_ident(table)} ({', '.join(quote_ident(c) for c in columns)}) VALUES ({placeholders})"
+        if resolution == "merge-duplicates":
+            updates = [c for c in columns if c not in conflict_cols]
+            conflict_target = ", ".join(quote_ident(c) for c in conflict_cols)
+            if updates:
+                sql += f" ON CONFLICT ({conflict_target}) DO UPDATE SET " + ", ".join(
+                    f"{quote_ident(c)} = excluded.{quote_ident(c)}" for c in updates
+                )
+            else:
+                sql += f" ON CONFLICT ({conflict_target}) DO NOTHING"
+        elif resolution == "ignore-duplicates":
+            sql += f" ON CONFLICT ({', '.join(quote_ident(c) for c in conflict_cols)}) DO NOTHING"
+
+        values = [[self.encode(table, c, row.get(c)) for c in columns] for row in rows]
+        try:
+            self.conn.executemany(sql, values)
+        except sqlite3.IntegrityError as e:
+            raise PostgrestError(409, str(e), "23505")
+
+    def update(self, table, values, params):
+        if table not in self.columns or not values:
+            return 0
+        self.ensure_columns(table, values)
+        where, args = self.where(table, params)
+        assignments = ", ".join(f"{quote_ident(c)} = ?" for c in values)
+        cursor = self.conn.execute(
+            f"UPDATE {quote_ident(table)} SET {assignments}{where}",
+            [self.encode(table, c, v) for c, v in values.items()] + args
+        )
+        return cursor.rowcount
+
+    def delete(self, table, params):
+        if table not in self.columns:
+            return 0
+        where, args = self.where(table, params)
+        return self.conn.execute(f"DELETE FROM {quote_ident(table)}{where}", args).rowcount
+
+    def transaction(self, func, *args):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                result = func(*args)
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                # 롤백된 CREATE/ALTER TABLE이 컬럼 캐시에 남지 않도록 다시 읽습니다.
+                self.columns = {}
+                for (table,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"):
+                    self._load_columns(table)
+                raise
+            self.conn.execute("COMMIT")
+            return result
+
+
+# ---- RPC 흉내 (sql/migrate_v9~v15.sql의 함수와 같은 인자/결과) ----
+# 시각은 UTC ISO 문자열로 저장하므로 문자열 비교가 시간 순서와 같습니다.
+
+def utc_now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def update_from_rows(store, table, key, rows, assignments):
+    """
+    UPDATE table SET ... FROM jsonb_to_recordset(rows) WHERE table.key = r.key 흉내.
+    assignments: {컬럼: SQLite 식} — 식에서 :필드 로 행 값을, :now 로 현재 시각을 참조합니다.
+    갱신된 행 수를 반환합니다.
+    """
+    if table not in store.columns or not rows:
+        return 0
+    fields = set(re.findall(r":([A-Za-z_][A-Za-z0-9_]*)", " ".join(assignments.values())))
+    # 새로 만들 컬럼의 타입은 식이 참조하는 행 값으로 정합니다 (정수 컬럼이 TEXT가 되지 않도록).
+    samples = {key: next((r.get(key) for r in rows if r.get(key) is not None), None)}
+    for column, expression in assignments.items():
+        referenced = re.findall(r":([A-Za-z_][A-Za-z0-9_]*)", expression)
+        samples[column] = next((r.get(referenced[0]) for r in rows if referenced and r.get(referenced[0]) is not None), None)
+    store.ensure_columns(table, samples)
+    sql = (f"UPDATE {quote_ident(table)} SET "
+           + ", ".join(f"{quote_ident(c)} = {expression}" for c, expression in assignments.items())
+           + f" WHERE {quote_ident(key)} = :{key}")
+    now = utc_now()
+    updated = 0
+    for row in rows:
+        values = {field: store.encode(table, field, row.get(field)) for field in fields | {key}}
+        values["now"] = now
+        updated += store.conn.execute(sql, values).rowcount
+    return updated
+
+
+def rpc_acquire_job_lease(store, p_job, p_holder, p_ttl_seconds):
+    store.ensure_table("job_leases")
+    now = datetime.now(timezone.utc)
+    expires = (now + timedelta(seconds=p_ttl_seconds)).isoformat()
+    rows = store.select("job_leases", [("select", "holder,expires_at"), ("job", f"eq.{p_job}")])
+    if not rows:
+        store.insert("job_leases", [{"job": p_job, "holder": p_holder, "acquired_at": now.isoformat(),
+                                     "heartbeat_at": now.isoformat(), "expires_at": expires}])
+        return True
+    lease = rows[0]
+    if lease["holder"] != p_holder and lease["expires_at"] >= now.isoformat():
+        return False
+    values = {"holder": p_holder, "heartbeat_at": now.isoformat(), "expires_at": expires}
+    if lease["holder"] != p_holder:
+        values["acquired_at"] = now.isoformat()
+    store.update("job_leases", values, [("job", f"eq.{p_job}")])
+    return True
+
+
+def rpc_renew_job_lease(store, p_job, p_holder, p_ttl_seconds):
+    now = datetime.now(timezone.utc)
+    return store.update("job_leases", {
+        "heartbeat_at": now.isoformat(),
+        "expires_at": (now + timedelta(seconds=p_ttl_seconds)).isoformat(),
+    }, [("job", f"eq.{p_job}"), ("holder", f"eq.{p_holder}")]) > 0
+
+
+def rpc_release_job_lease(store, p_job, p_holder):
+    return store.delete("job_leases", [("job", f"eq.{p_job}"), ("holder", f"eq.{p_holder}")]) > 0
+
+
+def rpc_update_post_engagement(store, p_rows):
+    return update_from_rows(store, "posts", "post_id", p_rows, {
+        "upvotes": 'coalesce(:upvotes, "upvotes")',
+        "comment_count": 'coalesce(:comment_count, "comment_count")',
+        "upvote_ratio": 'coalesce(:upvote_ratio, "upvote_ratio")',
+    })
+
+
+def rpc_mark_comments_synced(store, p_rows):
+    return update_from_rows(store, "posts", "post_id", p_rows, {
+        "comment_count": ":comments_synced_count",
+        "comments_synced_count": ":comments_synced_count",
+        "comments_synced_at": ":now",
+    })
+
+
+def rpc_store_post_translations(store, p_rows):
+    return update_from_rows(store, "posts", "post_id", [r for r in p_rows if r.get("content_ko") is not None], {
+        "content_ko": ":content_ko",
+        "preview": 'coalesce(:preview, "preview")',
+        "translation_requested_at": "NULL",
+    })
+
+
+def rpc_request_post_translation(store, p_id):
+    return store.update("posts", {"translation_requested_at": utc_now()}, [
+        ("id", f"eq.{p_id}"), ("content_ko", "is.null"), ("translation_requested_at", "is.null"),
+    ]) > 0
+
+
+def rpc_backfill_post_content(store, p_batch=1000):
+    ko_header, separator = "### 🇰🇷 요약\n", "\n\n---\n### 🇺🇸 원문\n"
+    rows = store.select("posts", [("select", "id,content"), ("content_original", "is.null"),
+                                  ("content", "not.is.null"), ("limit", str(p_batch))])
+    for row in rows:
+        content = row["content"]
+        original, ko = content, None
+        if content.startswith(ko_header) and separator in content:
+            head, _, original = content.partition(separator)
+            ko = head[len(ko_header):]
+        store.update("posts", {
+            "content_original": original,
+            "content_ko": ko,
+            "preview": (ko or original).strip()[:300],
+        }, [("id", f"eq.{row['id']}")])
+    return len(rows)
+
+
+TREND_VIEWS = ("youtube_category_top", "google_keyword_summary", "subreddit_activity")
+
+
+def rpc_refresh_trend_views(store, p_views=None):
+    # 머티리얼라이즈드 뷰가 없으므로 읽기 RPC가 원본 테이블에서 바로 계산합니다. 이름 검사만 같게 합니다.
+    for view in p_views or TREND_VIEWS:
+        if view not in TREND_VIEWS:
+            raise PostgrestError(400, f"unknown view: {view}", "P0001")
+    return list(p_views or TREND_VIEWS)
+
+
+def rpc_top_videos_by_category(store, p_region=None, p_category=None, p_limit=10):
+    if "youtube_trends" not in store.columns:
+        return []
+    since = (date.today() - timedelta(days=7)).isoformat()
+    rows = store.select("youtube_trends", [("select", "*"), ("trending_date", f"gte.{since}"),
+                                           ("order", "view_count.desc,video_id.asc")])
+    ranks, result = {}, []
+    for row in rows:
+        group = (row.get("category"), row.get("region"))
+        ranks[group] = ranks.get(group, 0) + 1
+        if ranks[group] > min(p_limit, 20):
+            continue
+        if (p_region is None or row.get("region") == p_region) and (p_category is None or row.get("category") == p_category):
+            result.append({**row, "rank": ranks[group]})
+    return result
+
+
+def rpc_keyword_direction_summary(store, p_region=None):
+    if "google_trends" not in store.columns:
+        return []
+    since = (date.today() - timedelta(days=7)).isoformat()
+    rows = store.select("google_trends", [("select", "*"), ("trending_date", f"gte.{since}"),
+                                          ("order", "trending_date.desc,crawled_at.desc")])
+    summary = {}
+    for row in rows:
+        direction = (row.get("traffic_volume") or "").split(" (", 1)[0]
+        key = (row.get("keyword"), row.get("region"))
+        if key not in summary:
+            summary[key] = {**row, "direction": direction, "days": set(), "days_rising": 0, "days_falling": 0}
+        entry = summary[key]
+        entry["days"].add(row.get("trending_date"))
+        entry["days_rising"] += direction in ("📈 급상승", "↗️ 상승")
+        entry["days_falling"] += direction == "📉 하락"
+    result = []
+    for entry in summary.values():
+        entry["days_seen"] = len(entry.pop("days"))
+        if p_region is None or entry.get("region") == p_region:
+            result.append(entry)
+    result.sort(key=lambda e: e.get("crawled_at") or "", reverse=True)
+    result.sort(key=lambda e: e["days_rising"], reverse=True)
+    return result
+
+
+# ts_rank_cd 기본 가중치 (A, B, C, D)와 같은 비율
+SEARCH_WEIGHTS = (("title", 1.0), ("ai_insight", 0.4), ("content_original", 0.2), ("content_ko", 0.1))
+
+
+def rpc_search_posts(store, p_query, p_limit=20, p_subreddit=None):
+    # 어간 추출 대신 부분 문자열 일치로 근사합니다 (모든 단어가 어딘가에 있어야 일치).
+    words = [w for w in re.split(r"[^0-9A-Za-z가-힣]+", (p_query or "").lower()) if w]
+    if not words or "posts" not in store.columns:
+        return []
+    params = [("select", "*")]
+    if p_subreddit:
+        params.append(("subreddit", f"eq.{p_subreddit}"))
+    hits = []
+    for row in store.select("posts", params):
+        fields = {column: (row.get(column) or "").lower() for column, _ in SEARCH_WEIGHTS}
+        if not row.get("content_original"):
+            fields["content_original"] = (row.get("content") or "").lower()
+        if not all(any(word in text for text in fields.values()) for word in words):
+            continue
+        score = sum(weight * fields[column].count(word) for column, weight in SEARCH_WEIGHTS for word in words)
+        source = row.get("ai_insight") or row.get("content_original") or row.get("content") or ""
+        headline = source[:200]
+        for word in words:
+            headline = re.sub(re.escape(word), lambda m: f"<<{m.group(0)}>>", headline, flags=re.I)
+        hits.append({
+            **{column: row.get(column) for column in ("id", "post_id", "title", "subreddit", "url", "author",
+                                                       "created_at", "upvotes", "comment_count", "ai_insight", "preview")},
+            "rank": score,
+            "headline": headline,
+        })
+    hits.sort(key=lambda h: h["created_at"] or "", reverse=True)
+    hits.sort(key=lambda h: (h["rank"], h["upvotes"] is not None, h["upvotes"] or 0), reverse=True)
+    return hits[:min(max(p_limit or 20, 1), 100)]
+
+
+RPC_FUNCTIONS = {
+    "acquire_job_lease": rpc_acquire_job_lease,
+    "renew_job_lease": rpc_renew_job_lease,
+    "release_job_lease": rpc_release_job_lease,
+    "update_post_engagement": rpc_update_post_engagement,
+    "mark_comments_synced": rpc_mark_comments_synced,
+    "store_post_translations": rpc_store_post_translations,
+    "request_post_translation": rpc_request_post_translation,
+    "backfill_post_content": rpc_backfill_post_content,
+    "refresh_trend_views": rpc_refresh_trend_views,
+    "top_videos_by_category": rpc_top_videos_by_category,
+    "keyword_direction_summary": rpc_keyword_direction_summary,
+    "search_posts": rpc_search_posts,
+}
+
+
+class FakePostgREST:
+    """
+    백그라운드 스레드에서 도는 가짜 PostgREST 서버.
+
+        with FakePostgREST(latency_ms=5) as fake:
+            os.environ["SUPABASE_URL"] = fake.url
+            ...
+    """
+
+    def __init__(self, db_path=":memory:", latency_ms=0, error_rate=0.0, seed=None):
+        self.store = Store(db_path)
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.server = None
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self, host="127.0.0.1", port=0):
+        self.server = ThreadingHTTPServer((host, port), make_handler(self))
+        self.server.daemon_threads = True
+        # stop()이 테스트마다 기본 0.5초씩 기다리지 않도록 짧게 폴링합니다.
+        self.thread = threading.Thread(target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        self.thread.start()
+        return self.url
+
+    def stop(self):
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, method, path, params, headers, body):
+        """(상태 코드, 응답 본문 또는 None)"""
+        self.requests += 1
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        if self.error_rate and self.random.random() < self.error_rate:
+            raise PostgrestError(503, "injected failure", "PGRST503")
+
+        match = re.match(r"^/rest/v1/rpc/([A-Za-z_][A-Za-z0-9_]*)$", path)
+        if match:
+            return self.call_rpc(method, match.group(1), body)
+
+        match = re.match(r"^/rest/v1/([A-Za-z_][A-Za-z0-9_]*)$", path)
+        if not match:
+            raise PostgrestError(404, f"unknown path: {path}", "PGRST125")
+        table = match.group(1)
+        prefer = {
+            key.strip(): value.strip()
+            for part in headers.get("Prefer", "").split(",") if "=" in part
+            for key, value in [part.split("=", 1)]
+        }
+        representation = prefer.get("return") == "representation"
+
+        if method == "GET":
+            return 200, self.store.transaction(self.store.select, table, params)
+
+        if method == "POST":
+            payload = json.loads(body or b"null")
+            rows = payload if isinstance(payload, list) else [payload]
+            if not rows:
+                return 201, [] if representation else None
+            on_conflict = dict(params).get("on_conflict")
+            resolution = prefer.get("resolution")
+            self.store.transaction(self.store.insert, table, rows, on_conflict, resolution)
+            return 201, rows if representation else None
+
+        if method == "PATCH":
+            values = json.loads(body or b"{}")
+            self.store.transaction(self.store.update, table, values, params)
+            return (200, []) if representation else (204, None)
+
+        if method == "DELETE":
+            self.store.transaction(self.store.delete, table, params)
+            return (200, []) if representation else (204, None)
+
+        raise PostgrestError(405, f"method not allowed: {method}", "PGRST117")
+
+    def call_rpc(self, method, name, body):
+        if method != "POST":
+            raise PostgrestError(405, f"method not allowed: {method}", "PGRST117")
+        function = RPC_FUNCTIONS.get(name)
+        if function is None:
+            raise PostgrestError(404, f"Could not find the function public.{name} in the schema cache", "PGRST202")
+        args = json.loads(body or b"{}")
+        try:
+            inspect.signature(function).bind(self.store, **args)
+        except TypeError:
+            raise PostgrestError(404, f"Could not find the function public.{name}({', '.join(args)}) in the schema cache", "PGRST202")
+        return 200, self.store.transaction(lambda: function(self.store, **args))
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _dispatch(self):
+            parts = urlsplit(self.path)
+            params = parse_qsl(parts.query, keep_blank_values=True)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            try:
+                status, payload = fake.handle(self.command, parts.path, params, self.headers, body)
+            except PostgrestError as e:
+                status, payload = e.status, {"code": e.code, "message": e.message, "details": None, "hint": None}
+            except (sqlite3.Error, ValueError) as e:
+                status, payload = 400, {"code": "PGRST100", "message": str(e), "details": None, "hint": None}
+
+            data = json.dumps(payload, ensure_ascii=False).encode("utf-8") if payload is not None else b""
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        do_GET = do_POST = do_PATCH = do_DELETE = _dispatch
+
+    return Handler
+
+
+def run_benchmark(rows, latency_ms=0, error_rate=0.0):
+    """실제 supabase_client / weekly_report_generator 경로로 대량 upsert + 페이지네이션을 측정합니다."""
+    from datetime import datetime, timedelta
+
+    with FakePostgREST(latency_ms=latency_ms, error_rate=error_rate, seed=42) as fake:
+        os.environ["SUPABASE_URL"] = fake.url
+        os.environ.setdefault("SUPABASE_KEY", "fake-key")
+        from supabase_client import SupabaseClient
+        import supabase_client
+        client = SupabaseClient(url=fake.url, key="fake-key")
+        supabase_client._client = client
+
+        now = datetime.utcnow()
+        posts = [
+            {
+                "post_id": f"p{i}",
+                "subreddit": "PartneredYoutube",
+                "title": f"Post {i}",
+                "content_original": "x" * 2000,
+                "upvotes": i % 500,
+                "upvote_ratio": 0.9,
+                "comment_count": i % 50,
+                "top_comments": [{"author": "a", "ups": 1, "body": "nice"}],
+                "created_at": (now - timedelta(seconds=i * 600_000 / rows)).isoformat(),
+            }
+            for i in range(rows)
+        ]
+
+        started = time.perf_counter()
+        saved, errors = client.upsert("posts", posts, on_conflict="post_id")
+        upsert_seconds = time.perf_counter() - started
+        print(f"📥 upsert: {saved}/{rows}행, 실패 {len(errors)}행, {upsert_seconds:.2f}초 ({saved / upsert_seconds:,.0f} rows/s)")
+
+        started = time.perf_counter()
+        saved, errors = client.upsert("posts", posts, on_conflict="post_id")
+        print(f"🔁 재-upsert (전부 충돌): {saved}/{rows}행, {time.perf_counter() - started:.2f}초")
+
+        started = time.perf_counter()
+        count = sum(1 for _ in client.iter_select("posts", "post_id,title", order=("created_at", "id"), page_size=1000))
+        select_seconds = time.perf_counter() - started
+        print(f"📤 키셋 페이지네이션: {count}행, {select_seconds:.2f}초 ({count / select_seconds:,.0f} rows/s)")
+
+        import weekly_report_generator
+        started = time.perf_counter()
+        text, post_count = weekly_report_generator.format_posts_for_prompt(
+            weekly_report_generator.iter_posts(now - timedelta(days=7))
+        )
+        print(f"📝 주간 리포트 로더: {post_count}개 포스트, 프롬프트 {len(text):,}자, {time.perf_counter() - started:.2f}초")
+        print(f"🌐 총 요청 수: {fake.requests}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Fake PostgREST (SQLite)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--db", default=":memory:", help="SQLite 파일 경로 (기본: 메모리)")
+    parser.add_argument("--latency-ms", type=float, default=float(os.getenv("FAKE_POSTGREST_LATENCY_MS", "0")))
+    parser.add_argument("--error-rate", type=float, default=float(os.getenv("FAKE_POSTGREST_ERROR_RATE", "0")))
+    parser.add_argument("--bench", type=int, metavar="ROWS", help="서버 대신 ROWS행 부하 테스트 실행")
+    args = parser.parse_args()
+
+    if args.bench:
+        run_benchmark(args.bench, args.latency_ms, args.error_rate)
+        sys.exit(0)
+
+    fake = FakePostgREST(args.db, args.latency_ms, args.error_rate)
+    fake.start(args.host, args.port)
+    print(f"🧪 Fake PostgREST 실행 중: SUPABASE_URL={fake.url}")
+    print(f"   지연 {args.latency_ms}ms, 오류율 {args.error_rate:.0%}, DB {args.db}")
+    try:
+        fake.thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -3,16 +3,35 @@ Google Trends Crawler - The Info Club v2.0
 pytrends를 사용하여 유튜버 관련 키워드의 검색 트렌드를 수집합니다.
 """
 import os
-import requests
 import json
-from dotenv import load_dotenv
+import hashlib
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import settings  # .env 로드 (TRENDS_CACHE_DIR 등)
+import resilience
+import job_lease
+from job_lease import exclusive
+from supabase_client import get_client, refresh_trend_views
 from datetime import datetime, date
 import time as time_module
 
-load_dotenv()
+# 수집 대상 지역 (트렌드 분석기의 해외 vs 한국 비교용)
+TARGET_GEOS = ["KR", "US"]
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+# pytrends 응답 디스크 캐시 (크롤러 주기와 같은 6시간 동안 재사용)
+CACHE_DIR = os.getenv("TRENDS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "google_trends"))
+CACHE_TTL_SECONDS = 21600
+
+# 모든 지역이 공유하는 Google 요청 간격 (초)
+MIN_REQUEST_INTERVAL = 2
+
+# pytrends 요청 타임아웃 (연결, 응답) 초. 응답 타임아웃은 실행 마감 시간보다 길어지지 않음
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 25
+
+# 한 번의 실행이 넘지 않을 시간 (초)
+RUN_BUDGET_SECONDS = int(os.getenv("TRENDS_RUN_BUDGET_SECONDS", "1800"))
 
 # 유튜버에게 중요한 시드 키워드 (카테고리별)
 SEED_KEYWORDS = {
@@ -23,86 +42,286 @@ SEED_KEYWORDS = {
 }
 
 
-def get_supabase_headers():
-    return {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates"
-    }
+class RateLimiter:
+    """여러 스레드가 함께 쓰는 최소 요청 간격 제한기"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def wait(self):
+        with self._lock:
+            now = time_module.monotonic()
+            if self._next_at > now:
+                time_module.sleep(self._next_at - now)
+            self._next_at = max(now, self._next_at) + self.interval
+
+
+rate_limiter = RateLimiter(MIN_REQUEST_INTERVAL)
+
+
+def cache_path(kind, keywords, geo, timeframe):
+    key = json.dumps([kind, list(keywords), geo, timeframe], ensure_ascii=False)
+    return os.path.join(CACHE_DIR, f"{kind}-{hashlib.sha1(key.encode('utf-8')).hexdigest()}.pkl")
+
+
+def cache_get(kind, keywords, geo, timeframe):
+    """TTL 안에 저장된 응답이 있으면 반환합니다 (없으면 None)."""
+    path = cache_path(kind, keywords, geo, timeframe)
+    try:
+        if time_module.time() - os.path.getmtime(path) > CACHE_TTL_SECONDS:
+            return None
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+
+
+def cache_put(kind, keywords, geo, timeframe, value):
+    path = cache_path(kind, keywords, geo, timeframe)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"    ⚠️ 캐시 저장 실패: {e}")
+
+
+class CachedTrendReq:
+    """
+    (keywords, geo, timeframe) 단위로 pytrends 응답을 디스크에 캐시하는 래퍼.
+    캐시 미스일 때만 payload를 만들고, 같은 payload로 이어지는 호출은 build_payload를 다시 하지 않습니다.
+    스레드마다 하나씩 만들어 쓰세요 (요청 간격은 rate_limiter로 전체 공유).
+    """
+
+    def __init__(self):
+        self._pytrends = None
+        self._payload = None
+
+    def interest_over_time(self, keywords, geo, timeframe='now 7-d'):
+        return self._fetch("interest_over_time", keywords, geo, timeframe)
+
+    def related_queries(self, keywords, geo, timeframe='now 7-d'):
+        return self._fetch("related_queries", keywords, geo, timeframe)
+
+    def _fetch(self, kind, keywords, geo, timeframe):
+        cached = cache_get(kind, keywords, geo, timeframe)
+        if cached is not None:
+            return cached
+
+        if resilience.out_of_time():
+            raise TimeoutError("run budget exhausted")
+        if job_lease.lease_lost():
+            raise RuntimeError("job lease lost")
+        breaker = resilience.get_breaker("pytrends")
+        breaker.check()
+        try:
+            payload = (tuple(keywords), geo, timeframe)
+            if self._payload != payload:
+                if self._pytrends is None:
+                    from pytrends.request import TrendReq
+                    self._pytrends = TrendReq(hl='ko', tz=540, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT))
+                self._pytrends.timeout = (CONNECT_TIMEOUT, resilience.timeout(READ_TIMEOUT))
+                rate_limiter.wait()
+                self._pytrends.build_payload(list(keywords), timeframe=timeframe, geo=geo)
+                self._payload = payload
+
+            self._pytrends.timeout = (CONNECT_TIMEOUT, resilience.timeout(READ_TIMEOUT))
+            rate_limiter.wait()
+            result = getattr(self._pytrends, kind)()
+        except Exception:
+            breaker.record_failure()
+            raise
+        breaker.record_success()
+        cache_put(kind, keywords, geo, timeframe, result)
+        return result
+
+
+# 모든 배치에 공통으로 넣는 기준 키워드. 배치마다 0~100으로 따로 스케일된 값을
+# 이 키워드의 평균 관심도를 기준으로 맞춰 카테고리 간 비교가 가능해집니다.
+#
+# Trends 값은 배치 최고치 = 100 기준 정수라, 앵커가 "유튜브"처럼 검색량이 가장 큰 키워드면
+# 같은 배치의 다른 키워드가 0~3 근처로 눌려 반올림 오차가 커지고, 앵커 비율로 다시 스케일할 때 그 오차가 그대로 커집니다.
+# 반대로 앵커가 너무 작으면 앵커 자신이 0~3이 되어 배율이 흔들립니다.
+# 그래서 카테고리마다 하나씩 고른 후보를 한 배치(probe)로 조회해 평균 관심도가 가운데인 키워드를 앵커로 씁니다.
+# probe가 실패하면 DEFAULT_ANCHOR_KEYWORD를 씁니다.
+ANCHOR_CANDIDATES = ["브이로그", "틱톡", "썸네일", "게임", "ASMR"]
+DEFAULT_ANCHOR_KEYWORD = "브이로그"
+ANCHOR_KEYWORD = DEFAULT_ANCHOR_KEYWORD
+
+# pytrends 한 번의 payload에 넣을 수 있는 최대 키워드 수
+MAX_PAYLOAD_KEYWORDS = 5
+
+
+def build_keyword_batches(seed_keywords, anchor=ANCHOR_KEYWORD):
+    """
+    시드 키워드를 (앵커 + 키워드 4개) 배치로 나눕니다.
+
+    Returns:
+        (batches, categories) - 배치 리스트와 키워드 → 카테고리 이름 매핑
+    """
+    categories = {}
+    for category_name, keywords in seed_keywords.items():
+        for keyword in keywords:
+            categories.setdefault(keyword, category_name)
+
+    others = [kw for kw in categories if kw != anchor]
+    step = MAX_PAYLOAD_KEYWORDS - 1
+    batches = [[anchor] + others[i:i + step] for i in range(0, len(others), step)]
+    return batches, categories
+
+
+def choose_anchor(geo="KR", client=None, candidates=ANCHOR_CANDIDATES):
+    """후보 키워드 probe 배치에서 평균 관심도가 중앙값인 키워드를 앵커로 고릅니다 (6시간 캐시)."""
+    client = client or CachedTrendReq()
+    try:
+        df = client.interest_over_time(candidates, geo)
+    except Exception as e:
+        print(f"    ⚠️ [{geo}] 앵커 probe 실패, 기본 앵커 사용: {e}")
+        return DEFAULT_ANCHOR_KEYWORD
+
+    means = df.drop(columns="isPartial", errors="ignore").mean()
+    means = means[means > 0].sort_values()
+    if means.empty:
+        return DEFAULT_ANCHOR_KEYWORD
+    return means.index[len(means) // 2]
+
+
+def fetch_anchored_interest(batches, geo="KR", anchor=ANCHOR_KEYWORD, client=None):
+    """
+    배치별 interest_over_time을 앵커 기준으로 재스케일해 하나의 DataFrame으로 합칩니다.
+
+    Returns:
+        DataFrame (index: 시각, columns: 키워드, 값: 전체 최고치 = 100 기준 관심도)
+    """
+    import pandas as pd
+
+    client = client or CachedTrendReq()
+    frames = []
+
+    for batch in batches:
+        try:
+            df = client.interest_over_time(batch, geo)
+        except Exception as e:
+            print(f"    ❌ [{geo}] Trends Error ({', '.join(batch[1:])}): {e}")
+            continue
+
+        if df.empty or anchor not in df.columns or df[anchor].mean() == 0:
+            print(f"    ⚠️ [{geo}] 배치 데이터 없음: {', '.join(batch[1:])}")
+            continue
+        frames.append(df.drop(columns="isPartial", errors="ignore").astype(float))
+
+    if not frames:
+        return pd.DataFrame()
+
+    # 각 배치를 첫 배치의 앵커 평균에 맞춘 뒤, 앵커는 첫 배치 것만 남깁니다
+    reference = frames[0][anchor].mean()
+    scaled = [df * (reference / df[anchor].mean()) for df in frames]
+    combined = pd.concat(
+        [scaled[0]] + [df.drop(columns=anchor) for df in scaled[1:]],
+        axis=1,
+        join="inner"
+    )
+
+    peak = combined.to_numpy().max()
+    return combined * (100.0 / peak) if peak else combined
+
+
+def summarize_interest(frame, categories):
+    """
+    합쳐진 관심도 DataFrame에서 모든 키워드의 방향/평균/최고/현재 값을 한 번에 계산합니다.
+
+    Returns:
+        DataFrame (index: 키워드, columns: category, avg, max, latest, direction), 현재 관심도 내림차순
+    """
+    import numpy as np
+    import pandas as pd
+
+    avg = frame.mean()
+    peak = frame.max()
+    latest = frame.iloc[-1]
+
+    # 트렌드 방향 판단: 최근 vs 평균
+    direction = np.select(
+        [latest > avg * 1.3, latest > avg, latest < avg * 0.7],
+        ["📈 급상승", "↗️ 상승", "📉 하락"],
+        default="→ 보합"
+    )
+
+    summary = pd.DataFrame({
+        "category": [categories.get(kw, "") for kw in frame.columns],
+        "avg": avg.round(1),
+        "max": peak.round(1),
+        "latest": latest.round(1),
+        "direction": direction,
+    }, index=frame.columns)
+    return summary.sort_values("latest", ascending=False)
 
 
-def fetch_keyword_trends(keywords, category_name, geo="KR"):
+def fetch_keyword_trends(seed_keywords=SEED_KEYWORDS, geo="KR", client=None, related=None):
     """
-    pytrends interest_over_time으로 키워드 트렌드를 분석합니다.
-    
+    모든 시드 키워드의 트렌드를 하나의 공통 스케일로 분석합니다.
+
     Args:
-        keywords: 분석할 키워드 리스트 (최대 5개)
-        category_name: 키워드 카테고리 이름
+        seed_keywords: 카테고리 이름 → 키워드 리스트
         geo: 국가 코드
-    
+        client: CachedTrendReq (없으면 새로 생성)
+        related: dict를 넘기면 첫 배치 키워드의 관련 검색어를 채움 (이미 만든 payload 재사용)
+
     Returns:
-        list of keyword trend dicts
+        list of keyword trend dicts (현재 관심도 순)
     """
     try:
-        from pytrends.request import TrendReq
-
-        pytrends = TrendReq(hl='ko', tz=540)
-        pytrends.build_payload(keywords[:5], timeframe='now 7-d', geo=geo)
-        
-        df = pytrends.interest_over_time()
-        
-        if df.empty:
-            print(f"    ⚠️ '{category_name}' 카테고리 데이터 없음")
+        client = client or CachedTrendReq()
+        anchor = choose_anchor(geo, client)
+        batches, categories = build_keyword_batches(seed_keywords, anchor)
+        # 관련 검색어는 첫 배치로 조회하므로 그 배치를 마지막에 요청해 payload(build_payload)를 그대로 재사용합니다.
+        frame = fetch_anchored_interest(batches[1:] + batches[:1], geo=geo, anchor=anchor, client=client)
+        if frame.empty:
+            print(f"    ⚠️ [{geo}] 트렌드 데이터 없음")
             return []
 
-        results = []
-        for keyword in keywords[:5]:
-            if keyword not in df.columns:
-                continue
-            
-            avg_interest = int(df[keyword].mean())
-            max_interest = int(df[keyword].max())
-            latest = int(df[keyword].iloc[-1])
-            
-            # 트렌드 방향 판단: 최근 vs 평균
-            if latest > avg_interest * 1.3:
-                trend_direction = "📈 급상승"
-            elif latest > avg_interest:
-                trend_direction = "↗️ 상승"
-            elif latest < avg_interest * 0.7:
-                trend_direction = "📉 하락"
-            else:
-                trend_direction = "→ 보합"
-            
-            traffic_info = f"{trend_direction} (현재:{latest}, 평균:{avg_interest}, 최고:{max_interest})"
-            
-            results.append({
-                "keyword": keyword,
-                "region": "KR" if geo == "KR" else "US",
-                "traffic_volume": traffic_info,
-                "related_topics": category_name,
-                "trending_date": date.today().isoformat(),
-                "crawled_at": datetime.now().isoformat()
-            })
-
-        print(f"    ✅ '{category_name}': {len(results)}개 키워드 분석 완료")
-        return results
-
+        summary = summarize_interest(frame, categories)
     except Exception as e:
-        print(f"    ❌ Trends Error ({category_name}): {e}")
+        print(f"    ❌ [{geo}] Trends Error: {e}")
         return []
 
+    if related is not None:
+        related.update(fetch_related_queries(batches[0], geo=geo, client=client))
 
-def fetch_related_queries(seed_keywords, geo="KR"):
-    """특정 키워드의 관련 검색어를 가져옵니다."""
     try:
-        from pytrends.request import TrendReq
+        # 원본 곡선은 속도/계절성 분석용으로 로컬 저장소에 보관
+        from trend_store import save_curves
+        save_curves(frame, geo)
+    except Exception as e:
+        print(f"    ⚠️ [{geo}] 곡선 저장 실패: {e}")
+
+    today = date.today().isoformat()
+    crawled_at = datetime.now().isoformat()
+    results = [
+        {
+            "keyword": row.Index,
+            "region": geo,
+            "traffic_volume": f"{row.direction} (현재:{row.latest:g}, 평균:{row.avg:g}, 최고:{row.max:g})",
+            "related_topics": row.category,
+            "trending_date": today,
+            "crawled_at": crawled_at
+        }
+        for row in summary.itertuples()
+    ]
 
-        pytrends = TrendReq(hl='ko', tz=540)
-        pytrends.build_payload(seed_keywords[:5], timeframe='now 7-d', geo=geo)
+    print(f"    ✅ [{geo}] {len(batches)}개 배치, {len(results)}개 키워드 공통 스케일 분석 완료 (앵커: {anchor})")
+    return results
 
-        related = pytrends.related_queries()
+
+def fetch_related_queries(seed_keywords, geo="KR", client=None):
+    """특정 키워드의 관련 검색어를 가져옵니다."""
+    try:
+        client = client or CachedTrendReq()
+        related = client.related_queries(seed_keywords[:5], geo)
         result = {}
 
         for keyword, data in related.items():
@@ -114,76 +333,82 @@ def fetch_related_queries(seed_keywords, geo="KR"):
         return result
 
     except Exception as e:
-        print(f"    ❌ Related queries error: {e}")
+        print(f"    ❌ [{geo}] Related queries error: {e}")
         return {}
 
 
+def dedupe_keywords(keywords):
+    """
+    (keyword, region, trending_date) 기준으로 중복을 제거합니다.
+    한 요청 안에 같은 키가 두 번 있으면 Postgres가 ON CONFLICT 오류를 내므로 마지막 값만 남깁니다.
+    """
+    rows = {}
+    for kw in keywords:
+        if not kw.get("keyword"):
+            print(f"    ⚠️ 빈 키워드 건너뜀: {kw}")
+            continue
+        rows[(kw["keyword"], kw["region"], kw["trending_date"])] = kw
+    return list(rows.values())
+
+
 def save_to_supabase(keywords):
-    """수집한 키워드를 Supabase에 저장합니다."""
-    if not SUPABASE_URL or not SUPABASE_KEY:
+    """수집한 키워드를 Supabase에 일괄 upsert합니다 (UNIQUE(keyword, region, trending_date))."""
+    supabase = get_client()
+    if not supabase.configured:
         print("  ⚠️ Supabase credentials not set.")
         return
 
-    endpoint = f"{SUPABASE_URL}/rest/v1/google_trends"
-    headers = get_supabase_headers()
+    rows = dedupe_keywords(keywords)
+    if not rows:
+        return
+
+    saved, errors = supabase.upsert("google_trends", rows, on_conflict="keyword,region,trending_date")
+    for kw, error in errors:
+        print(f"    ❌ Save error ({kw['keyword']}/{kw['region']}): {error}")
 
-    saved = 0
-    for kw in keywords:
-        try:
-            # 기존 동일 키워드 + 날짜 데이터 확인 후 upsert
-            check_url = f"{SUPABASE_URL}/rest/v1/google_trends?keyword=eq.{kw['keyword']}&trending_date=eq.{kw['trending_date']}&region=eq.{kw['region']}"
-            check_resp = requests.get(check_url, headers=get_supabase_headers())
-            
-            if check_resp.status_code == 200 and len(check_resp.json()) > 0:
-                # 업데이트
-                existing_id = check_resp.json()[0]['id']
-                update_url = f"{SUPABASE_URL}/rest/v1/google_trends?id=eq.{existing_id}"
-                resp = requests.patch(update_url, json=kw, headers=headers)
-            else:
-                # 새로 삽입
-                resp = requests.post(endpoint, json=kw, headers=headers)
-            
-            if resp.status_code in range(200, 300):
-                saved += 1
-            else:
-                pass  # 조용히 넘어감
-        except Exception as e:
-            print(f"    ❌ Save error: {e}")
+    merged = len(keywords) - len(rows)
+    print(f"  💾 {saved}/{len(rows)}개 저장 완료" + (f" (중복 {merged}개 병합)" if merged else ""))
 
-    print(f"  💾 {saved}/{len(keywords)}개 저장 완료")
 
+def collect_geo(geo):
+    """한 지역의 시드 키워드 트렌드 + 관련 검색어를 수집합니다."""
+    client = CachedTrendReq()
 
-def run_google_trends_crawler():
-    """Google Trends 크롤러 실행"""
-    print(f"\n[{datetime.now()}] 📊 Google Trends Crawler 시작...")
+    # 관련 검색어는 시드 키워드 첫 배치(앵커 + 콘텐츠 트렌드 키워드)에 대해 같은 payload로 함께 조회
+    print(f"  📍 [{geo}] 시드 키워드 {sum(len(v) for v in SEED_KEYWORDS.values())}개 + 관련 검색어 분석 중...")
+    related = {}
+    keywords = fetch_keyword_trends(SEED_KEYWORDS, geo=geo, client=client, related=related)
 
-    all_keywords = []
-    
-    for category_name, keywords in SEED_KEYWORDS.items():
-        print(f"  📍 '{category_name}' 카테고리 분석 중...")
-        trends = fetch_keyword_trends(keywords, category_name, geo="KR")
-        all_keywords.extend(trends)
-        time_module.sleep(2)  # Google rate limit 방지
-
-    # 관련 검색어도 수집 (상위 카테고리 대표 키워드)
-    print(f"  🔍 관련 검색어 분석 중...")
-    top_keywords = ["유튜브", "쇼츠", "AI"]
-    related = fetch_related_queries(top_keywords)
-    
     for main_kw, related_list in related.items():
         for rq in related_list[:5]:
-            all_keywords.append({
+            keywords.append({
                 "keyword": rq,
-                "region": "KR",
+                "region": geo,
                 "traffic_volume": f"'{main_kw}' 관련 검색어",
                 "related_topics": f"{main_kw} 관련",
                 "trending_date": date.today().isoformat(),
                 "crawled_at": datetime.now().isoformat()
             })
+    return keywords
+
+
+@exclusive("google_trends")
+@resilience.budgeted(RUN_BUDGET_SECONDS, "google_trends")
+def run_google_trends_crawler(geos=TARGET_GEOS):
+    """Google Trends 크롤러 실행 (지역별 동시 수집, 요청 간격은 전체 공유)"""
+    print(f"\n[{datetime.now()}] 📊 Google Trends Crawler 시작... ({', '.join(geos)})")
+
+    all_keywords = []
+    with ThreadPoolExecutor(max_workers=len(geos)) as pool:
+        for keywords in pool.map(job_lease.inherit(resilience.inherit(collect_geo)), geos):
+            all_keywords.extend(keywords)
 
     if all_keywords:
         save_to_supabase(all_keywords)
-        
+
+        # 대시보드/분석기용 키워드 방향 요약 갱신 (subreddit_activity는 posts를 바꾸는 Reddit 작업들이 갱신)
+        refresh_trend_views(["google_keyword_summary"])
+
         # 콘솔 미리보기
         print("\n  📊 수집된 키워드 미리보기:")
         for kw in all_keywords[:10]:
@@ -199,7 +424,11 @@ if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == "--once":
         print("🚀 Google Trends Crawler (단일 실행)...")
-        run_google_trends_crawler()
+        if "--profile" in sys.argv:
+            from profiler import profile_call
+            profile_call(run_google_trends_crawler, "google_trends")
+        else:
+            run_google_trends_crawler()
         print("✅ 완료!")
     else:
         print("🚀 Google Trends Crawler (반복 모드, 6시간 간격)")
@@ -0,0 +1,191 @@
+"""
+Job Lease - The Info Club v2.0
+Supabase job_leases 테이블(sql/migrate_v13.sql)로 같은 작업이 여러 곳에서 동시에 실행되지 않게 합니다.
+- 시작 전에 임대를 얻고(TTL), 실행 중에는 백그라운드 스레드가 주기적으로 연장(heartbeat)
+- 다른 실행이 임대를 가지고 있으면 건너뛰거나 LEASE_WAIT_SECONDS 동안 기다림
+- 프로세스가 죽으면 연장이 끊겨 TTL 뒤에 다음 실행이 가져감
+- Supabase에 닿지 않으면(장애, 마이그레이션 전) 경고만 남기고 그대로 실행 (수집 자체를 막지 않음)
+  LEASE_REQUIRED=true면 이때 실행하지 않고 건너뜀 (중복 실행이 장애 중 실행보다 더 나쁜 작업용)
+- 연장이 거부되거나 TTL 넘게 실패해 임대를 잃으면 lease_lost()가 True가 되므로, 수집 루프는 resilience.out_of_time()처럼 확인하고 멈춤
+
+사용법:
+    @exclusive("reddit")
+    def run_crawler():
+        for ...:
+            if resilience.out_of_time() or lease_lost():
+                break
+"""
+import os
+import uuid
+import socket
+import functools
+import threading
+import time
+from typing import Callable, Optional
+
+# 임대 유지 시간 (초). 연장이 이 시간 동안 끊기면 다른 실행이 가져갈 수 있음
+LEASE_TTL_SECONDS = int(os.getenv("LEASE_TTL_SECONDS", "300"))
+# 다른 실행이 임대 중일 때 기다릴 최대 시간 (초, 0이면 바로 건너뜀)
+LEASE_WAIT_SECONDS = int(os.getenv("LEASE_WAIT_SECONDS", "0"))
+# 기다리는 동안 다시 시도하는 간격 (초)
+LEASE_POLL_SECONDS = 15
+# 임대 RPC가 실패(Supabase 장애, 마이그레이션 전)했을 때 true면 실행하지 않음, false면 경고 후 실행
+LEASE_REQUIRED = os.getenv("LEASE_REQUIRED", "false").lower() in ("1", "true", "yes")
+
+# 현재 스레드에서 실행 중인 exclusive 작업의 임대 (orchestrator가 여러 작업을 스레드로 함께 돌림)
+_local = threading.local()
+
+
+def make_holder() -> str:
+    """임대 소유자 식별자 (호스트:PID[:GitHub 실행 ID]:난수)"""
+    parts = [socket.gethostname(), str(os.getpid())]
+    if os.getenv("GITHUB_RUN_ID"):
+        parts.append(f"gh{os.getenv('GITHUB_RUN_ID')}")
+    parts.append(uuid.uuid4().hex[:8])
+    return ":".join(parts)
+
+
+class JobLease:
+    """작업 하나의 임대. with 문으로 쓰거나 acquire()/release()를 직접 호출합니다."""
+
+    def __init__(self, job: str, ttl: int = LEASE_TTL_SECONDS, client=None, clock: Callable[[], float] = time.monotonic):
+        self.job = job
+        self.ttl = ttl
+        self.holder = make_holder()
+        self.client = client
+        self.clock = clock
+        self.held = False
+        self.lost = False
+        self.unverified = False     # 임대 RPC가 실패해 확인 없이 진행/건너뛴 경우
+        self.renewed_at = None      # 마지막으로 연장에 성공한 요청을 보낸 시각 (clock 기준)
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def _rpc(self, function, args):
+        if self.client is None:
+            from supabase_client import get_client
+            self.client = get_client()
+        if not self.client.configured:
+            return None
+        return self.client.rpc(function, {"p_job": self.job, "p_holder": self.holder, **args}, timeout=10)
+
+    def acquire(self, wait: float = LEASE_WAIT_SECONDS) -> bool:
+        """
+        임대를 얻으면 heartbeat를 시작하고 True.
+        다른 실행이 가지고 있으면 wait초까지 기다렸다가 그래도 안 되면 False.
+        """
+        give_up_at = time.monotonic() + wait
+        while True:
+            sent_at = self.clock()
+            acquired = self._rpc("acquire_job_lease", {"p_ttl_seconds": self.ttl})
+            if acquired is None:
+                self.unverified = True
+                if LEASE_REQUIRED:
+                    print(f"  ⛔ [{self.job}] 실행 임대를 확인할 수 없어 실행하지 않습니다 (LEASE_REQUIRED=true).")
+                    return False
+                print(f"  ⚠️ [{self.job}] 실행 임대를 확인할 수 없어 그대로 진행합니다 (sql/migrate_v13.sql 적용 여부 확인).")
+                return True
+            if acquired:
+                self.held = True
+                self.renewed_at = sent_at
+                self._start_heartbeat()
+                return True
+            if time.monotonic() + LEASE_POLL_SECONDS > give_up_at:
+                return False
+            print(f"  ⏳ [{self.job}] 다른 실행이 진행 중, {LEASE_POLL_SECONDS}초 후 다시 시도...")
+            time.sleep(LEASE_POLL_SECONDS)
+
+    def _start_heartbeat(self):
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._renew_loop, name=f"lease-{self.job}", daemon=True)
+        self._heartbeat.start()
+
+    def _renew_loop(self):
+        # TTL의 1/3마다 연장하므로 한두 번 실패해도 임대가 만료되지 않습니다.
+        while not self._stop.wait(self.ttl / 3):
+            if not self.renew():
+                return
+
+    def renew(self) -> bool:
+        """
+        임대를 한 번 연장합니다. 임대를 잃었으면 lost를 세우고 False.
+        - 서버가 거부(False): 다른 실행이 가져감
+        - 요청 실패(None): 마지막 성공 뒤 TTL이 지났으면 서버에서 이미 만료됐으므로 잃은 것으로 봄
+        """
+        sent_at = self.clock()
+        renewed = self._rpc("renew_job_lease", {"p_ttl_seconds": self.ttl})
+        if renewed:
+            self.renewed_at = sent_at
+            return True
+        if renewed is False:
+            self.lost = True
+            print(f"  ⚠️ [{self.job}] 실행 임대를 잃었습니다 (다른 실행이 가져감).")
+            return False
+        if self.renewed_at is not None and self.clock() - self.renewed_at >= self.ttl:
+            self.lost = True
+            print(f"  ⚠️ [{self.job}] 실행 임대를 잃었습니다 (연장이 TTL {self.ttl}초 넘게 실패).")
+            return False
+        return True
+
+    def release(self):
+        self._stop.set()
+        if self._heartbeat:
+            self._heartbeat.join(timeout=5)
+            self._heartbeat = None
+        if self.held:
+            self._rpc("release_job_lease", {})
+            self.held = False
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+def exclusive(job: str, ttl: int = LEASE_TTL_SECONDS) -> Callable:
+    """
+    같은 job 이름의 다른 실행이 진행 중이면 함수를 실행하지 않고 None을 반환하는 데코레이터.
+    임대는 함수가 끝나면(예외 포함) 반납합니다.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            lease = JobLease(job, ttl)
+            if not lease.acquire():
+                if not lease.unverified:
+                    print(f"⏭️ [{job}] 다른 실행이 이미 진행 중이라 이번 실행은 건너뜁니다.")
+                return None
+            previous = getattr(_local, "lease", None)
+            _local.lease = lease
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _local.lease = previous
+                lease.release()
+        return wrapper
+    return decorator
+
+
+def current_lease() -> Optional[JobLease]:
+    return getattr(_local, "lease", None)
+
+
+def lease_lost() -> bool:
+    """현재 스레드의 exclusive 작업이 임대를 잃었는지 (다른 실행이 가져갔을 수 있으므로 수집을 멈출 때)"""
+    lease = current_lease()
+    return lease is not None and lease.lost
+
+
+def inherit(func: Callable) -> Callable:
+    """현재 스레드의 임대를 스레드 풀 작업에서도 lease_lost()로 확인할 수 있도록 func를 감쌉니다."""
+    lease = current_lease()
+
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "lease", None)
+        _local.lease = lease
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.lease = previous
+    return wrapper
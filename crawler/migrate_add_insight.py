@@ -2,14 +2,10 @@
 Supabase Migration: ai_insight 컬럼 추가
 YoutuSchool posts 테이블에 AI 인사이트를 저장할 컬럼을 추가합니다.
 """
-import os
-import requests
-from dotenv import load_dotenv
+from settings import settings
 
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+SUPABASE_URL = settings.supabase_url
+SUPABASE_KEY = settings.supabase_key
 
 # 테스트: 기존 posts 테이블에 빈 ai_insight 값으로 업데이트 가능한지 확인
 # Supabase는 새 컬럼을 REST API로 직접 추가할 수 없으므로,
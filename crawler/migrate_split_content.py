@@ -0,0 +1,35 @@
+"""
+Supabase Migration: posts.content 분리 백필
+sql/migrate_v10.sql 적용 후 기존 행의 content(한국어 요약 + 영어 원문)를
+content_original / content_ko / preview 컬럼으로 배치 단위로 나눕니다.
+배치마다 별도 트랜잭션이라 중간에 멈춰도 다시 실행하면 남은 행부터 이어서 처리합니다.
+"""
+import sys
+import time
+from supabase_client import get_client
+
+BATCH_SIZE = 1000
+
+
+def backfill(batch_size=BATCH_SIZE):
+    supabase = get_client()
+    if not supabase.configured:
+        print("❌ Supabase credentials not set.")
+        return
+
+    total = 0
+    started = time.time()
+    while True:
+        updated = supabase.rpc("backfill_post_content", {"p_batch": batch_size}, timeout=120)
+        if updated is None:
+            print("❌ 백필 중단 (sql/migrate_v10.sql이 적용됐는지 확인하세요). 다시 실행하면 이어서 처리합니다.")
+            return
+        if updated == 0:
+            break
+        total += updated
+        print(f"  🔧 {total}개 행 분리 완료 ({time.time() - started:.1f}초)")
+    print(f"✅ 백필 완료: 총 {total}개 행")
+
+
+if __name__ == "__main__":
+    backfill(int(sys.argv[1]) if len(sys.argv) > 1 else BATCH_SIZE)
@@ -0,0 +1,184 @@
+"""
+Collector Orchestrator - The Info Club v2.0
+모든 수집/분석 작업을 하나의 프로세스에서 각자의 주기로 실행합니다.
+- 하나의 asyncio 이벤트 루프에서 작업별 스케줄 관리 (작업끼리는 동시 실행)
+- 같은 작업은 이전 실행이 끝나기 전에 다시 시작하지 않음
+- Supabase 커넥션 풀 등 모듈 수준 자원을 모든 작업이 공유
+- GET /health 로 작업별 상태(JSON) 확인
+
+사용법:
+    python orchestrator.py                 # 계속 실행
+    python orchestrator.py --once          # 모든 작업을 한 번씩 동시에 실행 후 종료
+    python orchestrator.py --only reddit,youtube
+"""
+import os
+import sys
+import json
+import asyncio
+import importlib
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import resilience
+
+# 작업 목록: 이름, "모듈:함수", 실행 주기(초). 모듈은 첫 실행 때 import합니다.
+JOBS = [
+    {"name": "reddit", "target": "crawler:run_crawler", "interval": 60},
+    {"name": "reddit_engagement", "target": "reddit_engagement:run_engagement_refresh", "interval": 7200},
+    {"name": "reddit_comments", "target": "reddit_comments:run_comment_sync", "interval": 7200},
+    {"name": "translate_bodies", "target": "translate_bodies:run_body_translation", "interval": 3600},
+    {"name": "youtube", "target": "youtube_trending:run_youtube_crawler", "interval": 21600},
+    {"name": "google_trends", "target": "google_trends:run_google_trends_crawler", "interval": 21600},
+    {"name": "trend_analysis", "target": "trend_analyzer:run_trend_analysis", "interval": 86400},
+    {"name": "weekly_partials", "target": "weekly_report_generator:main_daily", "interval": 86400},
+]
+
+HEALTH_HOST = os.getenv("ORCHESTRATOR_HOST", "0.0.0.0")
+HEALTH_PORT = int(os.getenv("ORCHESTRATOR_PORT", "8080"))
+
+
+class JobState:
+    """작업 하나의 실행 상태"""
+
+    def __init__(self, job):
+        self.name = job["name"]
+        self.target = job["target"]
+        self.interval = job["interval"]
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.last_started = None
+        self.last_finished = None
+        self.last_duration = None
+        self.last_error = None
+        self.next_run = None
+
+    def resolve(self):
+        module_name, func_name = self.target.split(":")
+        return getattr(importlib.import_module(module_name), func_name)
+
+    def to_dict(self):
+        iso = lambda value: value.isoformat() if value else None
+        return {
+            "interval": self.interval,
+            "running": self.running,
+            "runs": self.runs,
+            "failures": self.failures,
+            "last_started": iso(self.last_started),
+            "last_finished": iso(self.last_finished),
+            "last_duration": round(self.last_duration, 2) if self.last_duration is not None else None,
+            "last_error": self.last_error,
+            "next_run": iso(self.next_run),
+        }
+
+
+class Orchestrator:
+    def __init__(self, jobs):
+        self.states = [JobState(job) for job in jobs]
+        # 블로킹 작업은 작업 수만큼의 스레드에서 실행 (같은 작업은 한 번에 하나만 실행되므로 충분)
+        self.executor = ThreadPoolExecutor(max_workers=max(len(self.states), 1), thread_name_prefix="job")
+        self.started_at = datetime.now()
+
+    async def run_job(self, state):
+        """작업을 한 번 실행합니다. 이미 실행 중이면 건너뜁니다."""
+        if state.running:
+            print(f"⏭️ [{state.name}] 이전 실행이 끝나지 않아 건너뜁니다.")
+            return
+
+        state.running = True
+        state.last_started = datetime.now()
+        print(f"\n▶️ [{state.name}] 시작 ({state.last_started:%Y-%m-%d %H:%M:%S})")
+        loop = asyncio.get_running_loop()
+        try:
+            func = await loop.run_in_executor(self.executor, state.resolve)
+            await loop.run_in_executor(self.executor, func)
+            state.last_error = None
+        except Exception as e:
+            state.failures += 1
+            state.last_error = f"{type(e).__name__}: {e}"
+            print(f"❌ [{state.name}] 실패: {state.last_error}")
+            traceback.print_exc()
+        finally:
+            state.running = False
+            state.runs += 1
+            state.last_finished = datetime.now()
+            state.last_duration = (state.last_finished - state.last_started).total_seconds()
+            print(f"⏹️ [{state.name}] 종료 ({state.last_duration:.1f}초)")
+
+    async def schedule(self, state):
+        """작업 시작 시각 기준으로 interval마다 반복 실행합니다 (실행이 길어지면 끝나는 즉시 다음 실행)."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await self.run_job(state)
+            delay = max(0.0, state.interval - (loop.time() - started))
+            state.next_run = datetime.now() + timedelta(seconds=delay)
+            await asyncio.sleep(delay)
+
+    def status(self):
+        failing = [s.name for s in self.states if s.last_error]
+        return {
+            "status": "degraded" if failing else "ok",
+            "started_at": self.started_at.isoformat(),
+            "jobs": {s.name: s.to_dict() for s in self.states},
+            "breakers": resilience.breaker_states(),
+        }
+
+    async def handle_http(self, reader, writer):
+        """GET /health 에만 응답하는 최소 HTTP 핸들러"""
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+
+            if len(request_line) >= 2 and request_line[0] == "GET" and request_line[1] in ("/health", "/"):
+                status, body = "200 OK", json.dumps(self.status(), ensure_ascii=False).encode("utf-8")
+            else:
+                status, body = "404 Not Found", b'{"error": "not found"}'
+
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def run_forever(self):
+        server = await asyncio.start_server(self.handle_http, HEALTH_HOST, HEALTH_PORT)
+        print(f"🩺 상태 확인: http://{HEALTH_HOST}:{HEALTH_PORT}/health")
+        async with server:
+            await asyncio.gather(*(self.schedule(state) for state in self.states))
+
+    async def run_once(self):
+        await asyncio.gather(*(self.run_job(state) for state in self.states))
+        self.executor.shutdown(wait=True)
+
+
+def select_jobs(only=None):
+    if not only:
+        return JOBS
+    names = set(only.split(","))
+    unknown = names - {job["name"] for job in JOBS}
+    if unknown:
+        raise SystemExit(f"알 수 없는 작업: {', '.join(sorted(unknown))}")
+    return [job for job in JOBS if job["name"] in names]
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    only = args[args.index("--only") + 1] if "--only" in args else None
+    orchestrator = Orchestrator(select_jobs(only))
+
+    if "--once" in args:
+        print("🚀 Orchestrator (단일 실행)...")
+        asyncio.run(orchestrator.run_once())
+        print("✅ 완료!")
+    else:
+        print("🚀 Orchestrator (반복 모드)")
+        for job in orchestrator.states:
+            print(f"  • {job.name}: {job.interval}초 간격")
+        try:
+            asyncio.run(orchestrator.run_forever())
+        except KeyboardInterrupt:
+            print("👋 종료합니다.")
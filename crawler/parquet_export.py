@@ -0,0 +1,252 @@
+"""
+Parquet Export - The Info Club v2.0
+Supabase에 쌓인 수집 데이터를 날짜별로 파티션된 Parquet 파일로 내려받아 로컬에서 분석합니다.
+- 테이블별 워터마크(마지막으로 내보낸 crawled_at/updated_at, id)를 기록해 다음 실행에서는 새 행만 내보냄
+- 파일 구조: {EXPORT_DIR}/{table}/date=YYYY-MM-DD/part-{실행 시각}.parquet
+- load()는 파일을 메모리 맵으로 읽어 pandas DataFrame으로 돌려줌 (upsert로 다시 내보내진 행은 최신 값만 남김)
+
+사용법:
+    python parquet_export.py                         # 모든 테이블 증분 내보내기
+    python parquet_export.py --tables posts,google_trends
+    python parquet_export.py --summary 90            # 최근 90일 로컬 집계 (trend_analyzer 스타일)
+
+필요 패키지: pandas, pyarrow
+"""
+import os
+import sys
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+EXPORT_DIR = os.getenv("PARQUET_EXPORT_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "parquet"))
+WATERMARK_FILE = "_watermarks.json"
+
+# 테이블 → 워터마크/파티션 기준 시각 컬럼 (id와 함께 키셋 순서로 사용)
+TABLES = {
+    # 참여도/댓글 동기화/번역 RPC가 crawled_at 없이 행을 고치므로 갱신 시각 기준 (sql/migrate_v17.sql)
+    "posts": "updated_at",
+    "youtube_trends": "crawled_at",
+    "google_trends": "crawled_at",
+    # week_label로 upsert되어 같은 주의 행이 여러 번 바뀌므로 갱신 시각 기준 (sql/migrate_v16.sql)
+    "weekly_reports": "updated_at",
+}
+
+# 내보내지 않는 컬럼 (search_tsv: 검색용 생성 컬럼, migrate_v14.sql - 원문에서 다시 만들 수 있음)
+EXCLUDED_COLUMNS = {
+    "posts": ("search_tsv",),
+}
+
+# 파일 하나에 담을 최대 행 수 (이만큼 모이면 파일을 쓰고 워터마크를 올림)
+EXPORT_BATCH_ROWS = 50000
+PAGE_SIZE = 1000
+
+
+# ---- 워터마크 ----
+
+def watermark_path(export_dir: str = EXPORT_DIR) -> str:
+    return os.path.join(export_dir, WATERMARK_FILE)
+
+
+def load_watermarks(export_dir: str = EXPORT_DIR) -> Dict:
+    try:
+        with open(watermark_path(export_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_watermarks(watermarks: Dict, export_dir: str = EXPORT_DIR):
+    """임시 파일에 쓴 뒤 교체해 중간에 죽어도 워터마크 파일이 깨지지 않게 합니다."""
+    os.makedirs(export_dir, exist_ok=True)
+    path = watermark_path(export_dir)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, ensure_ascii=False, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+# ---- 내보내기 ----
+
+def to_frame(rows: List[Dict], time_column: str):
+    """JSON 컬럼은 문자열로 바꿔 파일마다 스키마가 달라지지 않게 하고, 시각 컬럼은 UTC datetime으로 맞춥니다."""
+    import pandas as pd
+
+    df = pd.DataFrame(rows)
+    for column in df.columns:
+        if df[column].map(lambda v: isinstance(v, (dict, list))).any():
+            df[column] = df[column].map(lambda v: json.dumps(v, ensure_ascii=False) if v is not None else None)
+    for column in ("created_at", "crawled_at", "captured_at", "updated_at", time_column):
+        if column in df.columns:
+            df[column] = pd.to_datetime(df[column], utc=True, format="ISO8601", errors="coerce")
+    return df
+
+
+def write_partitions(table: str, rows: List[Dict], time_column: str, run_id: str, export_dir: str = EXPORT_DIR) -> int:
+    """rows를 time_column의 UTC 날짜별 Parquet 파일로 씁니다. 쓴 파일 수를 반환합니다."""
+    df = to_frame(rows, time_column).drop(columns=list(EXCLUDED_COLUMNS.get(table, ())), errors="ignore")
+    files = 0
+    for day, part in df.groupby(df[time_column].dt.strftime("%Y-%m-%d"), sort=True):
+        directory = os.path.join(export_dir, table, f"date={day}")
+        os.makedirs(directory, exist_ok=True)
+        part.to_parquet(os.path.join(directory, f"part-{run_id}.parquet"), index=False, engine="pyarrow")
+        files += 1
+    return files
+
+
+def export_table(table: str, client=None, export_dir: str = EXPORT_DIR) -> int:
+    """워터마크 이후의 행만 내보내고 내보낸 행 수를 반환합니다."""
+    from supabase_client import get_client, keyset_filter
+
+    client = client or get_client()
+    time_column = TABLES[table]
+    order = (time_column, "id")
+    watermarks = load_watermarks(export_dir)
+    mark = watermarks.get(table)
+    if mark and mark.get("columns") != list(order):
+        # 기준 컬럼이 바뀌었으면(weekly_reports: created_at → updated_at, posts: crawled_at → updated_at) 처음부터 다시 내보냄
+        print(f"  🔄 {table}: 워터마크 기준이 {mark.get('columns')} → {list(order)}로 바뀌어 전체를 다시 내보냅니다.")
+        mark = None
+
+    filters = [(time_column, "not.is.null")]
+    if mark:
+        filters.append(("or", keyset_filter(order, mark["values"])))
+
+    # 같은 초에 다시 실행해도 이전 파일을 덮어쓰지 않도록 마이크로초까지 넣음
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    exported = 0
+    batch = []
+    rows = client.iter_select(table, "*", filters=filters, order=order, page_size=PAGE_SIZE)
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= EXPORT_BATCH_ROWS:
+            exported += flush_batch(table, batch, time_column, f"{run_id}-{exported // EXPORT_BATCH_ROWS:04d}", export_dir)
+            batch = []
+    if batch:
+        exported += flush_batch(table, batch, time_column, f"{run_id}-{exported // EXPORT_BATCH_ROWS:04d}", export_dir)
+    return exported
+
+
+def flush_batch(table: str, batch: List[Dict], time_column: str, run_id: str, export_dir: str) -> int:
+    """파일을 먼저 쓰고 워터마크를 올립니다 (중간에 죽으면 다음 실행에서 같은 행을 다시 쓰고, load()가 중복을 제거)."""
+    write_partitions(table, batch, time_column, run_id, export_dir)
+    watermarks = load_watermarks(export_dir)
+    previous = watermarks.get(table, {})
+    watermarks[table] = {
+        "columns": [time_column, "id"],
+        "values": [batch[-1][time_column], batch[-1]["id"]],
+        "rows": previous.get("rows", 0) + len(batch),
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    }
+    save_watermarks(watermarks, export_dir)
+    return len(batch)
+
+
+def run_export(tables: Iterable[str] = TABLES, export_dir: str = EXPORT_DIR):
+    from supabase_client import get_client
+
+    supabase = get_client()
+    if not supabase.configured:
+        print("❌ Supabase credentials not set.")
+        return
+
+    print(f"[{datetime.now()}] 📦 Parquet 내보내기 → {export_dir}")
+    for table in tables:
+        started = time.perf_counter()
+        exported = export_table(table, supabase, export_dir)
+        mark = load_watermarks(export_dir).get(table)
+        since = f" (워터마크 {mark['values'][0]})" if mark else ""
+        print(f"  ✅ {table}: 새 행 {exported}개, {time.perf_counter() - started:.1f}초{since}")
+
+
+# ---- 로컬 로더 ----
+
+def partition_files(table: str, since: Optional[str] = None, export_dir: str = EXPORT_DIR) -> List[str]:
+    """since(YYYY-MM-DD) 이후 파티션의 Parquet 파일 목록 (파일 이름 = 실행 시각 순)"""
+    root = os.path.join(export_dir, table)
+    if not os.path.isdir(root):
+        return []
+    files = []
+    for name in sorted(os.listdir(root)):
+        if not name.startswith("date=") or (since and name[5:] < since):
+            continue
+        directory = os.path.join(root, name)
+        files.extend(os.path.join(directory, f) for f in sorted(os.listdir(directory)) if f.endswith(".parquet"))
+    return files
+
+
+def load(table: str, columns: Optional[List[str]] = None, since: Optional[str] = None, export_dir: str = EXPORT_DIR):
+    """
+    내보낸 테이블을 DataFrame으로 읽습니다. 파일은 메모리 맵으로 열고 필요한 컬럼만 읽습니다.
+    같은 id가 여러 번 내보내졌으면(upsert/RPC로 갱신된 행) 가장 최근 값만 남깁니다.
+    """
+    import pandas as pd
+    import pyarrow.parquet as pq
+
+    time_column = TABLES[table]
+    wanted = None
+    if columns is not None:
+        wanted = list(dict.fromkeys(["id", time_column] + list(columns)))
+
+    frames = []
+    for path in partition_files(table, since, export_dir):
+        # 기준 컬럼이 바뀌기 전에 쓴 파일에는 없는 컬럼이 있을 수 있으므로 파일에 있는 컬럼만 읽음
+        columns_in_file = wanted and [c for c in wanted if c in pq.read_schema(path, memory_map=True).names]
+        frames.append(pq.read_table(path, columns=columns_in_file, memory_map=True).to_pandas())
+    if not frames:
+        return pd.DataFrame(columns=wanted or [])
+    df = pd.concat(frames, ignore_index=True)
+    if time_column not in df.columns:
+        df[time_column] = pd.NaT
+    # 기준 컬럼이 없는 예전 파일의 행(NaT)은 가장 오래된 것으로 보고 새 값에 밀리게 함
+    return (
+        df.sort_values(time_column, kind="stable", na_position="first")
+          .drop_duplicates("id", keep="last")
+          .reset_index(drop=True)
+    )
+
+
+def summarize(days: int = 90, export_dir: str = EXPORT_DIR) -> Dict:
+    """trend_analyzer가 Supabase에서 수십~수백 행으로 하던 집계를 내보낸 전체 기간에 대해 로컬에서 계산합니다."""
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+
+    youtube = load("youtube_trends", ["category", "region", "view_count", "trending_date"], since, export_dir)
+    google = load("google_trends", ["keyword", "region", "traffic_volume"], since, export_dir)
+    posts = load("posts", ["subreddit", "upvotes", "comment_count", "created_at"], since, export_dir)
+
+    summary = {}
+    if not youtube.empty:
+        summary["youtube_category_views"] = (
+            youtube.groupby(["region", "category"])["view_count"].agg(["count", "sum", "median"])
+                   .sort_values("sum", ascending=False).head(20)
+        )
+    if not google.empty:
+        direction = google["traffic_volume"].fillna("").str.split(" (", n=1, regex=False).str[0]
+        summary["google_rising_keywords"] = (
+            google.assign(rising=direction.isin(["📈 급상승", "↗️ 상승"]))
+                  .groupby(["region", "keyword"])["rising"].agg(["sum", "count"])
+                  .sort_values("sum", ascending=False).head(20)
+        )
+    if not posts.empty:
+        week = posts["created_at"].dt.tz_localize(None).dt.to_period("W").astype(str)
+        summary["reddit_weekly_activity"] = (
+            posts.assign(week=week)
+                 .groupby(["week", "subreddit"])[["upvotes", "comment_count"]].sum()
+                 .sort_index(ascending=False).head(40)
+        )
+    return summary
+
+
+if __name__ == "__main__":
+    if "--summary" in sys.argv:
+        position = sys.argv.index("--summary")
+        days = int(sys.argv[position + 1]) if len(sys.argv) > position + 1 else 90
+        started = time.perf_counter()
+        result = summarize(days)
+        for name, frame in result.items():
+            print(f"\n📊 {name}\n{frame.to_string()}")
+        print(f"\n⏱️ 최근 {days}일 집계 {time.perf_counter() - started:.2f}초")
+    else:
+        tables = list(TABLES)
+        if "--tables" in sys.argv:
+            tables = sys.argv[sys.argv.index("--tables") + 1].split(",")
+        run_export(tables)
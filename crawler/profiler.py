@@ -0,0 +1,152 @@
+"""
+Profiler - The Info Club v2.0
+크롤러/리포트 CLI의 --profile 옵션에서 사용하는 샘플링 프로파일러입니다.
+- 모든 스레드의 스택을 주기적으로 샘플링 (ThreadPoolExecutor 작업자 포함)
+- flamegraph.pl / speedscope 호환 collapsed-stack 파일 저장
+- 자체/누적 샘플 기준 상위 함수 표 출력
+- 실행 시간을 CPU / 네트워크 대기 / sleep·잠금 대기 / 기타 대기로 나눠 보고
+
+사용법:
+    python crawler.py --once --profile
+    python weekly_report_generator.py --incremental --profile
+    flamegraph.pl .cache/profiles/crawler-20261019-120000.collapsed > crawler.svg
+"""
+import os
+import re
+import sys
+import time
+import linecache
+import threading
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "profiles"))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", "5")) / 1000
+TOP_N = 25
+
+# 스택 맨 위(leaf) 프레임이 이 파일들에 있으면 소켓 I/O 대기로 분류
+NETWORK_FILES = ("/socket.py", "/ssl.py", "/selectors.py", "http/client.py", "urllib3/connection.py")
+# 작업 큐 대기 등 유휴 상태로 분류 (스레드 풀의 놀고 있는 작업자)
+IDLE_FUNCTIONS = {("threading.py", "wait"), ("queue.py", "get"), ("thread.py", "_worker")}
+# time.sleep / Lock.acquire / Thread.join은 C 함수라 스택 맨 위가 호출한 Python 프레임이므로,
+# 그 프레임의 현재 줄이 이런 호출이면 sleep·잠금 대기로 분류 (crawler의 요청 간 sleep, RateLimiter 등)
+WAIT_CALL = re.compile(r"\bsleep\(|\.acquire\(|\.join\(|^\s*with\s+[\w.]*lock\s*:", re.IGNORECASE)
+
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class StackSampler:
+    """별도 스레드에서 sys._current_frames()로 스택을 수집합니다."""
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks = Counter()     # "스레드;바깥;...;안쪽" → 샘플 수
+        self.states = Counter()     # network / waiting / idle / active → 샘플 수
+        self.own_cpu = 0.0          # 샘플러 스레드 자신이 쓴 CPU 시간 (보고에서 뺌)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        cpu_start = time.thread_time()
+        try:
+            self._sample_loop(own_id)
+        finally:
+            self.own_cpu = time.thread_time() - cpu_start
+
+    def _sample_loop(self, own_id):
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                labels = []
+                leaf = frame
+                while frame is not None:
+                    labels.append(frame_label(frame))
+                    frame = frame.f_back
+                labels.reverse()
+                self.stacks[";".join([names.get(thread_id, "thread")] + labels)] += 1
+                self.states[self.classify(leaf)] += 1
+
+    @staticmethod
+    def classify(frame):
+        path = frame.f_code.co_filename.replace(os.sep, "/")
+        if (os.path.basename(path), frame.f_code.co_name) in IDLE_FUNCTIONS:
+            return "idle"
+        if path.endswith(NETWORK_FILES):
+            return "network"
+        if WAIT_CALL.search(linecache.getline(frame.f_code.co_filename, frame.f_lineno)):
+            return "waiting"
+        return "active"
+
+    def top_functions(self, n=TOP_N):
+        """(함수, 자체 샘플, 누적 샘플) 리스트 (자체 샘플 내림차순)"""
+        own, total = Counter(), Counter()
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            for label in set(frames):
+                total[label] += count
+        return [(label, own[label], total[label]) for label, _ in own.most_common(n)]
+
+
+def write_report(name, sampler, wall, cpu):
+    """collapsed-stack 파일과 상위 함수 표를 저장하고 요약을 출력합니다."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = os.path.join(PROFILE_DIR, f"{name}-{datetime.now():%Y%m%d-%H%M%S}")
+
+    with open(f"{stem}.collapsed", "w", encoding="utf-8") as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    busy = sampler.states["network"] + sampler.states["waiting"] + sampler.states["active"]
+    network_share = sampler.states["network"] / busy if busy else 0.0
+    wait_share = sampler.states["waiting"] / busy if busy else 0.0
+    waiting = max(wall - cpu, 0.0)
+
+    lines = [
+        f"프로파일: {name}",
+        f"전체 {wall:.2f}초 | CPU {cpu:.2f}초 ({cpu / wall:.0%}) | 대기 {waiting:.2f}초"
+        if wall else f"전체 {wall:.2f}초",
+        f"샘플 {sum(sampler.states.values())}개: 네트워크 I/O {sampler.states['network']}, "
+        f"sleep·잠금 대기 {sampler.states['waiting']}, 실행 중 {sampler.states['active']}, 유휴 스레드 {sampler.states['idle']} "
+        f"(작업 샘플 중 네트워크 대기 {network_share:.0%}, sleep·잠금 대기 {wait_share:.0%})",
+        "",
+        f"{'자체':>7} {'누적':>7}  함수",
+    ]
+    for label, own, total in sampler.top_functions():
+        lines.append(f"{own:>7} {total:>7}  {label}")
+
+    with open(f"{stem}.txt", "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+    print("\n" + "\n".join(lines[:3]))
+    print(f"📄 상위 함수 표: {stem}.txt")
+    print(f"🔥 collapsed stacks: {stem}.collapsed")
+
+
+def profile_call(func, name, *args, **kwargs):
+    """func를 프로파일링하며 실행하고 결과를 PROFILE_DIR에 저장합니다."""
+    sampler = StackSampler()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    sampler.start()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        sampler.stop()
+        # process_time에는 샘플러 스레드의 CPU도 들어 있으므로 빼고 보고
+        cpu = max(time.process_time() - cpu_start - sampler.own_cpu, 0.0)
+        write_report(name, sampler, time.perf_counter() - wall_start, cpu)
@@ -0,0 +1,191 @@
+"""
+Reddit Comment Ingestion - The Info Club v2.0
+저장된 포스트의 1단계 댓글 전체를 comments 테이블에 일괄 upsert합니다.
+- posts.comments_synced_count/comments_synced_at 워터마크와 비교해 댓글 수가 바뀌었거나
+  오래 동기화하지 않은 포스트만 다시 받습니다 (sql/migrate_v12.sql)
+- 이미 저장된 댓글과 업보트/수정 시각이 같으면 다시 쓰지 않고, 새 댓글과 바뀐 댓글만 upsert
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from job_lease import exclusive, lease_lost
+from supabase_client import get_client, quote_value, refresh_trend_views, IN_FILTER_CHUNK_SIZE
+
+# 동기화 대상: 최근 N일 안에 작성된 포스트
+COMMENT_DAYS = int(os.getenv("REDDIT_COMMENT_DAYS", "7"))
+
+# 댓글 수가 그대로여도 업보트 변화를 반영하기 위해 다시 받는 주기
+RESYNC_HOURS = int(os.getenv("REDDIT_COMMENT_RESYNC_HOURS", "24"))
+
+# 포스트 하나에서 받을 1단계 댓글 최대 수 (Reddit 제한 500)
+COMMENT_LIMIT = 500
+
+# 요청 사이 대기 (Reddit 비인증 요청 rate limit 보호)
+REQUEST_INTERVAL = 1.0
+
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 YoutuSchool/2.0'}
+
+
+def utc_iso(timestamp) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp else None
+
+
+def parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")) if value else None
+
+
+def select_posts_to_sync(posts: List[Dict], now: Optional[datetime] = None) -> List[Dict]:
+    """워터마크 이후 댓글 수가 바뀌었거나 RESYNC_HOURS가 지난 포스트만 고릅니다."""
+    now = now or datetime.now(timezone.utc)
+    stale_before = now - timedelta(hours=RESYNC_HOURS)
+    selected = []
+    for post in posts:
+        if not post.get("comment_count"):
+            continue
+        synced_at = parse_time(post.get("comments_synced_at"))
+        if (post.get("comments_synced_count") != post["comment_count"]
+                or synced_at is None or synced_at < stale_before):
+            selected.append(post)
+    return selected
+
+
+def fetch_comments(session, post: Dict) -> Tuple[Optional[int], List[Dict]]:
+    """
+    포스트의 1단계 댓글을 comments 행 형식으로 가져옵니다.
+
+    Returns:
+        (Reddit이 보고한 현재 댓글 수, 댓글 행 리스트). 조회 실패 시 (None, [])
+    """
+    import requests
+
+    url = f"https://www.reddit.com/comments/{post['post_id']}.json"
+    try:
+        resp = session.get(url, params={"limit": COMMENT_LIMIT, "depth": 1, "sort": "top", "raw_json": 1}, timeout=30)
+    except requests.RequestException as e:
+        print(f"  ⚠️ 댓글 조회 오류 ({post['post_id']}): {e}")
+        return None, []
+    if resp.status_code != 200:
+        print(f"  ⚠️ 댓글 조회 실패 ({post['post_id']}): {resp.status_code}")
+        return None, []
+
+    data = resp.json()
+    if len(data) < 2:
+        return None, []
+    listing = data[0].get("data", {}).get("children", [])
+    num_comments = listing[0].get("data", {}).get("num_comments") if listing else None
+
+    rows = []
+    for child in data[1].get("data", {}).get("children", []):
+        if child.get("kind") != "t1":   # "more" 자리표시자 제외
+            continue
+        info = child.get("data", {})
+        body = info.get("body", "")
+        if not body or body in ("[deleted]", "[removed]"):
+            continue
+        edited = info.get("edited")
+        rows.append({
+            "comment_id": info["id"],
+            "post_id": post["id"],
+            "author": info.get("author", "unknown"),
+            "content": body,
+            "ups": info.get("ups", 0),
+            "created_at": utc_iso(info.get("created_utc")),
+            "edited_at": utc_iso(edited) if edited else None,
+        })
+    return num_comments, rows
+
+
+def fetch_stored_fingerprints(post_uuids: List[str]) -> Dict[str, Tuple]:
+    """이미 저장된 댓글의 (업보트, 수정 시각) — 바뀌지 않은 댓글은 다시 쓰지 않기 위해 사용"""
+    supabase = get_client()
+    fingerprints = {}
+    for i in range(0, len(post_uuids), IN_FILTER_CHUNK_SIZE):
+        chunk = post_uuids[i:i + IN_FILTER_CHUNK_SIZE]
+        for row in supabase.iter_select(
+            "comments",
+            select="comment_id,ups,edited_at",
+            filters={"post_id": f"in.({','.join(quote_value(u) for u in chunk)})"},
+            order=("comment_id",),
+        ):
+            fingerprints[row["comment_id"]] = (row.get("ups"), parse_time(row.get("edited_at")))
+    return fingerprints
+
+
+def is_changed(row: Dict, fingerprints: Dict[str, Tuple]) -> bool:
+    stored = fingerprints.get(row["comment_id"])
+    return stored is None or stored != (row["ups"], parse_time(row["edited_at"]))
+
+
+@exclusive("reddit_comments")
+def run_comment_sync(days: int = COMMENT_DAYS):
+    print(f"[{datetime.now()}] 💬 Reddit 댓글 동기화 시작 (최근 {days}일)")
+    import requests
+
+    supabase = get_client()
+    if not supabase.configured:
+        print("❌ Supabase credentials not set.")
+        return
+
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    posts = list(supabase.iter_select(
+        "posts",
+        select="id,post_id,comment_count,comments_synced_count,comments_synced_at",
+        filters={"created_at": f"gte.{since}"},
+        order=("created_at", "id"),
+    ))
+    targets = select_posts_to_sync(posts)
+    print(f"  📥 포스트 {len(posts)}개 중 {len(targets)}개 댓글 변경/재동기화 대상")
+    if not targets:
+        return
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    fetched = {}        # post_id → (현재 댓글 수, 댓글 행)
+    for i, post in enumerate(targets):
+        if lease_lost():
+            print(f"  ⛔ 실행 임대를 잃어 댓글 수집을 멈춥니다 ({i}/{len(targets)}개 수집).")
+            break
+        if i:
+            time.sleep(REQUEST_INTERVAL)
+        num_comments, rows = fetch_comments(session, post)
+        if num_comments is not None:
+            fetched[post["post_id"]] = (num_comments, rows)
+
+    previously_synced = [p["id"] for p in targets if p.get("comments_synced_at") and p["post_id"] in fetched]
+    fingerprints = fetch_stored_fingerprints(previously_synced) if previously_synced else {}
+
+    all_rows = [row for _, rows in fetched.values() for row in rows]
+    changed = [row for row in all_rows if is_changed(row, fingerprints)]
+    saved, errors = supabase.upsert("comments", changed, on_conflict="comment_id") if changed else (0, [])
+    for row, error in errors:
+        print(f"  ❌ 댓글 저장 실패 ({row['comment_id']}): {error}")
+
+    # 저장에 실패한 댓글이 있는 포스트는 워터마크를 올리지 않아 다음 실행에서 다시 시도합니다.
+    uuid_to_post_id = {p["id"]: p["post_id"] for p in targets}
+    failed_posts = {uuid_to_post_id[row["post_id"]] for row, _ in errors}
+    marks = [
+        {"post_id": post_id, "comments_synced_count": num_comments}
+        for post_id, (num_comments, _) in fetched.items()
+        if post_id not in failed_posts
+    ]
+    marked = supabase.rpc("mark_comments_synced", {"p_rows": marks}) if marks else 0
+    if marked is None:
+        print("  ❌ 워터마크 갱신 실패 (sql/migrate_v12.sql이 적용됐는지 확인하세요).")
+        marked = 0
+
+    print(f"  💾 댓글 {saved}개 저장 (받은 댓글 {len(all_rows)}개 중 신규/변경 {len(changed)}개, 포스트 {marked}개 동기화)")
+    if marked:
+        # mark_comments_synced가 바꾼 comment_count를 서브레딧 활동량 집계에 반영
+        refresh_trend_views(["subreddit_activity"])
+
+
+if __name__ == "__main__":
+    if "--profile" in sys.argv:
+        from profiler import profile_call
+        profile_call(run_comment_sync, "reddit_comments")
+    else:
+        run_comment_sync()
@@ -0,0 +1,151 @@
+"""
+Reddit Engagement Refresh - The Info Club v2.0
+이미 저장된 최근 포스트의 업보트/댓글 수/업보트 비율을 다시 받아 갱신합니다.
+- Reddit /api/info 한 번에 fullname(t3_...) 100개씩 조회 (포스트 수천 개도 수십 번 요청)
+- 저장된 값과 비교해 바뀐 필드만 모아 update_post_engagement RPC 한 번으로 반영 (sql/migrate_v11.sql)
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from job_lease import exclusive, lease_lost
+from supabase_client import get_client, refresh_trend_views
+
+# 갱신 대상: 최근 N일 안에 작성된 포스트 (주간 리포트 집계 기간과 동일)
+REFRESH_DAYS = int(os.getenv("REDDIT_REFRESH_DAYS", "7"))
+
+# /api/info 한 번에 조회할 수 있는 최대 fullname 수 (Reddit 제한)
+INFO_BATCH_SIZE = 100
+
+# 요청 사이 대기 (Reddit 비인증 요청 rate limit 보호)
+REQUEST_INTERVAL = 1.0
+
+# RPC 한 번에 보낼 최대 행 수
+UPDATE_CHUNK_SIZE = 1000
+
+INFO_URL = "https://www.reddit.com/api/info.json"
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 YoutuSchool/2.0'}
+
+# posts 컬럼 ← Reddit 응답 필드
+ENGAGEMENT_FIELDS = {
+    "upvotes": "ups",
+    "comment_count": "num_comments",
+    "upvote_ratio": "upvote_ratio",
+}
+
+
+def fetch_stored_posts(days: int = REFRESH_DAYS) -> List[Dict]:
+    """최근 N일 포스트의 post_id와 현재 저장된 참여 지표를 가져옵니다."""
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    return list(get_client().iter_select(
+        "posts",
+        select="post_id," + ",".join(ENGAGEMENT_FIELDS),
+        filters={"created_at": f"gte.{since}"},
+        order=("created_at", "id"),
+    ))
+
+
+def fetch_engagement(post_ids: List[str]) -> Dict[str, Dict]:
+    """
+    /api/info로 post_id별 최신 참여 지표를 가져옵니다.
+    삭제됐거나 조회에 실패한 포스트는 결과에 포함되지 않습니다.
+    """
+    import requests
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    latest = {}
+    for i in range(0, len(post_ids), INFO_BATCH_SIZE):
+        if lease_lost():
+            print(f"  ⛔ 실행 임대를 잃어 조회를 멈춥니다 ({i // INFO_BATCH_SIZE}번째 묶음까지 조회).")
+            break
+        if i:
+            time.sleep(REQUEST_INTERVAL)
+        batch = post_ids[i:i + INFO_BATCH_SIZE]
+        try:
+            resp = session.get(INFO_URL, params={"id": ",".join(f"t3_{pid}" for pid in batch), "raw_json": 1}, timeout=30)
+        except requests.RequestException as e:
+            print(f"  ⚠️ Reddit 조회 오류 ({i // INFO_BATCH_SIZE + 1}번째 묶음): {e}")
+            continue
+        if resp.status_code != 200:
+            print(f"  ⚠️ Reddit 조회 실패 ({i // INFO_BATCH_SIZE + 1}번째 묶음): {resp.status_code}")
+            continue
+
+        for child in resp.json().get("data", {}).get("children", []):
+            info = child.get("data", {})
+            if info.get("id"):
+                latest[info["id"]] = {column: info.get(field) for column, field in ENGAGEMENT_FIELDS.items()}
+    return latest
+
+
+def diff_engagement(stored: List[Dict], latest: Dict[str, Dict]) -> List[Dict]:
+    """저장된 값과 달라진 필드만 담은 행 리스트 ({"post_id": ..., 바뀐 컬럼: 새 값})"""
+    changes = []
+    for row in stored:
+        fresh = latest.get(row["post_id"])
+        if not fresh:
+            continue
+        changed = {}
+        for column, value in fresh.items():
+            if value is None:
+                continue
+            if column == "upvote_ratio":
+                value = float(value)
+                if row.get(column) is not None and abs(float(row[column]) - value) < 1e-9:
+                    continue
+            elif row.get(column) == value:
+                continue
+            changed[column] = value
+        if changed:
+            changes.append({"post_id": row["post_id"], **changed})
+    return changes
+
+
+@exclusive("reddit_engagement")
+def run_engagement_refresh(days: int = REFRESH_DAYS):
+    print(f"[{datetime.now()}] 🔁 Reddit 참여 지표 갱신 시작 (최근 {days}일)")
+    supabase = get_client()
+    if not supabase.configured:
+        print("❌ Supabase credentials not set.")
+        return
+
+    stored = fetch_stored_posts(days)
+    if not stored:
+        print("  ⚠️ 갱신할 포스트가 없습니다.")
+        return
+
+    post_ids = [row["post_id"] for row in stored]
+    requests_needed = -(-len(post_ids) // INFO_BATCH_SIZE)
+    print(f"  📥 저장된 포스트 {len(post_ids)}개 → Reddit 요청 {requests_needed}번")
+    latest = fetch_engagement(post_ids)
+
+    changes = diff_engagement(stored, latest)
+    if not changes:
+        print(f"  ✅ 변경 없음 (조회 {len(latest)}개)")
+        return
+
+    updated = 0
+    for i in range(0, len(changes), UPDATE_CHUNK_SIZE):
+        if lease_lost():
+            print("  ⛔ 실행 임대를 잃어 갱신을 멈춥니다.")
+            break
+        result = supabase.rpc("update_post_engagement", {"p_rows": changes[i:i + UPDATE_CHUNK_SIZE]})
+        if result is None:
+            print("  ❌ 갱신 중단 (sql/migrate_v11.sql이 적용됐는지 확인하세요).")
+            break
+        updated += result
+    print(f"  💾 참여 지표 갱신 {updated}개 (조회 {len(latest)}개, 삭제/누락 {len(post_ids) - len(latest)}개)")
+    if updated:
+        # 바뀐 업보트/댓글 수를 서브레딧 활동량 집계에 반영
+        refresh_trend_views(["subreddit_activity"])
+
+
+if __name__ == "__main__":
+    if "--profile" in sys.argv:
+        from profiler import profile_call
+        profile_call(run_engagement_refresh, "reddit_engagement")
+    else:
+        run_engagement_refresh()
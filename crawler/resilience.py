@@ -0,0 +1,225 @@
+"""
+Resilience - The Info Club v2.0
+외부 서비스(Reddit, 번역기, OpenAI, Supabase, YouTube, pytrends)가 느려지거나 죽어도
+수집 실행이 제 시간 안에 끝나도록 하는 두 가지 도구입니다.
+- 실행 단위 마감 시간(run_budget): 남은 시간보다 긴 타임아웃을 쓰지 않고, 시간이 다 되면 수집을 멈춤
+- 서비스별 서킷 브레이커(get_breaker): 연속 실패 시 열려서 즉시 실패, 일정 시간 후 한 번 시험 호출로 복구
+
+마감 시간은 스레드별로 적용되므로 오케스트레이터에서 여러 작업이 동시에 돌아도 서로 섞이지 않습니다.
+작업 안에서 스레드 풀을 쓰면 inherit()로 감싸 같은 마감 시간을 물려줍니다.
+"""
+import os
+import time
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+# 연속 실패가 이 횟수에 도달하면 브레이커가 열림
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+# 열린 뒤 시험 호출을 허용하기까지 기다리는 시간 (초)
+RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_SECONDS", "60"))
+# 마감이 임박해도 요청 하나에 최소한 주는 타임아웃 (초)
+MIN_TIMEOUT = 2.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(Exception):
+    """브레이커가 열려 있어 호출하지 않고 바로 실패했을 때"""
+
+
+class CircuitBreaker:
+    """서비스 하나의 서킷 브레이커. 프로세스 안 모든 스레드가 공유합니다."""
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD, reset_timeout: float = RESET_TIMEOUT,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock          # 테스트에서 가짜 시계를 넣을 수 있도록
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.probe_started = 0.0
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """지금 호출해도 되는지. 반쯤 열린 상태에서는 시험 호출 하나만 통과시킵니다."""
+        with self.lock:
+            state = self._state()
+            if state == CLOSED:
+                return True
+            # 시험 호출 결과가 기록되지 않은 채 reset_timeout이 지나면 다시 한 번 허용
+            if state == HALF_OPEN and (not self.probing or self.clock() - self.probe_started >= self.reset_timeout):
+                self.probing = True
+                self.probe_started = self.clock()
+                return True
+            return False
+
+    def check(self):
+        """allow()가 False면 CircuitOpenError를 던집니다."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} circuit open")
+
+    def record_success(self):
+        with self.lock:
+            if self.opened_at is not None:
+                print(f"  🟢 [{self.name}] 서킷 브레이커 복구")
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or (self.opened_at is None and self.failures >= self.failure_threshold):
+                print(f"  🔴 [{self.name}] 서킷 브레이커 열림 (연속 실패 {self.failures}회, {self.reset_timeout:.0f}초 후 재시도)")
+                self.opened_at = self.clock()
+            self.probing = False
+
+    def record_status(self, status_code: int):
+        """HTTP 응답 기록: 5xx와 429는 서비스 장애로, 나머지(4xx 포함)는 정상 응답으로 봅니다."""
+        if status_code >= 500 or status_code == 429:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def call(self, func: Callable, *args, **kwargs):
+        """func를 호출하고 예외 여부로 성공/실패를 기록합니다."""
+        self.check()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """서비스 이름별로 프로세스 전체가 공유하는 브레이커 (처음 호출 시 생성)"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, str]:
+    with _breakers_lock:
+        return {name: breaker.state for name, breaker in _breakers.items()}
+
+
+# ---- 실행 마감 시간 ----
+
+_local = threading.local()
+
+
+class Deadline:
+    def __init__(self, seconds: float, name: str = "run", clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.seconds = seconds
+        self.clock = clock
+        self.ends_at = clock() + seconds
+
+    def remaining(self) -> float:
+        return self.ends_at - self.clock()
+
+
+@contextmanager
+def run_budget(seconds: float, name: str = "run", clock: Callable[[], float] = time.monotonic):
+    """with 블록 안(현재 스레드)의 외부 호출이 seconds 안에 끝나도록 마감 시간을 겁니다."""
+    previous = getattr(_local, "deadline", None)
+    _local.deadline = Deadline(seconds, name, clock)
+    try:
+        yield _local.deadline
+    finally:
+        _local.deadline = previous
+
+
+def budgeted(seconds: float, name: str = "run") -> Callable:
+    """함수 한 번의 실행 전체에 run_budget(seconds)를 거는 데코레이터 (crawler.run_crawler 등)"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with run_budget(seconds, name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_deadline() -> Optional[Deadline]:
+    return getattr(_local, "deadline", None)
+
+
+def inherit(func: Callable) -> Callable:
+    """현재 스레드의 마감 시간을 스레드 풀 작업에도 적용하도록 func를 감쌉니다."""
+    deadline = current_deadline()
+
+    def wrapper(*args, **kwargs):
+        previous = getattr(_local, "deadline", None)
+        _local.deadline = deadline
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _local.deadline = previous
+    return wrapper
+
+
+def remaining() -> Optional[float]:
+    """남은 시간 (초). 마감 시간이 없으면 None"""
+    deadline = current_deadline()
+    return deadline.remaining() if deadline else None
+
+
+def timeout(default: float) -> float:
+    """요청 타임아웃: 기본값과 남은 시간 중 짧은 쪽 (최소 MIN_TIMEOUT)"""
+    left = remaining()
+    if left is None:
+        return default
+    return max(min(default, left), MIN_TIMEOUT)
+
+
+def out_of_time(reserve: float = 0) -> bool:
+    """남은 시간이 reserve초 이하인지 (마무리 작업에 쓸 시간을 남겨 두고 수집을 멈출 때)"""
+    left = remaining()
+    return left is not None and left <= reserve
+
+
+def call_with_timeout(func: Callable, seconds: float, *args, **kwargs):
+    """
+    타임아웃 인자가 없는 라이브러리 호출(deep_translator 등)을 seconds 안에 끝내지 못하면 TimeoutError.
+    호출은 데몬 스레드에서 돌기 때문에 늦게 끝나도 프로세스 종료를 막지 않습니다.
+    """
+    result = {}
+
+    def target():
+        try:
+            result["value"] = func(*args, **kwargs)
+        except BaseException as e:
+            result["error"] = e
+
+    worker = threading.Thread(target=target, daemon=True)
+    worker.start()
+    worker.join(seconds)
+    if worker.is_alive():
+        raise TimeoutError(f"{getattr(func, '__name__', 'call')} timed out after {seconds:.0f}s")
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
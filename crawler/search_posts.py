@@ -0,0 +1,53 @@
+"""
+Post Search - The Info Club v2.0
+저장된 Reddit 포스트 전체(제목 + 원문 + AI 인사이트 + 한국어 번역)를 전문 검색합니다.
+검색은 Supabase의 search_posts RPC(sql/migrate_v14.sql, tsvector + GIN)가 처리하고 순위대로 상위 N개를 반환합니다.
+
+사용법:
+    python search_posts.py "RPM drop"
+    python search_posts.py "쇼츠 수익화" --limit 5
+    python search_posts.py "thumbnail" --subreddit NewTubers
+"""
+import sys
+import time
+import argparse
+from typing import Dict, List, Optional
+
+from supabase_client import get_client
+
+DEFAULT_LIMIT = 20
+
+
+def search(query: str, limit: int = DEFAULT_LIMIT, subreddit: Optional[str] = None) -> Optional[List[Dict]]:
+    """
+    query와 일치하는 포스트를 순위 순으로 반환합니다 (RPC 실패 시 None).
+    각 행에는 posts 컬럼 일부와 rank, headline(일치 부분 발췌, <<...>>로 강조)이 들어 있습니다.
+    """
+    args = {"p_query": query, "p_limit": limit}
+    if subreddit:
+        args["p_subreddit"] = subreddit
+    return get_client().rpc("search_posts", args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="저장된 포스트 전문 검색")
+    parser.add_argument("query")
+    parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT)
+    parser.add_argument("--subreddit")
+    args = parser.parse_args()
+
+    if not get_client().configured:
+        sys.exit("❌ Supabase credentials not set.")
+
+    started = time.perf_counter()
+    results = search(args.query, args.limit, args.subreddit)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    if results is None:
+        sys.exit("❌ 검색 실패 (sql/migrate_v14.sql이 적용됐는지 확인하세요).")
+
+    print(f"🔎 \"{args.query}\" → {len(results)}개 ({elapsed_ms:.0f}ms, 네트워크 포함)")
+    for i, row in enumerate(results, 1):
+        print(f"\n{i}. [{row['subreddit']}] {row['title']}  (⬆️ {row.get('upvotes') or 0}, rank {row['rank']:.3f})")
+        print(f"   {row['url']}")
+        if row.get("headline"):
+            print(f"   {' '.join(row['headline'].split())}")
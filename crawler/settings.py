@@ -0,0 +1,34 @@
+"""
+Settings - The Info Club v2.0
+모든 스크립트가 공유하는 환경 설정입니다. .env는 프로세스당 한 번, 이 모듈을 처음 import할 때만 읽습니다.
+"""
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+class Settings:
+    """
+    공통 자격 증명. 접근할 때마다 환경 변수를 읽으므로
+    실행 중 os.environ을 바꿔도(fake_postgrest 등) 그대로 반영됩니다.
+    """
+
+    @property
+    def supabase_url(self):
+        return os.getenv("SUPABASE_URL")
+
+    @property
+    def supabase_key(self):
+        return os.getenv("SUPABASE_KEY")
+
+    @property
+    def openai_api_key(self):
+        return os.getenv("OPENAI_API_KEY")
+
+    @property
+    def youtube_api_key(self):
+        return os.getenv("YOUTUBE_API_KEY")
+
+
+settings = Settings()
@@ -0,0 +1,318 @@
+"""
+Supabase Client - The Info Club v2.0
+모든 크롤러/분석 스크립트가 공유하는 PostgREST 클라이언트입니다.
+- keep-alive 커넥션 풀 (요청마다 TLS 핸드셰이크 없음)
+- 기본 타임아웃, 5xx/연결 오류 시 지수 백오프 재시도, gzip 응답
+  (응답을 못 받은 POST는 merge upsert만 다시 보냄: insert/RPC는 이미 반영됐을 수 있어 중복 위험)
+- 일괄 upsert/insert, 키셋 페이지네이션 select, 일괄 update/delete 헬퍼
+- 서킷 브레이커("supabase")와 실행 마감 시간에 맞춘 타임아웃 (resilience.py)
+"""
+import threading
+import requests
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from settings import settings
+import resilience
+
+DEFAULT_TIMEOUT = 30
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+POOL_SIZE = 10
+# 읽기 타임아웃/5xx 뒤에 다시 보내도 결과가 같은 메서드 (POST는 merge upsert만 별도 세션으로 재시도)
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PATCH", "DELETE"})
+
+# 한 요청에 담을 최대 행 수 (PostgREST 요청 본문 크기 제한 대비)
+UPSERT_CHUNK_SIZE = 500
+# in.(...) 필터 한 번에 넣을 최대 값 수 (URL 길이 제한 대비)
+IN_FILTER_CHUNK_SIZE = 200
+
+Params = Sequence[Tuple[str, str]]
+
+
+class SupabaseCircuitOpen(requests.ConnectionError):
+    """브레이커가 열려 요청을 보내지 않았을 때 (기존 RequestException 처리 경로를 그대로 탑니다)"""
+
+
+def quote_value(value) -> str:
+    """PostgREST 논리식(or/and/in) 안에 넣을 값을 큰따옴표로 감쌉니다."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_filter(columns: Sequence[str], values: Sequence) -> str:
+    """
+    (columns) > (values) 를 PostgREST or 필터로 만듭니다 (모든 컬럼 오름차순 기준).
+    예: (created_at, id) → (created_at.gt.v1,and(created_at.eq.v1,id.gt.v2))
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        conditions = [f"{c}.eq.{quote_value(v)}" for c, v in zip(columns[:i], values[:i])]
+        conditions.append(f"{column}.gt.{quote_value(values[i])}")
+        clauses.append(f"and({','.join(conditions)})" if len(conditions) > 1 else conditions[0])
+    return f"({','.join(clauses)})"
+
+
+def to_params(filters) -> List[Tuple[str, str]]:
+    """dict 또는 (키, 값) 리스트 필터를 requests params 형식으로 맞춥니다 (같은 키 반복 허용)."""
+    if not filters:
+        return []
+    items = filters.items() if isinstance(filters, dict) else filters
+    return [(key, str(value)) for key, value in items]
+
+
+class SupabaseClient:
+    """PostgREST REST API용 공유 클라이언트. 스레드 간 공유해도 됩니다."""
+
+    def __init__(self, url: Optional[str] = None, key: Optional[str] = None,
+                 timeout: float = DEFAULT_TIMEOUT, retries: int = MAX_RETRIES, pool_size: int = POOL_SIZE):
+        self.url = (url or settings.supabase_url or "").rstrip("/")
+        self.key = key or settings.supabase_key
+        self.timeout = timeout
+
+        # 연결 실패(요청이 서버에 닿지 않음)는 모든 메서드를 재시도하고,
+        # 읽기 타임아웃/5xx는 IDEMPOTENT_METHODS만 재시도합니다. 일반 insert나 RPC를 다시 보내면
+        # 느리게 커밋된 첫 요청과 합쳐 행이 두 번 들어갈 수 있기 때문입니다.
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=retries,
+            status=retries,
+            backoff_factor=BACKOFF_FACTOR,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=IDEMPOTENT_METHODS,
+            raise_on_status=False
+        )
+        self.session = self._make_session(retry, pool_size)
+        # merge upsert(on_conflict + merge-duplicates)는 다시 보내도 같은 행을 덮어쓰므로 POST도 재시도
+        self.upsert_session = self._make_session(retry.new(allowed_methods=None), pool_size)
+
+    def _make_session(self, retry: Retry, pool_size: int) -> requests.Session:
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            "apikey": self.key or "",
+            "Authorization": f"Bearer {self.key}",
+            "Content-Type": "application/json",
+            "Accept-Encoding": "gzip, deflate",
+        })
+        return session
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.url and self.key)
+
+    def request(self, method: str, table: str, params=None, json=None, prefer: Optional[str] = None,
+                headers: Optional[Dict] = None, timeout: Optional[float] = None,
+                idempotent: bool = False) -> requests.Response:
+        """
+        테이블 엔드포인트에 요청을 보냅니다. 재시도 후에도 연결이 안 되면 requests 예외가 발생합니다.
+        연속 장애로 브레이커가 열려 있으면 네트워크 없이 SupabaseCircuitOpen을 던집니다.
+        idempotent=True는 다시 보내도 안전한 POST(merge upsert)로, 읽기 타임아웃/5xx 뒤에도 재시도합니다.
+        """
+        extra = dict(headers or {})
+        if prefer:
+            extra["Prefer"] = prefer
+        breaker = resilience.get_breaker("supabase")
+        if not breaker.allow():
+            raise SupabaseCircuitOpen("supabase circuit open")
+        try:
+            session = self.upsert_session if idempotent else self.session
+            resp = session.request(
+                method,
+                f"{self.url}/rest/v1/{table}",
+                params=to_params(params),
+                json=json,
+                headers=extra,
+                timeout=resilience.timeout(timeout or self.timeout)
+            )
+        except requests.RequestException:
+            breaker.record_failure()
+            raise
+        breaker.record_status(resp.status_code)
+        return resp
+
+    def select(self, table: str, params=None) -> List[Dict]:
+        """조회 결과 행 리스트를 반환합니다 (실패 시 빈 리스트)."""
+        try:
+            resp = self.request("GET", table, params=params)
+        except requests.RequestException as e:
+            print(f"  ❌ Supabase 조회 오류 ({table}): {e}")
+            return []
+        if resp.status_code != 200:
+            print(f"  ❌ Supabase 조회 실패 ({table}): {resp.status_code} - {resp.text[:200]}")
+            return []
+        return resp.json()
+
+    def rpc(self, function: str, args: Optional[Dict] = None, timeout: Optional[float] = None):
+        """Postgres 함수(/rpc/...)를 호출하고 JSON 결과를 반환합니다 (실패 시 None)."""
+        try:
+            resp = self.request("POST", f"rpc/{function}", json=args or {}, timeout=timeout)
+        except requests.RequestException as e:
+            print(f"  ❌ Supabase RPC 오류 ({function}): {e}")
+            return None
+        if resp.status_code not in range(200, 300):
+            print(f"  ❌ Supabase RPC 실패 ({function}): {resp.status_code} - {resp.text[:200]}")
+            return None
+        return resp.json() if resp.content else []
+
+    def iter_select(self, table: str, select: str, filters=None, order: Sequence[str] = ("id",),
+                    page_size: int = 1000, limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        order 컬럼들(오름차순, 마지막은 고유해야 함) 기준 키셋 페이지네이션으로 행을 하나씩 yield합니다.
+        offset과 달리 깊은 페이지도 인덱스 탐색 한 번으로 읽습니다.
+        """
+        columns = list(order)
+        select_columns = select.split(",")
+        for column in reversed(columns):
+            if column not in select_columns:
+                select = f"{column},{select}"
+
+        cursor = None
+        fetched = 0
+        while limit is None or fetched < limit:
+            size = page_size if limit is None else min(page_size, limit - fetched)
+            params = to_params(filters) + [
+                ("select", select),
+                ("order", ",".join(f"{c}.asc" for c in columns)),
+                ("limit", str(size)),
+            ]
+            if cursor is not None:
+                params.append(("or", keyset_filter(columns, cursor)))
+
+            try:
+                resp = self.request("GET", table, params=params)
+            except requests.RequestException as e:
+                print(f"  ❌ Supabase 조회 오류 ({table}): {e}")
+                return
+            if resp.status_code != 200:
+                print(f"  ❌ Supabase 조회 실패 ({table}): {resp.status_code} - {resp.text[:200]}")
+                return
+
+            page = resp.json()
+            yield from page
+            fetched += len(page)
+            if len(page) < size:
+                return
+            cursor = [page[-1][c] for c in columns]
+
+    def upsert(self, table: str, rows: List[Dict], on_conflict: str,
+               chunk_size: int = UPSERT_CHUNK_SIZE) -> Tuple[int, List[Tuple[Dict, str]]]:
+        """
+        rows를 on_conflict 기준 merge upsert로 일괄 저장합니다.
+        chunk마다 요청 1회이며, 실패한 chunk는 절반씩 나눠 다시 시도해 문제 행만 골라냅니다.
+
+        Returns:
+            (저장된 행 수, [(실패한 행, 오류 메시지)])
+        """
+        return self._write_chunks(table, rows, chunk_size, {"on_conflict": on_conflict},
+                                  "resolution=merge-duplicates,return=minimal", idempotent=True)
+
+    def insert(self, table: str, rows: List[Dict],
+               chunk_size: int = UPSERT_CHUNK_SIZE) -> Tuple[int, List[Tuple[Dict, str]]]:
+        """rows를 일괄 INSERT합니다 (append-only 테이블용). 반환값은 upsert와 같습니다."""
+        return self._write_chunks(table, rows, chunk_size, None, "return=minimal", idempotent=False)
+
+    def update(self, table: str, values: Dict, filters) -> bool:
+        """filters에 맞는 행들을 values로 한 번에 PATCH합니다."""
+        try:
+            resp = self.request("PATCH", table, params=filters, json=values, prefer="return=minimal")
+        except requests.RequestException as e:
+            print(f"  ❌ Supabase 수정 오류 ({table}): {e}")
+            return False
+        if resp.status_code not in range(200, 300):
+            print(f"  ❌ Supabase 수정 실패 ({table}): {resp.status_code} - {resp.text[:200]}")
+            return False
+        return True
+
+    def update_in(self, table: str, values: Dict, column: str, keys: Sequence,
+                  chunk_size: int = IN_FILTER_CHUNK_SIZE) -> int:
+        """column 값이 keys에 포함된 행들을 in.(...) 필터 묶음으로 PATCH합니다. 성공한 키 수를 반환합니다."""
+        updated = 0
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            if self.update(table, values, {column: f"in.({','.join(quote_value(k) for k in chunk)})"}):
+                updated += len(chunk)
+        return updated
+
+    def delete(self, table: str, filters) -> bool:
+        """filters에 맞는 행들을 DELETE합니다. 필터 없는 전체 삭제는 허용하지 않습니다."""
+        if not filters:
+            raise ValueError("delete()에는 최소 하나의 필터가 필요합니다.")
+        try:
+            resp = self.request("DELETE", table, params=filters, prefer="return=minimal")
+        except requests.RequestException as e:
+            print(f"  ❌ Supabase 삭제 오류 ({table}): {e}")
+            return False
+        if resp.status_code not in range(200, 300):
+            print(f"  ❌ Supabase 삭제 실패 ({table}): {resp.status_code} - {resp.text[:200]}")
+            return False
+        return True
+
+    def delete_in(self, table: str, column: str, keys: Sequence, chunk_size: int = IN_FILTER_CHUNK_SIZE) -> int:
+        """column 값이 keys에 포함된 행들을 묶음 단위로 삭제합니다. 성공한 키 수를 반환합니다."""
+        deleted = 0
+        for i in range(0, len(keys), chunk_size):
+            chunk = keys[i:i + chunk_size]
+            if self.delete(table, {column: f"in.({','.join(quote_value(k) for k in chunk)})"}):
+                deleted += len(chunk)
+        return deleted
+
+    def _write_chunks(self, table, rows, chunk_size, params, prefer, idempotent):
+        saved = 0
+        errors = []
+        for i in range(0, len(rows), chunk_size):
+            saved += self._write_bisect(table, rows[i:i + chunk_size], params, prefer, idempotent, errors)
+        return saved, errors
+
+    def _write_bisect(self, table, rows, params, prefer, idempotent, errors):
+        try:
+            resp = self.request("POST", table, params=params, json=rows, prefer=prefer, idempotent=idempotent)
+            if resp.status_code in range(200, 300):
+                return len(rows)
+            error = f"{resp.status_code} - {resp.text[:200]}"
+        except SupabaseCircuitOpen as e:
+            # 행 문제가 아니므로 나눠 보내지 않고 묶음 전체를 실패로 돌려줍니다.
+            errors.extend((row, str(e)) for row in rows)
+            return 0
+        except requests.RequestException as e:
+            if not idempotent:
+                # 응답을 못 받은 insert는 이미 커밋됐을 수 있으므로 나눠서 다시 보내지 않습니다.
+                errors.extend((row, str(e)) for row in rows)
+                return 0
+            error = str(e)
+
+        if len(rows) == 1:
+            errors.append((rows[0], error))
+            return 0
+
+        mid = len(rows) // 2
+        return (self._write_bisect(table, rows[:mid], params, prefer, idempotent, errors)
+                + self._write_bisect(table, rows[mid:], params, prefer, idempotent, errors))
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> SupabaseClient:
+    """프로세스 전체가 공유하는 클라이언트 (처음 호출 시 생성)"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = SupabaseClient()
+        return _client
+
+
+def refresh_trend_views(views: Optional[Sequence[str]] = None) -> bool:
+    """
+    서버 측 집계 머티리얼라이즈드 뷰를 REFRESH ... CONCURRENTLY로 갱신합니다 (sql/migrate_v9.sql).
+    갱신 중에도 읽기는 막히지 않습니다. views가 None이면 전체를 갱신합니다.
+    """
+    refreshed = get_client().rpc("refresh_trend_views", {"p_views": list(views) if views else None}, timeout=120)
+    if refreshed is None:
+        return False
+    print(f"  🔄 집계 뷰 갱신: {', '.join(refreshed)}")
+    return True
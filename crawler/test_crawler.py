@@ -1,10 +1,10 @@
-import requests
 import re
 import html
 from crawler import MIN_CONTENT_LENGTH, MIN_CHAR_DIVERSITY, SPAM_KEYWORDS, QUESTION_BLACKLIST, MIN_UPVOTES_REQUIRED, YOUTUBE_RELEVANT_KEYWORDS
 from crawler import clean_html, is_youtube_relevant, validate_post
 
 def run_debug():
+    import requests
     url = "https://www.reddit.com/r/PartneredYoutube/top.json?t=month&limit=50"
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/120.0'}
     resp = requests.get(url, headers=headers)
@@ -0,0 +1,109 @@
+"""job_lease.py 임대 획득/연장/분실 처리를 확인합니다."""
+import pytest
+
+import job_lease
+from job_lease import JobLease, exclusive, lease_lost
+
+
+class ScriptedClient:
+    """RPC 결과를 함수 이름별로 정해 두는 클라이언트 (None은 요청 실패)"""
+    configured = True
+
+    def __init__(self, **results):
+        self.results = results
+        self.calls = []
+
+    def rpc(self, function, args, timeout=None):
+        self.calls.append(function)
+        return self.results.get(function)
+
+
+def held_lease(clock, **results):
+    lease = JobLease("test", ttl=300, client=ScriptedClient(acquire_job_lease=True, **results), clock=clock)
+    lease._start_heartbeat = lambda: None       # 연장은 테스트에서 직접 호출
+    assert lease.acquire()
+    return lease
+
+
+def test_failed_renewals_within_ttl_keep_the_lease(clock):
+    lease = held_lease(clock, renew_job_lease=None)
+    for _ in range(2):
+        clock.advance(100)
+        assert lease.renew()
+    assert not lease.lost
+
+
+def test_failed_renewals_past_ttl_lose_the_lease(clock):
+    lease = held_lease(clock, renew_job_lease=None)
+    for _ in range(2):
+        clock.advance(100)
+        lease.renew()
+    clock.advance(100)
+    assert not lease.renew()
+    assert lease.lost
+
+
+def test_successful_renewal_restarts_the_ttl(clock):
+    lease = held_lease(clock, renew_job_lease=None)
+    clock.advance(250)
+    lease.client.results["renew_job_lease"] = True
+    assert lease.renew()
+    lease.client.results["renew_job_lease"] = None
+    clock.advance(250)
+    assert lease.renew()
+    clock.advance(50)
+    assert not lease.renew()
+
+
+def test_rejected_renewal_loses_the_lease_immediately(clock):
+    lease = held_lease(clock, renew_job_lease=False)
+    assert not lease.renew()
+    assert lease.lost
+
+
+def test_unverifiable_acquire_proceeds_by_default(clock):
+    lease = JobLease("test", client=ScriptedClient(), clock=clock)
+    assert lease.acquire()
+    assert lease.unverified and not lease.held
+
+
+def test_unverifiable_acquire_skips_when_required(monkeypatch):
+    monkeypatch.setattr(job_lease, "LEASE_REQUIRED", True)
+    calls = []
+
+    @exclusive("required")
+    def run():
+        calls.append(1)
+
+    monkeypatch.setattr(job_lease.JobLease, "_rpc", lambda self, function, args: None)
+    assert run() is None
+    assert calls == []
+
+
+def test_exclusive_runs_once_per_job_against_fake_server(client):
+    other = JobLease("reddit", client=client)
+    assert other.acquire(wait=0)
+
+    calls = []
+
+    @exclusive("reddit")
+    def run():
+        calls.append(lease_lost())
+        return "done"
+
+    assert run() is None
+    other.release()
+    assert run() == "done"
+    assert calls == [False]
+    assert client.select("job_leases", {"select": "job"}) == []
+
+
+def test_lease_taken_over_on_server_is_reported_lost(client):
+    lease = JobLease("reddit", client=client)
+    assert lease.acquire(wait=0)
+    lease._stop.set()       # 백그라운드 연장 대신 직접 호출
+    client.delete("job_leases", {"job": "eq.reddit"})
+    assert client.rpc("acquire_job_lease", {"p_job": "reddit", "p_holder": "someone-else", "p_ttl_seconds": 300})
+
+    assert not lease.renew()
+    assert lease.lost
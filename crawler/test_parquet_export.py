@@ -0,0 +1,30 @@
+"""parquet_export.py 증분 내보내기를 fake_postgrest.py 서버로 확인합니다."""
+import time
+
+import parquet_export
+
+
+def test_posts_changed_without_crawled_at_are_exported_again(client, tmp_path):
+    export_dir = str(tmp_path)
+    client.insert("posts", [
+        {"post_id": f"p{i}", "upvotes": i, "crawled_at": "2026-10-01T00:00:00+00:00"} for i in range(3)
+    ])
+    assert parquet_export.export_table("posts", client, export_dir) == 3
+    assert parquet_export.export_table("posts", client, export_dir) == 0
+
+    time.sleep(0.01)   # updated_at은 밀리초 단위
+    # 참여도 갱신 RPC는 crawled_at을 건드리지 않습니다.
+    assert client.rpc("update_post_engagement", {"p_rows": [{"post_id": "p1", "upvotes": 50}]}) == 1
+
+    assert parquet_export.export_table("posts", client, export_dir) == 1
+    posts = parquet_export.load("posts", ["post_id", "upvotes"], export_dir=export_dir)
+    assert dict(zip(posts["post_id"], posts["upvotes"])) == {"p0": 0, "p1": 50, "p2": 2}
+
+
+def test_changed_watermark_column_restarts_export(client, tmp_path):
+    export_dir = str(tmp_path)
+    parquet_export.save_watermarks({"posts": {"columns": ["crawled_at", "id"], "values": ["2999-01-01T00:00:00+00:00", 1]}}, export_dir)
+    client.insert("posts", [{"post_id": "p0", "crawled_at": "2026-10-01T00:00:00+00:00"}])
+
+    assert parquet_export.export_table("posts", client, export_dir) == 1
+    assert parquet_export.load_watermarks(export_dir)["posts"]["columns"] == ["updated_at", "id"]
@@ -0,0 +1,179 @@
+"""resilience.py 서킷 브레이커와 실행 마감 시간을 가짜 시계로 확인합니다."""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import resilience
+from resilience import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_threshold=3, reset_timeout=60, clock=clock)
+
+
+def test_breaker_opens_after_consecutive_failures(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_lets_a_single_probe_through(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+
+    clock.advance(59.9)
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+    clock.advance(0.1)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()      # 시험 호출이 끝나기 전에는 하나만
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_for_a_full_reset_timeout(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(60)
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.advance(59)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert breaker.allow()
+
+
+def test_probe_without_result_is_retried_after_reset_timeout(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(60)
+    assert breaker.allow()
+
+    clock.advance(30)
+    assert not breaker.allow()
+    clock.advance(30)
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize("status, counts_as_failure", [
+    (200, False), (204, False), (400, False), (404, False), (409, False),
+    (429, True), (500, True), (502, True), (503, True),
+])
+def test_record_status_classifies_http_responses(breaker, status, counts_as_failure):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_status(status)
+    assert breaker.state == (OPEN if counts_as_failure else CLOSED)
+
+
+def test_call_records_exceptions_as_failures(breaker):
+    def boom():
+        raise ValueError("boom")
+
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            breaker.call(boom)
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "not called")
+
+
+def test_get_breaker_is_shared_per_name():
+    assert resilience.get_breaker("reddit") is resilience.get_breaker("reddit")
+    assert resilience.get_breaker("reddit") is not resilience.get_breaker("youtube")
+
+
+def test_without_budget_nothing_is_limited():
+    assert resilience.current_deadline() is None
+    assert resilience.remaining() is None
+    assert resilience.timeout(30) == 30
+    assert not resilience.out_of_time(10_000)
+
+
+def test_budget_caps_timeouts_and_reports_out_of_time(clock):
+    with resilience.run_budget(100, "test", clock=clock):
+        assert resilience.timeout(30) == 30
+        assert not resilience.out_of_time(60)
+
+        clock.advance(50)
+        assert resilience.timeout(30) == 30
+        assert resilience.out_of_time(60)
+
+        clock.advance(40)
+        assert resilience.timeout(30) == 10
+        clock.advance(9)
+        assert resilience.timeout(30) == resilience.MIN_TIMEOUT
+        clock.advance(5)
+        assert resilience.remaining() == -4
+        assert resilience.out_of_time()
+    assert resilience.current_deadline() is None
+
+
+def test_nested_budget_restores_outer_deadline(clock):
+    with resilience.run_budget(100, "outer", clock=clock) as outer:
+        with resilience.run_budget(10, "inner", clock=clock):
+            assert resilience.current_deadline().name == "inner"
+        assert resilience.current_deadline() is outer
+
+
+def test_budget_is_thread_local_unless_inherited(clock):
+    with resilience.run_budget(100, "job", clock=clock) as deadline:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            plain = pool.submit(resilience.current_deadline).result()
+            inherited = list(pool.map(resilience.inherit(lambda _: resilience.current_deadline()), range(2)))
+            # 작업이 끝나면 작업자 스레드의 원래 값(None)으로 돌아갑니다.
+            after = pool.submit(resilience.current_deadline).result()
+
+    assert plain is None
+    assert inherited == [deadline, deadline]
+    assert after is None
+
+
+def test_budgets_in_concurrent_jobs_do_not_mix(clock):
+    seen = {}
+    ready = threading.Barrier(2)
+
+    def job(name, seconds):
+        with resilience.run_budget(seconds, name, clock=clock):
+            ready.wait()
+            seen[name] = resilience.remaining()
+
+    threads = [threading.Thread(target=job, args=("short", 10)), threading.Thread(target=job, args=("long", 500))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert seen == {"short": 10, "long": 500}
+
+
+def test_budgeted_decorator_applies_budget_per_call():
+    @resilience.budgeted(100, "decorated")
+    def run():
+        return resilience.current_deadline().name, resilience.current_deadline().seconds
+
+    assert run() == ("decorated", 100)
+    assert resilience.current_deadline() is None
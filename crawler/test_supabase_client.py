@@ -0,0 +1,155 @@
+"""supabase_client.py를 fake_postgrest.py 서버에 붙여 실제 HTTP 경로로 확인합니다."""
+import pytest
+import requests
+
+import supabase_client
+from fake_postgrest import FakePostgREST
+
+
+def rows_by_key(client, table, key="post_id"):
+    return {row[key]: row for row in client.select(table, {"select": "*"})}
+
+
+def test_upsert_merges_on_conflict_column(client):
+    saved, errors = client.upsert("posts", [
+        {"post_id": "a", "title": "first", "upvotes": 1},
+        {"post_id": "b", "title": "second", "upvotes": 2},
+    ], on_conflict="post_id")
+    assert (saved, errors) == (2, [])
+
+    # 보내지 않은 컬럼(title)은 그대로 두고, 보낸 컬럼만 갱신 + 새 키는 추가
+    saved, errors = client.upsert("posts", [
+        {"post_id": "a", "upvotes": 10},
+        {"post_id": "c", "upvotes": 3},
+    ], on_conflict="post_id")
+    assert (saved, errors) == (2, [])
+
+    posts = rows_by_key(client, "posts")
+    assert sorted(posts) == ["a", "b", "c"]
+    assert posts["a"]["upvotes"] == 10
+    assert posts["a"]["title"] == "first"
+    assert posts["b"]["upvotes"] == 2
+
+
+def test_upsert_bisects_failed_chunk_down_to_bad_row(client, fake):
+    rows = [{"post_id": f"p{i}", "upvotes": i} for i in range(16)]
+    rows[11] = {"post_id": "p11", "bad-column": 1}     # 잘못된 식별자 → 400
+
+    saved, errors = client.upsert("posts", rows, on_conflict="post_id")
+
+    assert saved == 15
+    assert [row["post_id"] for row, _ in errors] == ["p11"]
+    assert errors[0][1].startswith("400")
+    assert sorted(rows_by_key(client, "posts")) == sorted(f"p{i}" for i in range(16) if i != 11)
+    # 16 → 8 → 4 → 2 → 1: 실패한 절반만 계속 나누므로 1 + 2 * 4번
+    assert fake.requests <= 1 + 2 * 4 + 1
+
+
+def test_upsert_chunks_large_batches(client, fake):
+    rows = [{"post_id": f"p{i}"} for i in range(25)]
+    saved, errors = client.upsert("posts", rows, on_conflict="post_id", chunk_size=10)
+    assert (saved, errors) == (25, [])
+    assert fake.requests == 3
+
+
+def test_iter_select_keyset_pages_across_duplicate_sort_keys(client):
+    # created_at이 5개 값만 가지므로 페이지 경계가 같은 created_at 묶음 한가운데에 걸립니다.
+    rows = [{"post_id": f"p{i:02d}", "created_at": f"2026-01-0{1 + i % 5}T00:00:00"} for i in range(23)]
+    client.insert("posts", rows)
+
+    seen = list(client.iter_select("posts", "post_id", order=("created_at", "id"), page_size=4))
+
+    assert len(seen) == 23
+    assert len({row["post_id"] for row in seen}) == 23
+    keys = [(row["created_at"], row["id"]) for row in seen]
+    assert keys == sorted(keys)
+
+
+def test_iter_select_applies_filters_and_limit(client):
+    client.insert("posts", [{"post_id": f"p{i}", "subreddit": "a" if i % 2 else "b"} for i in range(10)])
+
+    seen = list(client.iter_select("posts", "post_id,subreddit", filters={"subreddit": "eq.a"}, page_size=2, limit=3))
+
+    assert len(seen) == 3
+    assert {row["subreddit"] for row in seen} == {"a"}
+
+
+def test_update_and_delete_only_touch_filtered_rows(client):
+    client.insert("posts", [{"post_id": f"p{i}", "subreddit": "a" if i < 3 else "b", "upvotes": 0} for i in range(6)])
+
+    assert client.update("posts", {"upvotes": 5}, {"subreddit": "eq.a"})
+    assert client.update_in("posts", {"upvotes": 9}, "post_id", ["p4", "p5"], chunk_size=1) == 2
+    upvotes = {key: row["upvotes"] for key, row in rows_by_key(client, "posts").items()}
+    assert upvotes == {"p0": 5, "p1": 5, "p2": 5, "p3": 0, "p4": 9, "p5": 9}
+
+    assert client.delete("posts", {"upvotes": "gte.9"})
+    assert client.delete_in("posts", "post_id", ["p0", "p1"]) == 2
+    assert sorted(rows_by_key(client, "posts")) == ["p2", "p3"]
+
+
+@pytest.mark.parametrize("filters", [None, {}, []])
+def test_delete_refuses_to_run_without_filter(client, fake, filters):
+    client.insert("posts", [{"post_id": "a"}])
+    requests_before = fake.requests
+
+    with pytest.raises(ValueError):
+        client.delete("posts", filters)
+
+    assert fake.requests == requests_before
+    assert sorted(rows_by_key(client, "posts")) == ["a"]
+
+
+def test_rpc_job_lease_is_exclusive_until_released(client):
+    lease = {"p_job": "reddit", "p_ttl_seconds": 60}
+    assert client.rpc("acquire_job_lease", {**lease, "p_holder": "one"}) is True
+    assert client.rpc("acquire_job_lease", {**lease, "p_holder": "two"}) is False
+    assert client.rpc("renew_job_lease", {**lease, "p_holder": "two"}) is False
+    assert client.rpc("renew_job_lease", {**lease, "p_holder": "one"}) is True
+    assert client.rpc("release_job_lease", {"p_job": "reddit", "p_holder": "one"}) is True
+    assert client.rpc("acquire_job_lease", {**lease, "p_holder": "two"}) is True
+
+
+def test_rpc_batch_update_functions(client):
+    client.insert("posts", [{"post_id": "a", "upvotes": 1, "comment_count": 2, "content_original": "body"}])
+
+    assert client.rpc("update_post_engagement", {"p_rows": [{"post_id": "a", "upvotes": 7}, {"post_id": "zz", "upvotes": 1}]}) == 1
+    assert client.rpc("mark_comments_synced", {"p_rows": [{"post_id": "a", "comments_synced_count": 4}]}) == 1
+    assert client.rpc("store_post_translations", {"p_rows": [{"post_id": "a", "content_ko": "본문", "preview": "본문"}]}) == 1
+
+    post = rows_by_key(client, "posts")["a"]
+    assert (post["upvotes"], post["comment_count"], post["comments_synced_count"]) == (7, 4, 4)
+    assert (post["content_ko"], post["preview"]) == ("본문", "본문")
+
+
+def test_unknown_rpc_fails(client):
+    assert client.rpc("no_such_function", {}) is None
+    assert client.rpc("renew_job_lease", {"p_job": "x"}) is None
+
+
+@pytest.mark.parametrize("call, expected_requests", [
+    (lambda c: c.select("posts", {"select": "*"}), 3),
+    (lambda c: c.upsert("posts", [{"post_id": "a"}], on_conflict="post_id"), 3),
+    (lambda c: c.update("posts", {"upvotes": 1}, {"post_id": "eq.a"}), 3),
+    (lambda c: c.insert("posts", [{"post_id": "a"}]), 1),
+    (lambda c: c.rpc("update_post_engagement", {"p_rows": []}), 1),
+])
+def test_only_idempotent_requests_are_retried_after_5xx(monkeypatch, call, expected_requests):
+    monkeypatch.setattr(supabase_client, "BACKOFF_FACTOR", 0)
+    with FakePostgREST(error_rate=1.0) as failing:
+        call(supabase_client.SupabaseClient(url=failing.url, key="fake-key", retries=2))
+        assert failing.requests == expected_requests
+
+
+def test_insert_is_not_resent_after_read_timeout(client, monkeypatch):
+    sent = []
+
+    def timing_out(*args, **kwargs):
+        sent.append(kwargs["json"])
+        raise requests.ReadTimeout("read timed out")
+
+    monkeypatch.setattr(client.session, "request", timing_out)
+    saved, errors = client.insert("youtube_video_snapshots", [{"video_id": str(i)} for i in range(8)])
+
+    assert saved == 0
+    assert len(errors) == 8
+    assert len(sent) == 1
@@ -0,0 +1,64 @@
+"""weekly_report_generator.py 포스트 조회를 fake_postgrest.py 서버로 확인합니다."""
+from datetime import datetime
+
+import pytest
+
+import fake_postgrest
+import weekly_report_generator
+from weekly_report_generator import FALLBACK_COLUMNS, PROMPT_COLUMNS, format_posts_for_prompt, iter_posts
+
+START = datetime(2026, 10, 1)
+
+
+@pytest.fixture(autouse=True)
+def reset_prompt_columns(monkeypatch):
+    monkeypatch.setattr(weekly_report_generator, "_prompt_columns", None)
+
+
+@pytest.fixture
+def posts(client):
+    client.insert("posts", [
+        {"post_id": "a", "subreddit": "NewTubers", "title": "long", "content": "x" * 2000,
+         "upvotes": 10, "upvote_ratio": 0.9, "comment_count": 2, "ai_insight": "",
+         "top_comments": [{"ups": 5, "body": "saved at crawl"}], "created_at": "2026-10-02T00:00:00"},
+        {"post_id": "b", "subreddit": "YouTubers", "title": "short", "content": None,
+         "upvotes": 1, "upvote_ratio": 1.0, "comment_count": 0, "ai_insight": "",
+         "top_comments": [], "created_at": "2026-10-03T00:00:00"},
+    ])
+    return client
+
+
+def test_embedded_select_returns_top_comments(posts):
+    post_id = {row["post_id"]: row["id"] for row in posts.select("posts", {"select": "id,post_id"})}["a"]
+    posts.insert("comments", [{"post_id": post_id, "author": f"u{ups}", "ups": ups, "content": f"c{ups}"} for ups in range(5)])
+
+    rows = list(iter_posts(START))
+
+    assert weekly_report_generator._prompt_columns == PROMPT_COLUMNS
+    assert [row["post_id"] for row in rows] == ["a", "b"]
+    assert [c["ups"] for c in rows[0]["comments"]] == [4, 3, 2]
+    assert len(rows[0]["content"]) == weekly_report_generator.CONTENT_HEAD_CHARS
+
+
+def test_falls_back_to_plain_columns_without_comments_relationship(posts, monkeypatch):
+    # migrate_v12.sql 미적용 DB: posts ↔ comments 관계가 없어 임베딩 select가 400
+    monkeypatch.delitem(fake_postgrest.EMBEDDED_RESOURCES, ("posts", "comments"))
+
+    rows = list(iter_posts(START))
+
+    assert weekly_report_generator._prompt_columns == FALLBACK_COLUMNS
+    assert [row["post_id"] for row in rows] == ["a", "b"]
+    assert "comments" not in rows[0]
+    assert len(rows[0]["content"]) == weekly_report_generator.CONTENT_HEAD_CHARS
+    assert rows[1]["content"] == ""
+
+    prompt, count = format_posts_for_prompt(rows)
+    assert count == 2
+    assert "saved at crawl" in prompt
+
+
+def test_other_selects_are_left_alone(posts, monkeypatch):
+    monkeypatch.delitem(fake_postgrest.EMBEDDED_RESOURCES, ("posts", "comments"))
+
+    assert [row["post_id"] for row in iter_posts(START, select="post_id")] == ["a", "b"]
+    assert weekly_report_generator._prompt_columns is None
@@ -0,0 +1,104 @@
+"""write_buffer.py 아웃박스를 fake_postgrest.py 서버에 플러시해 확인합니다."""
+import shutil
+
+import pytest
+
+import resilience
+import supabase_client
+import write_buffer
+from fake_postgrest import FakePostgREST
+from write_buffer import WriteBuffer
+
+
+@pytest.fixture
+def buffer(tmp_path, client):
+    buffer = WriteBuffer(str(tmp_path / "buffer.sqlite3"), client=client)
+    yield buffer
+    buffer.close()
+
+
+def stored(client, table="posts"):
+    return {row["post_id"]: row for row in client.select(table, {"select": "*"})}
+
+
+def outbox(buffer):
+    return buffer.conn.execute("SELECT row_key, status, attempts FROM outbox ORDER BY seq").fetchall()
+
+
+def test_same_key_with_different_columns_is_merged_in_seq_order(buffer, client):
+    buffer.put("posts", {"post_id": "a", "title": "old", "ai_insight": "insight"}, on_conflict="post_id")
+    buffer.put("posts", {"post_id": "a", "title": "new", "upvotes": 5}, on_conflict="post_id")
+    buffer.put("posts", {"post_id": "b", "title": "other"}, on_conflict="post_id")
+
+    assert buffer.flush() == 2
+
+    posts = stored(client)
+    assert (posts["a"]["title"], posts["a"]["ai_insight"], posts["a"]["upvotes"]) == ("new", "insight", 5)
+    assert posts["b"]["title"] == "other"
+    assert buffer.pending() == 0
+    marks = {entry["table"]: entry for entry in buffer.status()}
+    assert marks["posts"]["flushed_seq"] == 3
+
+
+def test_rejected_row_is_dead_lettered_after_max_attempts(buffer, client):
+    buffer.put("posts", {"post_id": "bad", "bad-column": 1}, on_conflict="post_id")
+    buffer.put("posts", {"post_id": "good"}, on_conflict="post_id")
+
+    # 거부된 행과 다른 컬럼 묶음의 행은 같은 플러시에서 저장됩니다.
+    assert buffer.flush() == 1
+    assert outbox(buffer) == [('["bad"]', "pending", 1)]
+    for attempt in range(2, write_buffer.MAX_ATTEMPTS):
+        buffer.flush()
+        assert outbox(buffer) == [('["bad"]', "pending", attempt)]
+
+    buffer.flush()
+    assert outbox(buffer) == [('["bad"]', "dead", write_buffer.MAX_ATTEMPTS)]
+    assert buffer.pending() == 0
+    assert sorted(stored(client)) == ["good"]
+
+    # dead 행은 더 보내지 않습니다.
+    assert buffer.flush() == 0
+
+
+def test_outage_keeps_rows_queued_without_counting_attempts(tmp_path, monkeypatch):
+    monkeypatch.setattr(supabase_client, "BACKOFF_FACTOR", 0)
+    path = str(tmp_path / "buffer.sqlite3")
+    rows = [{"post_id": f"p{i}", "title": f"t{i}"} for i in range(3)]
+
+    with FakePostgREST(error_rate=1.0) as down:
+        buffer = WriteBuffer(path, client=supabase_client.SupabaseClient(url=down.url, key="k", retries=0))
+        for row in rows:
+            buffer.put("posts", row, on_conflict="post_id")
+        assert buffer.flush() == 0
+        assert buffer.flush() == 0
+        assert [status for _, status, _ in outbox(buffer)] == ["pending"] * 3
+        assert {attempts for _, _, attempts in outbox(buffer)} == {0}
+        buffer.close()
+
+    resilience._breakers.clear()     # 다음 실행(새 프로세스)은 닫힌 브레이커로 시작
+    with FakePostgREST() as up:
+        client = supabase_client.SupabaseClient(url=up.url, key="k", retries=0)
+        buffer = WriteBuffer(path, client=client)
+        assert buffer.flush() == 3
+        assert sorted(stored(client)) == ["p0", "p1", "p2"]
+        buffer.close()
+
+
+def test_rows_survive_a_crash_before_flush(tmp_path, client):
+    path = tmp_path / "buffer.sqlite3"
+    crashed = WriteBuffer(str(path), client=client)
+    for i in range(4):
+        crashed.put("posts", {"post_id": f"p{i}", "upvotes": i}, on_conflict="post_id")
+
+    # 프로세스가 close() 없이 죽은 상황: 체크포인트 전 WAL 파일까지 그대로 다른 경로로 복사해 엽니다.
+    recovered_path = tmp_path / "recovered.sqlite3"
+    for suffix in ("", "-wal", "-shm"):
+        if (tmp_path / f"buffer.sqlite3{suffix}").exists():
+            shutil.copy(tmp_path / f"buffer.sqlite3{suffix}", tmp_path / f"recovered.sqlite3{suffix}")
+
+    recovered = WriteBuffer(str(recovered_path), client=client)
+    assert recovered.pending() == 4
+    assert recovered.flush() == 4
+    assert {key: row["upvotes"] for key, row in stored(client).items()} == {f"p{i}": i for i in range(4)}
+    recovered.close()
+    crashed.close()
@@ -0,0 +1,88 @@
+"""youtube_velocity.py 성장 속도 계산을 작은 합성 스냅샷으로 확인합니다."""
+import pytest
+
+import youtube_trending
+import youtube_velocity
+from youtube_velocity import compute_velocity
+
+T0, T1, T2 = "2026-10-01T00:00:00+00:00", "2026-10-01T06:00:00+00:00", "2026-10-01T12:00:00+00:00"
+
+
+def snapshot(video_id, region, captured_at, views, likes=0, category="Gaming"):
+    return {"video_id": video_id, "category": category, "region": region,
+            "view_count": views, "like_count": likes, "captured_at": captured_at}
+
+
+@pytest.fixture
+def snapshots():
+    return [
+        # KR/US 차트에 모두 오른 영상: 같은 captured_at에 지역마다 한 행
+        snapshot("v1", "KR", T0, 1000), snapshot("v1", "US", T0, 1000),
+        snapshot("v1", "KR", T1, 7000), snapshot("v1", "US", T1, 7000),
+        snapshot("v1", "KR", T2, 19000, likes=190), snapshot("v1", "US", T2, 19000, likes=190),
+        # US 차트에만 있는 영상
+        snapshot("v2", "US", T1, 500, category="Music"), snapshot("v2", "US", T2, 1100, likes=11, category="Music"),
+        # 스냅샷이 하나뿐이라 속도를 계산할 수 없는 영상
+        snapshot("v3", "KR", T2, 999),
+    ]
+
+
+def test_velocity_is_computed_per_video_and_region(snapshots):
+    videos, _ = compute_velocity(snapshots)
+
+    rows = {(row.video_id, row.region): row for row in videos.itertuples()}
+    assert sorted(rows) == [("v1", "KR"), ("v1", "US"), ("v2", "US")]
+    for region in ("KR", "US"):
+        v1 = rows[("v1", region)]
+        assert v1.views_per_hour == pytest.approx(2000)          # (19000 - 7000) / 6h
+        assert v1.acceleration == pytest.approx((2000 - 1000) / 6)
+        assert v1.like_rate == pytest.approx(0.01)
+    assert rows[("v2", "US")].views_per_hour == pytest.approx(100)
+    assert rows[("v2", "US")].acceleration == 0.0
+    assert list(videos["views_per_hour"]) == sorted(videos["views_per_hour"], reverse=True)
+
+
+def test_category_velocity_keeps_every_region(snapshots):
+    _, categories = compute_velocity(snapshots)
+
+    summary = {(row.category, row.region): row for row in categories.itertuples()}
+    assert sorted(summary) == [("Gaming", "KR"), ("Gaming", "US"), ("Music", "US")]
+    assert summary[("Gaming", "KR")].video_count == 1
+    assert summary[("Gaming", "US")].total_views_per_hour == pytest.approx(2000)
+    assert summary[("Music", "US")].total_views_per_hour == pytest.approx(100)
+
+
+def test_duplicate_snapshot_keeps_the_last_row():
+    videos, _ = compute_velocity([
+        snapshot("v1", "KR", T0, 1000),
+        snapshot("v1", "KR", T1, 5000),
+        snapshot("v1", "KR", T1, 7000),
+    ])
+    assert videos.iloc[0].views_per_hour == pytest.approx(1000)
+
+
+def test_empty_snapshots():
+    videos, categories = compute_velocity([])
+    assert videos.empty and categories.empty
+
+
+def test_save_snapshots_writes_one_row_per_video_and_region(client):
+    video = {"video_id": "v1", "category": "Gaming", "view_count": 10, "like_count": 1, "comment_count": 0}
+    youtube_trending.save_snapshots([{**video, "region": "KR"}, {**video, "region": "US"}, {**video, "region": "US"}])
+
+    rows = client.select("youtube_video_snapshots", {"select": "video_id,region"})
+    assert sorted((row["video_id"], row["region"]) for row in rows) == [("v1", "KR"), ("v1", "US")]
+
+
+def test_save_rising_prunes_rows_from_earlier_runs(client, snapshots):
+    client.upsert("youtube_category_velocity", [
+        {"category": "Comedy", "region": "KR", "computed_at": "2026-09-30T00:00:00+00:00"},
+    ], on_conflict="category,region")
+    videos, categories = compute_velocity(snapshots)
+
+    youtube_velocity.save_rising(videos, categories, "2026-10-01T12:05:00+00:00")
+
+    rising = client.select("youtube_rising", {"select": "video_id"})
+    assert sorted(row["video_id"] for row in rising) == ["v1", "v2"]
+    velocity = client.select("youtube_category_velocity", {"select": "category,region"})
+    assert sorted((row["category"], row["region"]) for row in velocity) == [("Gaming", "KR"), ("Gaming", "US"), ("Music", "US")]
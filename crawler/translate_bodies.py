@@ -0,0 +1,114 @@
+"""
+Body Translation - The Info Club v2.0
+크롤러가 비워 둔 본문 번역(content_ko)을 나중에 채웁니다 (sql/migrate_v15.sql).
+- 독자가 카드에서 본문을 열어 번역을 요청한 글(translation_requested_at)을 먼저 처리
+- 남은 자리는 번역이 없는 글 중 업보트/댓글 수가 많은 순서로 채움 (실행당 TRANSLATE_BODIES_PER_RUN개)
+- 이미 한국어인 본문은 번역기에 보내지 않고 그대로 content_ko로 저장
+- 번역 결과는 store_post_translations RPC로 묶어서 저장 (content_ko + 한국어 미리보기)
+"""
+import os
+import sys
+from datetime import datetime
+from typing import Dict, List
+
+import resilience
+from crawler import is_korean, make_preview, translate_text
+from job_lease import exclusive, lease_lost
+from supabase_client import get_client
+
+# 한 번 실행에서 번역할 최대 본문 수
+BODIES_PER_RUN = int(os.getenv("TRANSLATE_BODIES_PER_RUN", "50"))
+# 실행 시간 제한 (초)
+RUN_BUDGET_SECONDS = int(os.getenv("TRANSLATE_RUN_BUDGET_SECONDS", "900"))
+# 이만큼 모이면 RPC로 저장 (도중에 멈춰도 번역한 결과를 잃지 않도록)
+STORE_CHUNK_SIZE = 10
+
+SELECT_COLUMNS = "post_id,content_original,upvotes,comment_count,translation_requested_at"
+
+
+def select_posts_to_translate(limit: int = BODIES_PER_RUN) -> List[Dict]:
+    """요청된 글(요청 순) → 참여도 높은 글 순으로 번역이 없는 포스트를 최대 limit개 고릅니다."""
+    supabase = get_client()
+    requested = supabase.select("posts", {
+        "select": SELECT_COLUMNS,
+        "content_ko": "is.null",
+        "content_original": "not.is.null",
+        "translation_requested_at": "not.is.null",
+        "order": "translation_requested_at.asc",
+        "limit": limit,
+    })
+    if len(requested) >= limit:
+        return requested[:limit]
+
+    popular = supabase.select("posts", {
+        "select": SELECT_COLUMNS,
+        "content_ko": "is.null",
+        "content_original": "not.is.null",
+        "order": "upvotes.desc.nullslast,comment_count.desc.nullslast",
+        "limit": limit,
+    })
+    chosen = {row["post_id"] for row in requested}
+    return requested + [row for row in popular if row["post_id"] not in chosen][:limit - len(requested)]
+
+
+def store_translations(rows: List[Dict]) -> int:
+    if not rows:
+        return 0
+    result = get_client().rpc("store_post_translations", {"p_rows": rows})
+    if result is None:
+        print("  ❌ 번역 저장 실패 (sql/migrate_v15.sql이 적용됐는지 확인하세요).")
+        return 0
+    return result
+
+
+@exclusive("translate_bodies")
+@resilience.budgeted(RUN_BUDGET_SECONDS, "translate_bodies")
+def run_body_translation(limit: int = BODIES_PER_RUN):
+    print(f"[{datetime.now()}] 🌐 본문 번역 시작 (최대 {limit}개)")
+    supabase = get_client()
+    if not supabase.configured:
+        print("❌ Supabase credentials not set.")
+        return
+
+    posts = select_posts_to_translate(limit)
+    if not posts:
+        print("  ✅ 번역할 본문이 없습니다.")
+        return
+    requested = sum(1 for row in posts if row.get("translation_requested_at"))
+    print(f"  📥 대상 {len(posts)}개 (독자 요청 {requested}개)")
+
+    pending, stored, skipped_korean, translated_chars = [], 0, 0, 0
+    for row in posts:
+        if resilience.out_of_time(30):
+            print("  ⏰ 실행 시간이 다 되어 번역을 멈춥니다.")
+            break
+        if lease_lost():
+            print("  ⛔ 실행 임대를 잃어 번역을 멈춥니다.")
+            break
+        text = row["content_original"]
+        if is_korean(text):
+            korean = text
+            skipped_korean += 1
+        else:
+            korean = translate_text(text)
+            if korean is None:
+                if resilience.get_breaker("translator").state != resilience.CLOSED:
+                    print("  ⏭️ 번역기 서킷 브레이커가 열려 이번 실행을 멈춥니다.")
+                    break
+                continue
+            translated_chars += len(text)
+        pending.append({"post_id": row["post_id"], "content_ko": korean, "preview": make_preview(korean)})
+        if len(pending) >= STORE_CHUNK_SIZE:
+            stored += store_translations(pending)
+            pending = []
+    stored += store_translations(pending)
+
+    print(f"  💾 번역 저장 {stored}개 (이미 한국어 {skipped_korean}개, 번역기로 보낸 글자 {translated_chars:,}자)")
+
+
+if __name__ == "__main__":
+    if "--profile" in sys.argv:
+        from profiler import profile_call
+        profile_call(run_body_translation, "translate_bodies")
+    else:
+        run_body_translation()
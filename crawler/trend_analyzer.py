@@ -3,26 +3,15 @@ Cross-Platform Trend Analyzer - The Info Club v2.0
 Reddit + YouTube + Google Trends 데이터를 교차 분석하여 주간 리포트를 생성합니다.
 OpenAI REST API를 requests로 직접 호출 (Python 3.14 호환)
 """
-import os
 import json
 import requests
-from dotenv import load_dotenv
 from datetime import datetime, date, timedelta
+from settings import settings
+import resilience
+from job_lease import exclusive
+from supabase_client import get_client
 
-load_dotenv()
-
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-
-def get_supabase_headers():
-    return {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates"
-    }
+OPENAI_API_KEY = settings.openai_api_key
 
 
 def call_openai(system_prompt, user_prompt, max_tokens=1500):
@@ -30,6 +19,10 @@ def call_openai(system_prompt, user_prompt, max_tokens=1500):
     if not OPENAI_API_KEY:
         print("  ⚠️ OPENAI_API_KEY not set.")
         return None
+    breaker = resilience.get_breaker("openai")
+    if not breaker.allow():
+        print("  ⏭️ OpenAI circuit open, skipping.")
+        return None
 
     headers = {
         "Authorization": f"Bearer {OPENAI_API_KEY}",
@@ -50,13 +43,18 @@ def call_openai(system_prompt, user_prompt, max_tokens=1500):
             "https://api.openai.com/v1/chat/completions",
             headers=headers,
             json=payload,
-            timeout=60
+            timeout=resilience.timeout(60)
         )
+        breaker.record_status(resp.status_code)
         if resp.status_code == 200:
             return resp.json()["choices"][0]["message"]["content"].strip()
         else:
             print(f"  ❌ OpenAI Error: {resp.status_code} - {resp.text[:200]}")
             return None
+    except requests.RequestException as e:
+        breaker.record_failure()
+        print(f"  ❌ OpenAI Exception: {e}")
+        return None
     except Exception as e:
         print(f"  ❌ OpenAI Exception: {e}")
         return None
@@ -65,34 +63,60 @@ def call_openai(system_prompt, user_prompt, max_tokens=1500):
 def fetch_recent_reddit_posts(days=7):
     """최근 N일간 Reddit 포스트 가져오기"""
     since = (datetime.now() - timedelta(days=days)).isoformat()
-    url = f"{SUPABASE_URL}/rest/v1/posts?crawled_at=gte.{since}&select=title,subreddit,ai_insight&order=crawled_at.desc&limit=50"
-    resp = requests.get(url, headers=get_supabase_headers())
-    if resp.status_code == 200:
-        return resp.json()
-    return []
+    return get_client().select("posts", {
+        "crawled_at": f"gte.{since}",
+        "select": "title,subreddit,ai_insight",
+        "order": "crawled_at.desc",
+        "limit": 50
+    })
+
+
+def fetch_recent_youtube_trends(days=7, per_category=5):
+    """
+    최근 7일 카테고리 + 지역별 인기 영상 가져오기.
+    서버 집계 뷰(top_videos_by_category RPC)를 우선 사용하고, 없으면 원본 테이블을 조회합니다.
+    """
+    ranked = get_client().rpc("top_videos_by_category", {"p_limit": per_category})
+    if ranked:
+        return ranked[:50]
 
-
-def fetch_recent_youtube_trends(days=7):
-    """최근 N일간 YouTube 트렌딩 데이터 가져오기"""
     since = date.today() - timedelta(days=days)
-    url = f"{SUPABASE_URL}/rest/v1/youtube_trends?trending_date=gte.{since.isoformat()}&select=title,channel_title,category,view_count,region&order=view_count.desc&limit=50"
-    resp = requests.get(url, headers=get_supabase_headers())
-    if resp.status_code == 200:
-        return resp.json()
-    return []
+    return get_client().select("youtube_trends", {
+        "trending_date": f"gte.{since.isoformat()}",
+        "select": "title,channel_title,category,view_count,region",
+        "order": "view_count.desc",
+        "limit": 50
+    })
+
+
+def fetch_rising_videos(limit=20):
+    """시간당 조회수 기준 급상승 영상 가져오기 (youtube_velocity.py가 갱신)"""
+    return get_client().select("youtube_rising", {
+        "select": "title,channel_title,category,region,views_per_hour,like_rate",
+        "order": "views_per_hour.desc",
+        "limit": limit
+    })
 
 
 def fetch_recent_google_trends(days=7):
-    """최근 N일간 Google 트렌드 키워드 가져오기"""
+    """
+    최근 7일 키워드별 최신 방향 가져오기.
+    서버 집계 뷰(keyword_direction_summary RPC)를 우선 사용하고, 없으면 원본 테이블을 조회합니다.
+    """
+    summary = get_client().rpc("keyword_direction_summary")
+    if summary:
+        return summary[:50]
+
     since = date.today() - timedelta(days=days)
-    url = f"{SUPABASE_URL}/rest/v1/google_trends?trending_date=gte.{since.isoformat()}&select=keyword,region,traffic_volume&order=crawled_at.desc&limit=50"
-    resp = requests.get(url, headers=get_supabase_headers())
-    if resp.status_code == 200:
-        return resp.json()
-    return []
+    return get_client().select("google_trends", {
+        "trending_date": f"gte.{since.isoformat()}",
+        "select": "keyword,region,traffic_volume",
+        "order": "crawled_at.desc",
+        "limit": 50
+    })
 
 
-def generate_weekly_report(reddit_data, youtube_data, google_data):
+def generate_weekly_report(reddit_data, youtube_data, google_data, rising_data=None):
     """3개 플랫폼 데이터를 종합하여 AI 주간 리포트를 생성합니다."""
 
     reddit_summary = "\n".join([
@@ -105,6 +129,11 @@ def generate_weekly_report(reddit_data, youtube_data, google_data):
         for v in youtube_data[:20]
     ]) or "데이터 없음"
 
+    rising_summary = "\n".join([
+        f"- [{v.get('region','')}/{v.get('category','')}] {v.get('title','')} ({v.get('channel_title','')}, 시간당 조회수: {v.get('views_per_hour',0):,.0f}, 좋아요율: {v.get('like_rate',0):.1%})"
+        for v in (rising_data or [])[:15]
+    ]) or "데이터 없음"
+
     google_summary = "\n".join([
         f"- {k.get('keyword','')} ({k.get('region','')}: {k.get('traffic_volume','')})"
         for k in google_data[:30]
@@ -121,6 +150,9 @@ def generate_weekly_report(reddit_data, youtube_data, google_data):
 ## 📌 YouTube 인기 동영상 (한국 + 미국)
 {youtube_summary}
 
+## 📌 YouTube 급상승 동영상 (시간당 조회수 증가 기준)
+{rising_summary}
+
 ## 📌 Google 검색 트렌드
 {google_summary}
 
@@ -172,7 +204,8 @@ def extract_hot_keywords(report_text):
 
 def save_report_to_supabase(report_content, hot_keywords, sources_summary=None):
     """주간 리포트를 Supabase에 저장합니다."""
-    if not SUPABASE_URL or not SUPABASE_KEY:
+    supabase = get_client()
+    if not supabase.configured:
         return
 
     today = date.today()
@@ -186,15 +219,14 @@ def save_report_to_supabase(report_content, hot_keywords, sources_summary=None):
         "created_at": datetime.now().isoformat()
     }
 
-    endpoint = f"{SUPABASE_URL}/rest/v1/weekly_reports"
-    resp = requests.post(endpoint, json=data, headers=get_supabase_headers())
-
-    if resp.status_code in range(200, 300):
+    saved, errors = supabase.insert("weekly_reports", [data])
+    if saved:
         print(f"  💾 주간 리포트 저장 완료! (주차: {week_start})")
     else:
-        print(f"  ❌ 리포트 저장 실패: {resp.status_code} - {resp.text[:200]}")
+        print(f"  ❌ 리포트 저장 실패: {errors[0][1] if errors else ''}")
 
 
+@exclusive("trend_analysis")
 def run_trend_analysis():
     """전체 교차 분석 파이프라인 실행"""
     print(f"\n[{datetime.now()}] 🧠 Cross-Platform Trend Analysis 시작...")
@@ -203,20 +235,22 @@ def run_trend_analysis():
     reddit_data = fetch_recent_reddit_posts()
     youtube_data = fetch_recent_youtube_trends()
     google_data = fetch_recent_google_trends()
+    rising_data = fetch_rising_videos()
 
-    print(f"  📊 수집 결과: Reddit {len(reddit_data)}개, YouTube {len(youtube_data)}개, Google {len(google_data)}개")
+    print(f"  📊 수집 결과: Reddit {len(reddit_data)}개, YouTube {len(youtube_data)}개 (급상승 {len(rising_data)}개), Google {len(google_data)}개")
 
     if not reddit_data and not youtube_data and not google_data:
         print("  ⚠️ 분석할 데이터가 없습니다. 크롤러를 먼저 실행해주세요.")
         return
 
     print("  🤖 AI 리포트 생성 중...")
-    report, hot_keywords = generate_weekly_report(reddit_data, youtube_data, google_data)
+    report, hot_keywords = generate_weekly_report(reddit_data, youtube_data, google_data, rising_data)
 
     if report:
         sources_summary = {
             "reddit_count": len(reddit_data),
             "youtube_count": len(youtube_data),
+            "youtube_rising_count": len(rising_data),
             "google_count": len(google_data),
             "analysis_date": datetime.now().isoformat()
         }
@@ -237,7 +271,11 @@ if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == "--once":
         print("🚀 Trend Analyzer (단일 실행)...")
-        run_trend_analysis()
+        if "--profile" in sys.argv:
+            from profiler import profile_call
+            profile_call(run_trend_analysis, "trend_analyzer")
+        else:
+            run_trend_analysis()
         print("✅ 완료!")
     else:
         import time
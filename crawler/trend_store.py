@@ -0,0 +1,195 @@
+"""
+Trend Curve Store - The Info Club v2.0
+Google Trends interest_over_time 원본 곡선을 지역/날짜별 파티션에 NumPy 배열로 저장하고,
+여러 키워드의 곡선을 하나의 행렬로 불러와 가속 중인 키워드를 찾습니다.
+
+저장 구조:
+    {TRENDS_STORE_DIR}/geo=KR/date=2026-10-19/
+        timestamps.npy  (int64, UTC epoch 초)
+        values.npy      (float32, 시각 × 키워드)
+        keywords.json   (열 순서, 마지막에 기록되어 파티션 완료 표시 역할)
+
+값은 수집 당시 실행의 공통 스케일(앵커 정규화, 최고치 = 100) 기준이라 파티션마다 스케일이 다릅니다.
+불러올 때는 가장 최근 파티션을 기준으로, 이전 파티션을 겹치는 시각의 값으로 구한 비율(최소제곱)만큼
+다시 스케일한 뒤 이어 붙입니다. 겹치는 시각은 더 최근 파티션의 값을 사용합니다.
+"""
+import os
+import json
+from datetime import date, timedelta
+
+import numpy as np
+
+STORE_DIR = os.getenv("TRENDS_STORE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "trends"))
+
+
+def partition_dir(geo, day):
+    return os.path.join(STORE_DIR, f"geo={geo}", f"date={day.isoformat()}")
+
+
+def save_curves(frame, geo, day=None):
+    """
+    관심도 DataFrame (index: 시각, columns: 키워드)을 (geo, day) 파티션에 저장합니다.
+    같은 파티션이 이미 있으면 덮어씁니다.
+    """
+    if frame.empty:
+        return
+
+    path = partition_dir(geo, day or date.today())
+    os.makedirs(path, exist_ok=True)
+
+    timestamps = frame.index.values.astype("datetime64[s]").astype(np.int64)
+    values = frame.to_numpy(dtype=np.float32)
+
+    marker = os.path.join(path, "keywords.json")
+    if os.path.exists(marker):
+        os.remove(marker)
+
+    for name, array in (("timestamps", timestamps), ("values", values)):
+        tmp_path = os.path.join(path, f"{name}.tmp.npy")
+        np.save(tmp_path, array)
+        os.replace(tmp_path, os.path.join(path, f"{name}.npy"))
+
+    with open(marker, "w", encoding="utf-8") as f:
+        json.dump(list(frame.columns), f, ensure_ascii=False)
+
+
+def list_partitions(geo, start=None, end=None):
+    """[start, end] 범위의 완료된 파티션 날짜를 오래된 순으로 반환합니다."""
+    geo_dir = os.path.join(STORE_DIR, f"geo={geo}")
+    if not os.path.isdir(geo_dir):
+        return []
+
+    days = []
+    for name in os.listdir(geo_dir):
+        if not name.startswith("date="):
+            continue
+        day = date.fromisoformat(name[len("date="):])
+        if (start and day < start) or (end and day > end):
+            continue
+        if os.path.exists(os.path.join(geo_dir, name, "keywords.json")):
+            days.append(day)
+    return sorted(days)
+
+
+def load_curves(geo, keywords=None, start=None, end=None):
+    """
+    여러 키워드의 곡선을 하나의 행렬로 불러옵니다.
+
+    Args:
+        geo: 국가 코드
+        keywords: 불러올 키워드 리스트 (None이면 전체)
+        start, end: 파티션 날짜 범위 (date, 포함)
+
+    Returns:
+        DataFrame (index: 시각, columns: 키워드), 해당 파티션에 없는 키워드 값은 NaN
+    """
+    import pandas as pd
+
+    frames = []
+    for day in list_partitions(geo, start, end):
+        path = partition_dir(geo, day)
+        with open(os.path.join(path, "keywords.json"), encoding="utf-8") as f:
+            columns = json.load(f)
+
+        timestamps = np.load(os.path.join(path, "timestamps.npy"), mmap_mode="r")
+        values = np.load(os.path.join(path, "values.npy"), mmap_mode="r")
+
+        if keywords is not None:
+            picked = [i for i, kw in enumerate(columns) if kw in keywords]
+            if not picked:
+                continue
+            values = values[:, picked]
+            columns = [columns[i] for i in picked]
+
+        frames.append(pd.DataFrame(values, index=timestamps.astype("datetime64[s]"), columns=columns))
+
+    if not frames:
+        return pd.DataFrame(columns=keywords or [])
+
+    combined = stitch(frames)
+    return combined.reindex(columns=keywords if keywords is not None else sorted(combined.columns))
+
+
+def overlap_ratio(older, newer):
+    """
+    older를 newer의 스케일로 옮기는 배율: 겹치는 (시각, 키워드) 값들에 대한 최소제곱 비율 Σab / Σa².
+    한 파티션 안의 키워드는 같은 스케일이므로 파티션당 배율 하나면 됩니다.
+    겹치는 값이 없으면(수집이 며칠 끊긴 경우) 맞출 근거가 없으므로 1을 반환합니다.
+    """
+    times = older.index.intersection(newer.index)
+    columns = older.columns.intersection(newer.columns)
+    if times.empty or columns.empty:
+        return 1.0
+    a = older.loc[times, columns].to_numpy(dtype=np.float64)
+    b = newer.loc[times, columns].to_numpy(dtype=np.float64)
+    mask = ~np.isnan(a) & ~np.isnan(b)
+    denominator = float((a[mask] ** 2).sum())
+    if denominator == 0:
+        return 1.0
+    return float((a[mask] * b[mask]).sum()) / denominator
+
+
+def stitch(frames):
+    """
+    오래된 순 파티션 곡선들을 가장 최근 파티션의 스케일로 맞춰 하나로 잇습니다.
+    최근 것부터 거꾸로 내려가며 지금까지 이어 붙인 곡선과 겹치는 부분으로 배율을 구하므로
+    하루씩 겹치는 파티션이 길게 이어져도 모두 같은 스케일이 됩니다.
+    """
+    stitched = frames[-1][~frames[-1].index.duplicated(keep="last")]
+    for older in reversed(frames[:-1]):
+        older = older[~older.index.duplicated(keep="last")]
+        stitched = stitched.combine_first(older * overlap_ratio(older, stitched))
+    return stitched.sort_index()
+
+
+def sliding_slopes(values, window):
+    """
+    (시각 T, 키워드 K) 행렬의 모든 길이 window 구간에 대한 최소제곱 기울기를 한 번에 계산합니다.
+
+    Returns:
+        ndarray (T - window + 1, K)
+    """
+    x = np.arange(window, dtype=np.float64) - (window - 1) / 2
+    windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)  # (T-w+1, K, w)
+    return windows @ x / (x @ x)
+
+
+def detect_accelerating(frame, window=24, top_n=10):
+    """
+    최근 window 구간의 기울기(velocity)와, 그 직전 window 구간 대비 기울기 변화(acceleration)가
+    모두 양수인 키워드를 가속도 순으로 반환합니다.
+
+    Returns:
+        DataFrame (index: 키워드, columns: velocity, acceleration, latest)
+    """
+    import pandas as pd
+
+    values = frame.ffill().fillna(0).to_numpy(dtype=np.float64)
+    if len(values) < window * 2:
+        return pd.DataFrame(columns=["velocity", "acceleration", "latest"])
+
+    slopes = sliding_slopes(values, window)
+    velocity = slopes[-1]
+    acceleration = velocity - slopes[-1 - window]
+
+    result = pd.DataFrame({
+        "velocity": velocity.round(3),
+        "acceleration": acceleration.round(3),
+        "latest": values[-1].round(1),
+    }, index=frame.columns)
+    rising = result[(result["velocity"] > 0) & (result["acceleration"] > 0)]
+    return rising.sort_values("acceleration", ascending=False).head(top_n)
+
+
+if __name__ == "__main__":
+    import sys
+    geo = sys.argv[1] if len(sys.argv) > 1 else "KR"
+    days = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+
+    curves = load_curves(geo, start=date.today() - timedelta(days=days))
+    print(f"📦 [{geo}] 최근 {days}일 곡선: {curves.shape[1]}개 키워드 × {curves.shape[0]}개 시점")
+    accelerating = detect_accelerating(curves)
+    if accelerating.empty:
+        print("  ⚠️ 가속 중인 키워드가 없습니다.")
+    for keyword, row in accelerating.iterrows():
+        print(f"  🚀 {keyword}: 기울기 {row['velocity']:+.3f}/h, 가속 {row['acceleration']:+.3f} (현재 {row['latest']:g})")
@@ -4,40 +4,92 @@
 - GPT-4o로 심층 분석
 - 동향/뉴스 TOP 5 + 정책/수익 TOP 5 형식
 - 매주 월요일 GitHub Actions로 자동 실행
+- --daily: 일자별 부분 요약(partial)을 미리 계산해 캐시
+- --incremental: 캐시된 7일치 부분 요약만 병합해 리포트 생성
 """
-import os
 import json
+import hashlib
 import requests
 from datetime import datetime, timedelta
-from dotenv import load_dotenv
+from settings import settings
+from supabase_client import get_client
+import resilience
+from job_lease import exclusive
 
-load_dotenv()
+OPENAI_API_KEY = settings.openai_api_key
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# 프롬프트에 필요한 컬럼만 요청 (content는 content_head 계산 컬럼으로 앞 800자만 전송, migrate_v6.sql)
+# 상위 댓글은 comments 테이블 임베딩으로 포스트별 업보트 순 TOP_COMMENTS_PER_POST개만 (migrate_v12.sql)
+PROMPT_COLUMNS = "post_id,subreddit,title,content:content_head,upvotes,upvote_ratio,comment_count,top_comments,ai_insight,comments(author,ups,body:content)"
+# 위 마이그레이션이 적용되지 않은 DB에서는 임베딩/계산 컬럼 select가 400이므로 기본 컬럼만 받고 본문은 여기서 자릅니다.
+FALLBACK_COLUMNS = "post_id,subreddit,title,content,upvotes,upvote_ratio,comment_count,top_comments,ai_insight"
+CONTENT_HEAD_CHARS = 800
+TOP_COMMENTS_PER_POST = 3
+PAGE_SIZE = 100
+MAX_WEEKLY_POSTS = 200
 
-def get_headers():
-    return {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json"
-    }
+_prompt_columns = None
+
+def comment_filters(select):
+    if "comments(" not in select:
+        return []
+    return [("comments.order", "ups.desc"), ("comments.limit", str(TOP_COMMENTS_PER_POST))]
+
+def prompt_columns():
+    """
+    PROMPT_COLUMNS를 1행만 조회해 보고, 400이면 FALLBACK_COLUMNS를 씁니다. 결과는 프로세스 동안 캐시합니다.
+    네트워크 오류처럼 스키마와 무관한 실패는 PROMPT_COLUMNS를 그대로 둡니다 (본 조회가 오류를 출력합니다).
+    """
+    global _prompt_columns
+    if _prompt_columns is None:
+        params = [("select", PROMPT_COLUMNS), ("limit", "1")] + comment_filters(PROMPT_COLUMNS)
+        try:
+            resp = get_client().request("GET", "posts", params=params)
+        except requests.RequestException:
+            return PROMPT_COLUMNS
+        if resp.status_code == 400:
+            print(f"  ⚠️ 댓글 임베딩/content_head 조회 불가 (migrate_v6/v10/v12 미적용?), 기본 컬럼으로 조회: {resp.text[:200]}")
+            _prompt_columns = FALLBACK_COLUMNS
+        else:
+            _prompt_columns = PROMPT_COLUMNS
+    return _prompt_columns
+
+def truncate_content(posts):
+    for post in posts:
+        post["content"] = (post.get("content") or "")[:CONTENT_HEAD_CHARS]
+        yield post
+
+def iter_posts(start, end=None, select=PROMPT_COLUMNS, limit=None):
+    """
+    [start, end) 구간에 작성된 Reddit 포스트를 created_at/id 키셋 페이지네이션으로 한 페이지씩 가져와 yield합니다.
+    offset 대신 마지막 행의 (created_at, id) 다음부터 읽으므로 페이지가 깊어져도 느려지지 않습니다.
+    select가 PROMPT_COLUMNS인데 DB가 이를 지원하지 않으면 FALLBACK_COLUMNS로 바꿔 읽습니다.
+    """
+    if select == PROMPT_COLUMNS:
+        select = prompt_columns()
+    filters = [("created_at", f"gte.{start.isoformat()}")]
+    if end is not None:
+        filters.append(("created_at", f"lt.{end.isoformat()}"))
+    posts = get_client().iter_select(
+        "posts", select, filters=filters + comment_filters(select), order=("created_at", "id"),
+        page_size=PAGE_SIZE, limit=limit
+    )
+    return truncate_content(posts) if select == FALLBACK_COLUMNS else posts
 
 def fetch_weekly_posts():
-    """지난 7일간 수집된 Reddit 포스트 가져오기"""
-    since = (datetime.utcnow() - timedelta(days=7)).isoformat()
-    url = f"{SUPABASE_URL}/rest/v1/posts?created_at=gte.{since}&select=*&limit=200"
-    r = requests.get(url, headers=get_headers())
-    posts = r.json() if r.status_code == 200 else []
-    print(f"[FETCH] 이번 주 수집된 포스트: {len(posts)}개")
-    return posts
+    """지난 7일간 수집된 Reddit 포스트를 제너레이터로 가져오기"""
+    since = datetime.utcnow() - timedelta(days=7)
+    return iter_posts(since, limit=MAX_WEEKLY_POSTS)
 
 def format_posts_for_prompt(posts):
-    """AI 프롬프트에 넣을 포스트 데이터 구성 (댓글 포함 실제 데이터만)"""
+    """
+    AI 프롬프트에 넣을 포스트 데이터 구성 (댓글 포함 실제 데이터만)
+    posts는 제너레이터여도 되며, (프롬프트 텍스트, 포스트 수)를 반환합니다.
+    """
     lines = []
     for i, p in enumerate(posts, 1):
-        top_comments = p.get('top_comments', [])
+        # comments 테이블에 아직 동기화되지 않은 포스트는 크롤링 시 저장한 top_comments jsonb 사용
+        top_comments = p.get('comments') or p.get('top_comments', [])
         comments_text = ""
         if top_comments and isinstance(top_comments, list):
             for c in top_comments:
@@ -50,13 +102,13 @@ def format_posts_for_prompt(posts):
 --- 포스트 #{i} ---
 서브레딧: r/{p.get('subreddit', '')}
 제목: {p.get('title', '')}
-내용 요약: {(p.get('content') or '')[:800]}
+내용 요약: {(p.get('content') or '')[:CONTENT_HEAD_CHARS]}
 반응: 업보트 {upvotes}개 (비율: {upvote_ratio*100:.0f}%), 댓글 수 {p.get('comment_count', 0)}개
 상위 댓글 반응:
 {comments_text if comments_text else "- (수집된 댓글 없음)"}
 기존 분석: {(p.get('ai_insight') or '')[:300]}
 """)
-    return "\n".join(lines)
+    return "\n".join(lines), len(lines)
 
 SYSTEM_PROMPT = """당신은 상위 1% 유튜브 크리에이터 전문 수석 전략 애널리스트입니다.
 제공된 Reddit 포스트(본문, 상위 댓글, 통계 지표) 데이터를 기반으로 최고급 인사이트가 담긴 주간 리포트를 작성합니다.
@@ -93,44 +145,65 @@ SYSTEM_PROMPT = """당신은 상위 1% 유튜브 크리에이터 전문 수석 
 - part_b: 정책 변화 및 수익창출 극대화 전략 TOP 5
 - 데이터가 부족해 5개를 채울 수 없으면 있는 만큼만 심도 있게 작성 (억지로 개수를 채우기 위해 뻔한 내용 넣기 금지)"""
 
-def generate_weekly_report(posts):
-    """실제 포스트 데이터를 기반으로 주간 리포트 생성"""
-    if not posts:
-        print("[WARN] 포스트 없음 - 리포트 생성 불가")
-        return None
+# 일자별 부분 요약 프롬프트. 내용을 바꾸면 PARTIAL_PROMPT_VERSION도 올려서 캐시를 무효화하세요.
+PARTIAL_PROMPT_VERSION = "v1"
 
-    posts_text = format_posts_for_prompt(posts)
-    today = datetime.utcnow()
-    week_num = (today.day - 1) // 7 + 1
-    week_label = f"{today.year}년 {today.month}월 {week_num}주차"
+PARTIAL_SYSTEM_PROMPT = """당신은 상위 1% 유튜브 크리에이터 전문 수석 전략 애널리스트입니다.
+하루치 Reddit 포스트(본문, 상위 댓글, 통계 지표)를 읽고, 주간 리포트의 후보가 될 고급 인사이트만 구조화해 추려냅니다.
+뻔한 정보(일관성 유지, 썸네일 어그로 등)는 제외하고, 제공된 포스트에 없는 정보는 절대 추가하지 마세요.
 
-    user_prompt = f"""아래는 이번 주({week_label}) 실제 수집된 Reddit 포스트 {len(posts)}개입니다.
-이 데이터만 사용해 주간 리포트를 작성하세요.
-제공된 포스트에 없는 정보는 절대 추가하지 마세요.
+출력 형식 (JSON):
+{
+  "items": [
+    {
+      "part": "a 또는 b (a: 유튜브 동향/알고리즘, b: 정책/수익창출)",
+      "keyword": "핵심 키워드",
+      "sources": ["r/서브레딧명 (업보트 수, 여론 요약)"],
+      "upvotes": 123,
+      "summary": "핵심 요약 (실제 포스트와 댓글 반응 기반)",
+      "creator_impact": "한국 크리에이터에게 미치는 구체적 영향",
+      "strategy": "회피 또는 기회 선점 전략",
+      "actions": ["오늘 즉시 실행할 구체적 지침"]
+    }
+  ]
+}
 
-=== 실제 수집 데이터 ===
-{posts_text}
-======================
+- 하루치 후보는 최대 6개까지, 정보 가치가 높은 순서로 정렬하세요."""
 
-위 데이터만 기반으로 JSON 형식의 주간 리포트를 작성해주세요."""
+def get_week_label(today=None):
+    today = today or datetime.utcnow()
+    week_num = (today.day - 1) // 7 + 1
+    return f"{today.year}년 {today.month}월 {week_num}주차"
 
+def call_openai_json(system_prompt, user_prompt, max_tokens=4000):
+    """OpenAI에 JSON 응답을 요청하고 파싱된 dict를 반환합니다."""
     payload = {
         "model": "gpt-4o",
         "messages": [
-            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ],
-        "max_tokens": 4000,
+        "max_tokens": max_tokens,
         "temperature": 0.4,   # 창의적 융합을 위해 약간 증가
         "response_format": {"type": "json_object"}
     }
 
-    resp = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
-        json=payload,
-        timeout=60
-    )
+    breaker = resilience.get_breaker("openai")
+    if not breaker.allow():
+        print("[ERROR] OpenAI 서킷 브레이커 열림 - 요청 생략")
+        return None
+    try:
+        resp = requests.post(
+            "https://api.openai.com/v1/chat/completions",
+            headers={"Authorization": f"Bearer {OPENAI_API_KEY}", "Content-Type": "application/json"},
+            json=payload,
+            timeout=resilience.timeout(60)
+        )
+    except requests.RequestException as e:
+        breaker.record_failure()
+        print(f"[ERROR] OpenAI API 연결 오류: {e}")
+        return None
+    breaker.record_status(resp.status_code)
 
     if resp.status_code != 200:
         print(f"[ERROR] OpenAI API 오류: {resp.status_code} - {resp.text[:200]}")
@@ -138,13 +211,136 @@ def generate_weekly_report(posts):
 
     content = resp.json()["choices"][0]["message"]["content"]
     try:
-        report_data = json.loads(content)
-        print(f"[OK] 리포트 생성 완료: {report_data.get('week_label')}")
-        return report_data
+        return json.loads(content)
     except json.JSONDecodeError as e:
         print(f"[ERROR] JSON 파싱 실패: {e}")
         return None
 
+def generate_weekly_report(posts):
+    """실제 포스트 데이터를 기반으로 주간 리포트 생성. (리포트, 사용된 포스트 수)를 반환합니다."""
+    posts_text, post_count = format_posts_for_prompt(posts)
+    print(f"[FETCH] 이번 주 수집된 포스트: {post_count}개")
+    if not post_count:
+        print("[WARN] 포스트 없음 - 리포트 생성 불가")
+        return None, 0
+
+    week_label = get_week_label()
+    print(f"[AI] {post_count}개 포스트를 기반으로 GPT-4o 분석 중...")
+
+    user_prompt = f"""아래는 이번 주({week_label}) 실제 수집된 Reddit 포스트 {post_count}개입니다.
+이 데이터만 사용해 주간 리포트를 작성하세요.
+제공된 포스트에 없는 정보는 절대 추가하지 마세요.
+
+=== 실제 수집 데이터 ===
+{posts_text}
+======================
+
+위 데이터만 기반으로 JSON 형식의 주간 리포트를 작성해주세요."""
+
+    report_data = call_openai_json(SYSTEM_PROMPT, user_prompt)
+    if report_data:
+        print(f"[OK] 리포트 생성 완료: {report_data.get('week_label')}")
+    return report_data, post_count
+
+def posts_fingerprint(post_ids):
+    """하루치 포스트 구성이 바뀌었는지 판단하기 위한 해시"""
+    return hashlib.sha1(",".join(sorted(post_ids)).encode("utf-8")).hexdigest()
+
+def load_partial(day):
+    """캐시된 일자별 부분 요약 가져오기 (없으면 None)"""
+    rows = get_client().select("weekly_report_partials", {
+        "day": f"eq.{day.isoformat()}",
+        "prompt_version": f"eq.{PARTIAL_PROMPT_VERSION}",
+        "select": "*"
+    })
+    return rows[0] if rows else None
+
+def save_partial(day, source_hash, post_count, items):
+    """일자별 부분 요약을 weekly_report_partials 테이블에 저장"""
+    payload = {
+        "day": day.isoformat(),
+        "prompt_version": PARTIAL_PROMPT_VERSION,
+        "source_hash": source_hash,
+        "post_count": post_count,
+        "items": items,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    _, errors = get_client().upsert("weekly_report_partials", [payload], on_conflict="day,prompt_version")
+    for _, error in errors:
+        print(f"[ERROR] 부분 요약 저장 실패 ({day}): {error}")
+
+def summarize_day(day):
+    """
+    하루치 포스트의 부분 요약을 반환합니다.
+    캐시된 부분 요약의 포스트 구성(source_hash)이 그대로면 LLM을 다시 호출하지 않습니다.
+    """
+    start = datetime(day.year, day.month, day.day)
+    end = start + timedelta(days=1)
+
+    ids = [p["post_id"] for p in iter_posts(start, end, select="post_id")]
+    if not ids:
+        return {"post_count": 0, "items": []}
+    source_hash = posts_fingerprint(ids)
+
+    cached = load_partial(day)
+    if cached and cached.get("source_hash") == source_hash:
+        print(f"[CACHE] {day}: 부분 요약 재사용 ({cached.get('post_count', 0)}개 포스트)")
+        return {"post_count": cached.get("post_count", 0), "items": cached.get("items") or []}
+
+    posts_text, post_count = format_posts_for_prompt(iter_posts(start, end))
+    print(f"[AI] {day}: {post_count}개 포스트 부분 요약 생성 중...")
+    user_prompt = f"""아래는 {day.isoformat()}에 작성된 실제 Reddit 포스트 {post_count}개입니다.
+
+=== 실제 수집 데이터 ===
+{posts_text}
+======================
+
+위 데이터만 기반으로 JSON 형식의 후보 목록을 작성해주세요."""
+
+    partial = call_openai_json(PARTIAL_SYSTEM_PROMPT, user_prompt, max_tokens=2000)
+    if partial is None:
+        return None
+
+    items = partial.get("items", [])
+    save_partial(day, source_hash, post_count, items)
+    return {"post_count": post_count, "items": items}
+
+def ensure_partials(days=7):
+    """최근 N일치 부분 요약을 준비합니다. 실패한 날짜는 None으로 남깁니다."""
+    today = datetime.utcnow().date()
+    return {
+        day: summarize_day(day)
+        for day in (today - timedelta(days=offset) for offset in range(days - 1, -1, -1))
+    }
+
+def merge_partials(partials):
+    """7일치 부분 요약을 병합해 최종 주간 리포트 생성"""
+    week_label = get_week_label()
+    blocks = []
+    for day, partial in partials.items():
+        if partial and partial["items"]:
+            blocks.append(f"--- {day.isoformat()} ---\n{json.dumps(partial['items'], ensure_ascii=False)}")
+
+    if not blocks:
+        print("[WARN] 병합할 부분 요약이 없습니다.")
+        return None
+
+    blocks_text = "\n".join(blocks)
+    user_prompt = f"""아래는 이번 주({week_label}) 실제 수집된 Reddit 포스트를 일자별로 미리 요약한 후보 목록입니다.
+중복되는 키워드는 하나로 합치고, 업보트와 정보 가치를 기준으로 다시 순위를 매겨 주간 리포트를 작성하세요.
+후보 목록에 없는 정보는 절대 추가하지 마세요.
+
+=== 일자별 후보 ===
+{blocks_text}
+==================
+
+위 데이터만 기반으로 JSON 형식의 주간 리포트를 작성해주세요."""
+
+    report_data = call_openai_json(SYSTEM_PROMPT, user_prompt)
+    if report_data:
+        print(f"[OK] 리포트 병합 완료: {report_data.get('week_label')}")
+    return report_data
+
 def save_report_to_db(report_data, post_count):
     """생성된 리포트를 Supabase weekly_reports 테이블에 저장"""
     payload = {
@@ -156,43 +352,87 @@ def save_report_to_db(report_data, post_count):
         "raw_data": json.dumps(report_data, ensure_ascii=False)
     }
 
-    r = requests.post(
-        f"{SUPABASE_URL}/rest/v1/weekly_reports?on_conflict=week_label",
-        headers={**get_headers(), "Prefer": "resolution=merge-duplicates"},
-        json=payload
-    )
+    _, errors = get_client().upsert("weekly_reports", [payload], on_conflict="week_label")
 
-    if r.status_code in (200, 201):
+    if not errors:
         print(f"[OK] 리포트 DB 저장 완료: {payload['week_label']}")
         return True
     else:
-        print(f"[ERROR] DB 저장 실패: {r.status_code} - {r.text[:200]}")
+        print(f"[ERROR] DB 저장 실패: {errors[0][1]}")
         return False
 
+@exclusive("weekly_report")
 def main():
     print("=" * 50)
     print("주간 YouTube 트렌드 리포트 생성 시작")
     print("=" * 50)
 
-    # 1. 이번 주 포스트 가져오기
-    posts = fetch_weekly_posts()
-    if not posts:
+    # 1~2. 이번 주 포스트를 스트리밍으로 읽어 GPT-4o로 리포트 생성 (실제 데이터만 사용)
+    report, post_count = generate_weekly_report(fetch_weekly_posts())
+    if not post_count:
         print("[WARN] 이번 주 포스트가 없습니다. 종료.")
         return
-
-    # 2. GPT-4o로 리포트 생성 (실제 데이터만 사용)
-    print(f"[AI] {len(posts)}개 포스트를 기반으로 GPT-4o 분석 중...")
-    report = generate_weekly_report(posts)
     if not report:
         print("[ERROR] 리포트 생성 실패. 종료.")
         return
 
     # 3. DB에 저장
-    save_report_to_db(report, len(posts))
+    save_report_to_db(report, post_count)
+
+    print("=" * 50)
+    print("주간 리포트 생성 완료!")
+    print("=" * 50)
+
+@exclusive("weekly_partials")
+def main_daily():
+    """일자별 부분 요약만 미리 계산해 캐시합니다 (매일 실행)."""
+    print("[DAILY] 최근 7일 부분 요약 갱신 중...")
+    partials = ensure_partials()
+    failed = [day.isoformat() for day, partial in partials.items() if partial is None]
+    if failed:
+        print(f"[WARN] 부분 요약 실패: {', '.join(failed)}")
+    print("[DAILY] 완료!")
+
+@exclusive("weekly_report")
+def main_incremental():
+    """캐시된 부분 요약을 병합해 주간 리포트를 생성합니다."""
+    print("=" * 50)
+    print("주간 YouTube 트렌드 리포트 생성 시작 (증분 모드)")
+    print("=" * 50)
+
+    partials = ensure_partials()
+    failed = [day.isoformat() for day, partial in partials.items() if partial is None]
+    if failed:
+        print(f"[ERROR] 부분 요약 실패: {', '.join(failed)} - 다시 실행하면 성공한 날짜는 캐시를 재사용합니다. 종료.")
+        return
+
+    post_count = sum(partial["post_count"] for partial in partials.values())
+    if not post_count:
+        print("[WARN] 이번 주 포스트가 없습니다. 종료.")
+        return
+
+    report = merge_partials(partials)
+    if not report:
+        print("[ERROR] 리포트 생성 실패. 종료.")
+        return
+
+    save_report_to_db(report, post_count)
 
     print("=" * 50)
     print("주간 리포트 생성 완료!")
     print("=" * 50)
 
 if __name__ == "__main__":
-    main()
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == "--daily":
+        entry = main_daily
+    elif len(sys.argv) > 1 and sys.argv[1] == "--incremental":
+        entry = main_incremental
+    else:
+        entry = main
+
+    if "--profile" in sys.argv:
+        from profiler import profile_call
+        profile_call(entry, "weekly_report_generator")
+    else:
+        entry()
@@ -0,0 +1,237 @@
+"""
+Write-behind Buffer - The Info Club v2.0
+크롤러가 만든 행을 먼저 로컬 SQLite(WAL)에 저장하고, 플러셔가 Supabase로 일괄 upsert합니다.
+- Supabase가 느리거나 다운돼도 번역/AI 인사이트까지 끝난 행을 잃지 않음
+- 대기 행이 FLUSH_HIGH_WATERMARK 이상 쌓이면 크롤링 중에도 자동 플러시
+- 테이블별 플러시 워터마크(마지막으로 반영된 seq)를 기록하고, 다음 실행에서 남은 행부터 재전송
+- 같은 키의 행은 마지막 값 하나로 합쳐 보내므로 재전송해도 멱등
+
+사용법:
+    python write_buffer.py            # 남은 행 플러시
+    python write_buffer.py --status   # 대기/실패 행 수와 워터마크 확인
+"""
+import os
+import json
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+BUFFER_PATH = os.getenv("WRITE_BUFFER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "write_buffer.sqlite3"))
+
+# 대기 행이 이만큼 쌓이면 크롤링 도중에도 플러시
+FLUSH_HIGH_WATERMARK = int(os.getenv("WRITE_BUFFER_HIGH_WATERMARK", "50"))
+# 플러시 한 번에 읽을 최대 행 수
+FLUSH_BATCH_SIZE = 500
+# 개별 행이 이 횟수만큼 거부되면 dead 상태로 두고 더 보내지 않음 (--status로 확인)
+MAX_ATTEMPTS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name TEXT NOT NULL,
+    on_conflict TEXT NOT NULL,
+    row_key TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, seq);
+CREATE TABLE IF NOT EXISTS watermarks (
+    table_name TEXT PRIMARY KEY,
+    flushed_seq INTEGER NOT NULL,
+    flushed_at REAL NOT NULL,
+    flushed_rows INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def is_rejection(error: str) -> bool:
+    """행 자체가 거부된 오류(4xx)인지. 5xx/연결 오류는 장애로 보고 재시도 횟수를 세지 않습니다."""
+    status = error[:3]
+    return status.isdigit() and 400 <= int(status) < 500 and int(status) not in (408, 429)
+
+
+class WriteBuffer:
+    """SQLite 아웃박스. 한 프로세스 안에서는 스레드 간 공유해도 됩니다."""
+
+    def __init__(self, path: str = BUFFER_PATH, client=None):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.Lock()
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            from supabase_client import get_client
+            self._client = get_client()
+        return self._client
+
+    def put(self, table: str, row: Dict, on_conflict: str):
+        """행을 로컬에 기록합니다. 반환 시점에 디스크에 남아 있습니다."""
+        key = json.dumps([row.get(c.strip()) for c in on_conflict.split(",")], ensure_ascii=False)
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO outbox (table_name, on_conflict, row_key, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                (table, on_conflict, key, json.dumps(row, ensure_ascii=False), time.time())
+            )
+
+    def pending(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT count(*) FROM outbox WHERE status = 'pending'").fetchone()[0]
+
+    def flush_if_needed(self) -> int:
+        """대기 행이 하이 워터마크 이상일 때만 플러시합니다."""
+        if self.pending() >= FLUSH_HIGH_WATERMARK:
+            return self.flush()
+        return 0
+
+    def flush(self, max_batches: Optional[int] = None) -> int:
+        """
+        대기 행을 seq 순서로 읽어 테이블별로 일괄 upsert합니다.
+        5xx/연결 오류(장애)가 나거나 일부 행이 거부되면 그 자리에서 멈추고 다음 플러시에서 이어서 보냅니다.
+
+        Returns:
+            Supabase에 반영된 행 수
+        """
+        flushed = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with self.lock:
+                rows = self.conn.execute(
+                    "SELECT seq, table_name, on_conflict, row_key, payload FROM outbox "
+                    "WHERE status = 'pending' ORDER BY seq LIMIT ?", (FLUSH_BATCH_SIZE,)
+                ).fetchall()
+            if not rows:
+                break
+            batches += 1
+
+            saved, stop = self._flush_batch(rows)
+            flushed += saved
+            if stop == "outage":
+                print(f"  ⚠️ Supabase 저장 실패 - 로컬 버퍼에 {self.pending()}개 행 보관 (다음 실행에서 재전송)")
+            if stop:
+                break
+        return flushed
+
+    def _flush_batch(self, rows):
+        # 같은 충돌 키가 한 요청에 두 번 있으면 실패하므로 키마다 한 행으로 합칩니다.
+        # seq 순서대로 덮어써서 순차 upsert와 같은 결과가 되게 합니다 (뒤 행에 없는 컬럼은 앞 행의 값 유지).
+        merged: Dict[tuple, tuple] = {}
+        seqs_by_key = {}
+        for seq, table, on_conflict, key, payload in rows:
+            previous = merged.get((table, key))
+            row = {**previous[2], **json.loads(payload)} if previous else json.loads(payload)
+            merged[(table, key)] = (seq, on_conflict, row)
+            seqs_by_key.setdefault((table, key), []).append(seq)
+
+        # (테이블, on_conflict, 컬럼 집합)별로 묶기: PostgREST 일괄 upsert는 모든 행의 키가 같아야 합니다.
+        # 키마다 한 행뿐이므로 묶음을 보내는 순서와 관계없이 최신 값이 남습니다.
+        groups: Dict[tuple, Dict[str, tuple]] = {}
+        for (table, key), (seq, on_conflict, row) in merged.items():
+            groups.setdefault((table, on_conflict, tuple(sorted(row))), {})[key] = (seq, row)
+
+        saved_total, rejected = 0, False
+        for (table, on_conflict, _), latest in groups.items():
+            batch = [row for _, row in latest.values()]
+            saved, errors = self.client.upsert(table, batch, on_conflict=on_conflict)
+
+            failed, unavailable = {}, {}
+            for row, error in errors:
+                key = json.dumps([row.get(c.strip()) for c in on_conflict.split(",")], ensure_ascii=False)
+                (failed if is_rejection(error) else unavailable)[key] = error
+
+            done, max_seq = [], 0
+            for key, (seq, _) in latest.items():
+                if key in failed or key in unavailable:
+                    continue
+                # 같은 키의 이전 기록(이번 묶음 안, 합쳐서 보냄)도 함께 반영 완료 처리
+                done.extend(seqs_by_key[(table, key)])
+                max_seq = max(max_seq, seq)
+
+            with self.lock:
+                self.conn.execute("BEGIN")
+                self.conn.executemany("DELETE FROM outbox WHERE seq = ?", [(s,) for s in done])
+                for key, error in failed.items():
+                    self.conn.execute(
+                        "UPDATE outbox SET attempts = attempts + 1, last_error = ?, "
+                        "status = CASE WHEN attempts + 1 >= ? THEN 'dead' ELSE status END "
+                        "WHERE table_name = ? AND row_key = ? AND status = 'pending'",
+                        (error[:500], MAX_ATTEMPTS, table, key)
+                    )
+                if max_seq:
+                    self.conn.execute(
+                        "INSERT INTO watermarks (table_name, flushed_seq, flushed_at, flushed_rows) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT (table_name) DO UPDATE SET "
+                        "flushed_seq = max(flushed_seq, excluded.flushed_seq), flushed_at = excluded.flushed_at, "
+                        "flushed_rows = flushed_rows + excluded.flushed_rows",
+                        (table, max_seq, time.time(), saved)
+                    )
+                self.conn.execute("COMMIT")
+
+            saved_total += saved
+            if unavailable:
+                return saved_total, "outage"
+            if failed:
+                print(f"  ❌ {table}: {len(failed)}개 행 저장 거부 (최대 {MAX_ATTEMPTS}회 재시도): {next(iter(failed.values()))[:200]}")
+                # 다른 묶음은 계속 보내고, 거부된 행을 같은 플러시에서 다시 읽지 않도록 이 배치 뒤에 종료
+                rejected = True
+        return saved_total, "rejected" if rejected else None
+
+    def status(self) -> List[Dict]:
+        with self.lock:
+            counts = self.conn.execute(
+                "SELECT table_name, status, count(*), min(created_at) FROM outbox GROUP BY table_name, status"
+            ).fetchall()
+            marks = self.conn.execute("SELECT table_name, flushed_seq, flushed_at, flushed_rows FROM watermarks").fetchall()
+        tables = {}
+        for table, status, count, oldest in counts:
+            entry = tables.setdefault(table, {"table": table, "pending": 0, "dead": 0, "oldest": None})
+            entry[status] = count
+            if status == "pending":
+                entry["oldest"] = oldest
+        for table, seq, at, total in marks:
+            entry = tables.setdefault(table, {"table": table, "pending": 0, "dead": 0, "oldest": None})
+            entry.update({"flushed_seq": seq, "flushed_at": at, "flushed_rows": total})
+        return list(tables.values())
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer() -> WriteBuffer:
+    """프로세스 전체가 공유하는 버퍼 (처음 호출 시 생성)"""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBuffer()
+        return _buffer
+
+
+if __name__ == "__main__":
+    import sys
+    from datetime import datetime
+
+    buffer = get_buffer()
+    if "--status" not in sys.argv:
+        print("🚚 로컬 버퍼 플러시...")
+        print(f"  ✅ {buffer.flush()}개 행 반영")
+
+    for entry in buffer.status():
+        oldest = datetime.fromtimestamp(entry["oldest"]).isoformat(timespec="seconds") if entry["oldest"] else "-"
+        flushed_at = datetime.fromtimestamp(entry["flushed_at"]).isoformat(timespec="seconds") if entry.get("flushed_at") else "-"
+        print(f"  📦 {entry['table']}: 대기 {entry['pending']}개 (가장 오래된 행 {oldest}), 실패 {entry['dead']}개, "
+              f"워터마크 seq {entry.get('flushed_seq', 0)} @ {flushed_at}, 누적 {entry.get('flushed_rows', 0)}개")
+    buffer.close()
@@ -4,16 +4,22 @@ YouTube Data API를 사용하여 카테고리별 한국/해외 인기 동영상
 각 카테고리별로 KR 10개 + US 10개씩 수집합니다.
 """
 import os
+import json
+import math
+import hashlib
+import threading
 import requests
-from typing import List, Dict
-from dotenv import load_dotenv
-from datetime import datetime, date
-
-load_dotenv()
-
-YOUTUBE_API_KEY = os.getenv("YOUTUBE_API_KEY")
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional
+from zoneinfo import ZoneInfo
+from settings import settings
+import resilience
+import job_lease
+from job_lease import exclusive
+from supabase_client import get_client, refresh_trend_views
+from datetime import datetime, date, timezone
+
+YOUTUBE_API_KEY = settings.youtube_api_key
 
 # YouTube 카테고리 ID → 이름 매핑
 CATEGORY_MAP = {
@@ -43,20 +49,140 @@ TARGET_CATEGORIES = [
 # 수집 대상 지역
 TARGET_REGIONS = ["KR", "US"]
 
-# 카테고리별 지역별 수집 수
+# 카테고리별 지역별 수집 수 (50개 초과 시 pageToken으로 다음 페이지 수집)
 PER_CATEGORY_PER_REGION = 10
 
+# videos.list 한 페이지당 최대 결과 수 / 호출당 할당량 비용
+MAX_RESULTS_PER_PAGE = 50
+VIDEOS_LIST_COST = 1
+
+# 동시 요청 수
+MAX_WORKERS = 8
+
+# 한 번의 실행이 넘지 않을 시간 (초, 6시간 주기 안에서 여유 있게)
+RUN_BUDGET_SECONDS = int(os.getenv("YOUTUBE_RUN_BUDGET_SECONDS", "1800"))
+
+# YouTube Data API 일일 할당량 (태평양 시간 자정에 초기화)
+DAILY_QUOTA = int(os.getenv("YOUTUBE_DAILY_QUOTA", "10000"))
+QUOTA_FILE = os.getenv("YOUTUBE_QUOTA_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "youtube_quota.json"))
+
+# ETag 조건부 요청용 응답 캐시 (요청 파라미터별 본문 + ETag)
+RESPONSE_CACHE_DIR = os.getenv("YOUTUBE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "youtube"))
+
+
+class QuotaTracker:
+    """
+    YouTube Data API 할당량 사용량을 호출 단위로 기록합니다.
+    사용량은 QUOTA_FILE에 태평양 시간 날짜별로 저장되어 같은 날 여러 번 실행해도 누적됩니다.
+    """
+
+    def __init__(self, budget=DAILY_QUOTA, path=QUOTA_FILE):
+        self.budget = budget
+        self.path = path
+        self.day = datetime.now(ZoneInfo("America/Los_Angeles")).date().isoformat()
+        self._lock = threading.Lock()
+        self.used = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f).get(self.day, 0)
+        except (OSError, ValueError):
+            return 0
+
+    @property
+    def remaining(self):
+        return self.budget - self.used
+
+    def reserve(self, units):
+        """units만큼 쓸 수 있으면 차감하고 True, 초과하면 False를 반환합니다."""
+        with self._lock:
+            if self.used + units > self.budget:
+                return False
+            self.used += units
+            return True
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump({self.day: self.used}, f)
+        except OSError as e:
+            print(f"  ⚠️ 할당량 기록 저장 실패: {e}")
+
+
+def create_session(pool_size=MAX_WORKERS):
+    """동시 요청용 keep-alive 세션"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return session
+
+
+def response_cache_path(params: Dict) -> str:
+    # API 키는 응답 내용과 무관하므로 캐시 키에서 제외
+    key = json.dumps({k: v for k, v in params.items() if k != "key"}, sort_keys=True)
+    return os.path.join(RESPONSE_CACHE_DIR, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json")
+
+
+def load_cached_response(params: Dict) -> Optional[Dict]:
+    try:
+        with open(response_cache_path(params), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_cached_response(params: Dict, etag: str, body: Dict):
+    path = response_cache_path(params)
+    try:
+        os.makedirs(RESPONSE_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"etag": etag, "body": body}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"  ⚠️ 응답 캐시 저장 실패: {e}")
 
-def get_supabase_headers():
-    return {
-        "apikey": SUPABASE_KEY,
-        "Authorization": f"Bearer {SUPABASE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "resolution=merge-duplicates"
-    }
 
+def get_with_etag(http, url: str, params: Dict):
+    """
+    캐시된 ETag로 If-None-Match 조건부 요청을 보냅니다.
+    304면 캐시된 본문을, 200이면 새 본문을 캐시에 저장한 뒤 반환합니다.
 
-def fetch_videos_by_category(category_id: str, category_name: str, region_code: str = "KR", max_results: int = 10) -> List[Dict]:
+    Returns:
+        (status_code, body) - body는 실패 시 None
+    """
+    cached = load_cached_response(params)
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+
+    breaker = resilience.get_breaker("youtube")
+    breaker.check()
+    try:
+        response = http.get(url, params=params, headers=headers, timeout=resilience.timeout(10))
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_status(response.status_code)
+    if response.status_code == 304 and cached:
+        return 200, cached["body"]
+    if response.status_code != 200:
+        return response.status_code, None
+
+    body = response.json()
+    etag = response.headers.get("ETag") or body.get("etag")
+    if etag:
+        store_cached_response(params, etag, body)
+    return 200, body
+
+
+def estimate_cost(max_results):
+    """카테고리 하나 + 지역 하나를 수집하는 데 드는 할당량"""
+    return math.ceil(max_results / MAX_RESULTS_PER_PAGE) * VIDEOS_LIST_COST
+
+
+def fetch_videos_by_category(category_id: str, category_name: str, region_code: str = "KR", max_results: int = 10,
+                             session: Optional[requests.Session] = None, quota: Optional[QuotaTracker] = None) -> List[Dict]:
     """
     특정 카테고리 + 지역의 YouTube 인기 동영상을 수집합니다.
 
@@ -64,7 +190,9 @@ def fetch_videos_by_category(category_id: str, category_name: str, region_code:
         category_id: YouTube 카테고리 ID
         category_name: 카테고리 이름 (한글)
         region_code: 국가 코드 (KR, US)
-        max_results: 수집할 영상 수
+        max_results: 수집할 영상 수 (50개 초과 시 여러 페이지)
+        session: 재사용할 HTTP 세션
+        quota: 할당량 기록기 (페이지마다 차감, 초과 시 수집 중단)
 
     Returns:
         list of video data dicts
@@ -74,97 +202,170 @@ def fetch_videos_by_category(category_id: str, category_name: str, region_code:
         return []
 
     url = "https://www.googleapis.com/youtube/v3/videos"
-    params = {
-        "part": "snippet,statistics",
-        "chart": "mostPopular",
-        "regionCode": region_code,
-        "videoCategoryId": category_id,
-        "maxResults": max_results,
-        "key": YOUTUBE_API_KEY
-    }
+    http = session or requests
+    videos = []
+    page_token = None
 
     try:
-        response = requests.get(url, params=params, timeout=10)
-        if response.status_code != 200:
-            print(f"  ❌ YouTube API Error ({region_code}/{category_name}): {response.status_code}")
-            return []
-
-        data = response.json()
-        videos = []
-
-        for item in data.get("items", []):
-            snippet = item.get("snippet", {})
-            stats = item.get("statistics", {})
-
-            videos.append({
-                "video_id": item["id"],
-                "title": snippet.get("title", ""),
-                "channel_title": snippet.get("channelTitle", ""),
-                "category": category_name,
-                "view_count": int(stats.get("viewCount", 0)),
-                "like_count": int(stats.get("likeCount", 0)),
-                "comment_count": int(stats.get("commentCount", 0)),
-                "region": region_code,
-                "thumbnail_url": snippet.get("thumbnails", {}).get("high", {}).get("url", ""),
-                "trending_date": date.today().isoformat(),
-                "crawled_at": datetime.now().isoformat()
-            })
+        while len(videos) < max_results:
+            if resilience.out_of_time():
+                print(f"  ⏰ 실행 시간 초과로 중단 ({region_code}/{category_name})")
+                break
+            if job_lease.lease_lost():
+                print(f"  ⛔ 실행 임대를 잃어 중단 ({region_code}/{category_name})")
+                break
+            if resilience.get_breaker("youtube").state == resilience.OPEN:
+                print(f"  ⏭️ YouTube 서킷 브레이커 열림, 건너뜀 ({region_code}/{category_name})")
+                break
+            if quota and not quota.reserve(VIDEOS_LIST_COST):
+                print(f"  ⛔ 할당량 부족으로 중단 ({region_code}/{category_name}, 남은 할당량: {quota.remaining})")
+                break
+
+            params = {
+                "part": "snippet,statistics",
+                "chart": "mostPopular",
+                "regionCode": region_code,
+                "videoCategoryId": category_id,
+                "maxResults": min(MAX_RESULTS_PER_PAGE, max_results - len(videos)),
+                "key": YOUTUBE_API_KEY
+            }
+            if page_token:
+                params["pageToken"] = page_token
+
+            status_code, data = get_with_etag(http, url, params)
+            if status_code != 200:
+                print(f"  ❌ YouTube API Error ({region_code}/{category_name}): {status_code}")
+                break
+
+            for item in data.get("items", []):
+                snippet = item.get("snippet", {})
+                stats = item.get("statistics", {})
+
+                videos.append({
+                    "video_id": item["id"],
+                    "title": snippet.get("title", ""),
+                    "channel_title": snippet.get("channelTitle", ""),
+                    "category": category_name,
+                    "view_count": int(stats.get("viewCount", 0)),
+                    "like_count": int(stats.get("likeCount", 0)),
+                    "comment_count": int(stats.get("commentCount", 0)),
+                    "region": region_code,
+                    "thumbnail_url": snippet.get("thumbnails", {}).get("high", {}).get("url", ""),
+                    "trending_date": date.today().isoformat(),
+                    "crawled_at": datetime.now().isoformat()
+                })
+
+            page_token = data.get("nextPageToken")
+            if not page_token:
+                break
 
         print(f"  ✅ [{region_code}] {category_name}: {len(videos)}개 수집")
-        return videos
+        return videos[:max_results]
 
     except Exception as e:
         print(f"  ❌ Exception ({region_code}/{category_name}): {e}")
-        return []
+        return videos[:max_results]
 
 
 def save_to_supabase(videos: List[Dict]):
-    """수집한 동영상 데이터를 Supabase에 저장합니다."""
-    if not SUPABASE_URL or not SUPABASE_KEY:
+    """수집한 동영상 데이터를 Supabase에 일괄 upsert합니다."""
+    supabase = get_client()
+    if not supabase.configured:
         print("  ⚠️ Supabase credentials not set.")
         return
 
-    endpoint = f"{SUPABASE_URL}/rest/v1/youtube_trends?on_conflict=video_id"
-    headers = get_supabase_headers()
+    # 같은 영상이 KR/US 차트에 모두 오르면 한 요청 안에 video_id가 중복되므로 마지막 값만 남깁니다
+    rows = list({video["video_id"]: video for video in videos}.values())
+    saved, errors = supabase.upsert("youtube_trends", rows, on_conflict="video_id")
+    for video, error in errors:
+        print(f"  ⚠️ Save failed for {video['title'][:30]}: {error}")
 
-    saved = 0
-    for video in videos:
-        try:
-            resp = requests.post(endpoint, json=video, headers=headers, timeout=10)
-            if resp.status_code in range(200, 300):
-                saved += 1
-            else:
-                print(f"  ⚠️ Save failed for {video['title'][:30]}: {resp.status_code}")
-        except Exception as e:
-            print(f"  ❌ Save error: {e}")
+    print(f"  💾 {saved}/{len(rows)}개 저장 완료")
 
-    print(f"  💾 {saved}/{len(videos)}개 저장 완료")
 
+def save_snapshots(videos: List[Dict]):
+    """이번 크롤링의 조회수/좋아요/댓글 수를 youtube_video_snapshots에 한 번에 추가합니다 (append-only)."""
+    supabase = get_client()
+    if not supabase.configured or not videos:
+        return
 
-def run_youtube_crawler():
-    """YouTube 카테고리별 트렌딩 크롤러 실행"""
+    captured_at = datetime.now(timezone.utc).isoformat()
+    # 지역별 성장 속도를 따로 계산하므로 (video_id, region)마다 한 행. KR/US 차트에 모두 오른 영상은 두 행입니다.
+    by_region = {(video["video_id"], video["region"]): video for video in videos}
+    rows = [
+        {
+            "video_id": video["video_id"],
+            "category": video["category"],
+            "region": video["region"],
+            "view_count": video["view_count"],
+            "like_count": video["like_count"],
+            "comment_count": video["comment_count"],
+            "captured_at": captured_at,
+        }
+        for video in by_region.values()
+    ]
+
+    saved, errors = supabase.insert("youtube_video_snapshots", rows)
+    if errors:
+        print(f"  ⚠️ 스냅샷 기록 실패 {len(errors)}개: {errors[0][1]}")
+    print(f"  📸 스냅샷 {saved}개 기록")
+
+
+@exclusive("youtube")
+@resilience.budgeted(RUN_BUDGET_SECONDS, "youtube")
+def run_youtube_crawler(max_results: int = PER_CATEGORY_PER_REGION):
+    """YouTube 카테고리별 트렌딩 크롤러 실행 (카테고리 × 지역 동시 수집, 할당량 관리)"""
     print(f"\n[{datetime.now()}] 🎬 YouTube Category Crawler 시작...")
-    print(f"  📋 수집 대상: {len(TARGET_CATEGORIES)}개 카테고리 × {len(TARGET_REGIONS)}개 지역 × {PER_CATEGORY_PER_REGION}개")
+    print(f"  📋 수집 대상: {len(TARGET_CATEGORIES)}개 카테고리 × {len(TARGET_REGIONS)}개 지역 × {max_results}개")
 
-    all_videos = []
+    quota = QuotaTracker()
+    tasks = [(category, region) for category in TARGET_CATEGORIES for region in TARGET_REGIONS]
+
+    # 이번 실행이 남은 할당량을 넘으면 앞쪽 작업만 실행하고 나머지는 다음 실행으로 미룹니다
+    cost = estimate_cost(max_results)
+    affordable = max(quota.remaining, 0) // cost
+    if affordable < len(tasks):
+        deferred = tasks[affordable:]
+        tasks = tasks[:affordable]
+        print(f"  ⛔ 할당량 부족 (남은 {quota.remaining}/{quota.budget}): {len(deferred)}개 작업을 다음 실행으로 미룹니다")
+    print(f"  🎫 예상 할당량: {cost * len(tasks)} units (오늘 사용: {quota.used}/{quota.budget})")
 
-    for category in TARGET_CATEGORIES:
-        cat_id = category["id"]
-        cat_name = category["name"]
-        print(f"\n  🏷️ [{cat_name}] 카테고리 수집 중...")
-
-        for region in TARGET_REGIONS:
-            videos = fetch_videos_by_category(
-                category_id=cat_id,
-                category_name=cat_name,
-                region_code=region,
-                max_results=PER_CATEGORY_PER_REGION
+    all_videos = []
+    session = create_session()
+    try:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            results = pool.map(
+                job_lease.inherit(resilience.inherit(lambda task: fetch_videos_by_category(
+                    category_id=task[0]["id"],
+                    category_name=task[0]["name"],
+                    region_code=task[1],
+                    max_results=max_results,
+                    session=session,
+                    quota=quota
+                ))),
+                tasks
             )
-            all_videos.extend(videos)
+            for videos in results:
+                all_videos.extend(videos)
+    finally:
+        session.close()
+        quota.save()
+    print(f"  🎫 할당량 사용: {quota.used}/{quota.budget} units")
 
     if all_videos:
         print(f"\n  📦 총 {len(all_videos)}개 영상 Supabase 저장 중...")
         save_to_supabase(all_videos)
+        save_snapshots(all_videos)
+
+        # 스냅샷 기반 성장 속도 / 급상승 테이블 갱신
+        try:
+            from youtube_velocity import run_velocity_job
+            run_velocity_job()
+        except Exception as e:
+            print(f"  ❌ Velocity job error: {e}")
+
+        # 대시보드/분석기용 카테고리별 인기 영상 집계 갱신
+        refresh_trend_views(["youtube_category_top"])
     else:
         print("  ⚠️ 수집된 영상이 없습니다.")
 
@@ -176,7 +377,11 @@ if __name__ == "__main__":
     import sys
     if len(sys.argv) > 1 and sys.argv[1] == "--once":
         print("🚀 YouTube Category Crawler (단일 실행)...")
-        run_youtube_crawler()
+        if "--profile" in sys.argv:
+            from profiler import profile_call
+            profile_call(run_youtube_crawler, "youtube_trending")
+        else:
+            run_youtube_crawler()
         print("✅ 완료!")
     else:
         import time as time_module
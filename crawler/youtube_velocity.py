@@ -0,0 +1,174 @@
+"""
+YouTube Velocity Job - The Info Club v2.0
+youtube_video_snapshots의 연속된 스냅샷으로 영상별/카테고리별 성장 속도를 계산하고,
+대시보드와 trend_analyzer가 바로 읽을 수 있는 작은 급상승 테이블을 갱신합니다.
+"""
+from typing import List, Dict
+from datetime import datetime, timedelta, timezone
+from supabase_client import get_client, quote_value
+
+# 속도 계산에 사용할 스냅샷 기간 (크롤링 6시간 간격 기준 최소 3개 스냅샷 확보)
+LOOKBACK_HOURS = 48
+
+# 스냅샷 조회 페이지 크기
+PAGE_SIZE = 1000
+
+# youtube_rising에 남길 영상 수
+RISING_TOP_N = 100
+
+
+def fetch_snapshots(hours: int = LOOKBACK_HOURS) -> List[Dict]:
+    """최근 N시간의 스냅샷을 id 키셋 페이지네이션으로 가져옵니다."""
+    since = (datetime.now(timezone.utc) - timedelta(hours=hours)).isoformat()
+    return list(get_client().iter_select(
+        "youtube_video_snapshots",
+        select="video_id,category,region,view_count,like_count,captured_at",
+        filters={"captured_at": f"gte.{since}"},
+        order=("id",),
+        page_size=PAGE_SIZE
+    ))
+
+
+def compute_velocity(snapshots: List[Dict]):
+    """
+    스냅샷에서 영상별 최신 성장 지표를 한 번에 계산합니다.
+    같은 영상이 여러 지역 차트에 오르면 같은 captured_at에 지역마다 스냅샷이 있으므로 (video_id, region)별로 계산합니다.
+
+    Returns:
+        (videos, categories) DataFrame 튜플
+        - videos: (video_id, region)별 views_per_hour, like_rate, acceleration (views_per_hour 내림차순)
+        - categories: (category, region)별 요약
+    """
+    import numpy as np
+    import pandas as pd
+
+    df = pd.DataFrame(snapshots)
+    if df.empty:
+        return df, df
+
+    df["captured_at"] = pd.to_datetime(df["captured_at"], utc=True)
+    series = ["video_id", "region"]
+    df = (
+        df.sort_values(series + ["captured_at"], kind="stable")
+          .drop_duplicates(series + ["captured_at"], keep="last")
+    )
+
+    by_video = df.groupby(series, sort=False, dropna=False)
+    hours = by_video["captured_at"].diff().dt.total_seconds() / 3600
+    hours = hours.where(hours > 0)
+
+    df["views_per_hour"] = by_video["view_count"].diff() / hours
+    df["acceleration"] = df.groupby(series, sort=False, dropna=False)["views_per_hour"].diff() / hours
+    df["like_rate"] = np.where(df["view_count"] > 0, df["like_count"] / df["view_count"].clip(lower=1), 0.0)
+
+    videos = df.groupby(series, sort=False, dropna=False).tail(1)
+    videos = videos[videos["views_per_hour"].notna()].copy()
+    videos["acceleration"] = videos["acceleration"].fillna(0.0)
+    videos = videos.sort_values("views_per_hour", ascending=False)
+
+    categories = (
+        videos.groupby(["category", "region"])
+              .agg(
+                  video_count=("video_id", "size"),
+                  total_views_per_hour=("views_per_hour", "sum"),
+                  median_views_per_hour=("views_per_hour", "median"),
+                  avg_like_rate=("like_rate", "mean"),
+                  avg_acceleration=("acceleration", "mean"),
+              )
+              .reset_index()
+              .sort_values("total_views_per_hour", ascending=False)
+    )
+    return videos, categories
+
+
+def fetch_video_titles(video_ids: List[str]) -> Dict[str, Dict]:
+    """youtube_trends에서 영상 제목/채널명을 가져옵니다."""
+    if not video_ids:
+        return {}
+    rows = get_client().select("youtube_trends", {
+        "select": "video_id,title,channel_title",
+        "video_id": f"in.({','.join(quote_value(vid) for vid in video_ids)})"
+    })
+    return {row["video_id"]: row for row in rows}
+
+
+def save_rising(videos, categories, computed_at: str):
+    """급상승 영상/카테고리 요약을 일괄 upsert하고, 이번 계산에 포함되지 않은 영상/카테고리는 정리합니다."""
+    supabase = get_client()
+
+    # youtube_rising은 video_id가 키이므로 여러 지역에 오른 영상은 가장 빠른 지역 하나만 남깁니다.
+    top = videos.drop_duplicates("video_id").head(RISING_TOP_N)
+    titles = fetch_video_titles(top["video_id"].tolist())
+    rising_rows = [
+        {
+            "video_id": row.video_id,
+            "title": titles.get(row.video_id, {}).get("title", ""),
+            "channel_title": titles.get(row.video_id, {}).get("channel_title", ""),
+            "category": row.category,
+            "region": row.region,
+            "view_count": int(row.view_count),
+            "views_per_hour": round(float(row.views_per_hour), 1),
+            "like_rate": round(float(row.like_rate), 4),
+            "acceleration": round(float(row.acceleration), 2),
+            "computed_at": computed_at,
+        }
+        for row in top.itertuples()
+    ]
+    category_rows = [
+        {
+            "category": row.category,
+            "region": row.region,
+            "video_count": int(row.video_count),
+            "total_views_per_hour": round(float(row.total_views_per_hour), 1),
+            "median_views_per_hour": round(float(row.median_views_per_hour), 1),
+            "avg_like_rate": round(float(row.avg_like_rate), 4),
+            "avg_acceleration": round(float(row.avg_acceleration), 2),
+            "computed_at": computed_at,
+        }
+        for row in categories.itertuples()
+    ]
+
+    for table, rows, conflict in (
+        ("youtube_rising", rising_rows, "video_id"),
+        ("youtube_category_velocity", category_rows, "category,region"),
+    ):
+        if not rows:
+            continue
+        saved, errors = supabase.upsert(table, rows, on_conflict=conflict)
+        if errors:
+            print(f"  ❌ {table} 저장 실패 {len(errors)}개: {errors[0][1]}")
+            return
+        print(f"  💾 {table}: {saved}개 갱신")
+
+    # 이번 순위에서 빠진 영상과 이번 계산에 영상이 없는 카테고리 정리 (이전 계산 값이 남지 않도록)
+    supabase.delete("youtube_rising", {"computed_at": f"lt.{computed_at}"})
+    supabase.delete("youtube_category_velocity", {"computed_at": f"lt.{computed_at}"})
+
+
+def run_velocity_job():
+    """스냅샷 → 성장 속도 계산 → 급상승 테이블 갱신"""
+    if not get_client().configured:
+        print("  ⚠️ Supabase credentials not set.")
+        return
+
+    print(f"\n[{datetime.now()}] 🚀 YouTube Velocity Job 시작...")
+    computed_at = datetime.now(timezone.utc).isoformat()
+
+    snapshots = fetch_snapshots()
+    videos, categories = compute_velocity(snapshots)
+    print(f"  📊 스냅샷 {len(snapshots)}개 → 속도 계산 가능한 영상 {len(videos)}개")
+
+    if videos.empty:
+        print("  ⚠️ 속도를 계산할 스냅샷이 부족합니다 (영상당 2회 이상 수집 필요).")
+        return
+
+    save_rising(videos, categories, computed_at)
+
+    print("\n  🔥 시간당 조회수 TOP 5:")
+    for row in videos.head(5).itertuples():
+        print(f"    • [{row.region}/{row.category}] {row.video_id}: {row.views_per_hour:,.0f} views/h (좋아요율 {row.like_rate:.2%})")
+    print("  🚀 YouTube Velocity Job 완료!\n")
+
+
+if __name__ == "__main__":
+    run_velocity_job()
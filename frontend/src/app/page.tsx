@@ -3,16 +3,19 @@ import { Hero } from '@/components/Hero'
 import { PostCard } from '@/components/PostCard'
 import { TrendDashboard } from '@/components/TrendDashboard'
 import AuthGuard from '@/components/AuthGuard'
-import { Newspaper, Trophy, Users, Sparkles } from 'lucide-react'
+import { Newspaper, Trophy, Users, Sparkles, Search } from 'lucide-react'
 
 // Fetch data from Supabase
 export const revalidate = 0; // Disable static caching
 
+// 피드 카드에 필요한 컬럼만 (본문 content_ko/content_original은 카드에서 펼칠 때 로드, migrate_v10.sql)
+const FEED_COLUMNS = 'id,title,subreddit,url,author,created_at,upvotes,comment_count,ai_insight,preview'
+
 async function getPosts() {
   // ai_insight가 있는 최신 포스트 우선 가져오기
   const { data: withInsight, error: e1 } = await supabase
     .from('posts')
-    .select('*')
+    .select(FEED_COLUMNS)
     .not('ai_insight', 'is', null)
     .order('created_at', { ascending: false })
     .limit(30)
@@ -27,7 +30,7 @@ async function getPosts() {
     const insightIds = insightPosts.map((p: any) => p.id)
     const { data: recent, error: e2 } = await supabase
       .from('posts')
-      .select('*')
+      .select(FEED_COLUMNS)
       .order('created_at', { ascending: false })
       .limit(30)
     if (!e2 && recent) {
@@ -39,9 +42,23 @@ async function getPosts() {
   return insightPosts
 }
 
+// 전체 기록 전문 검색 (search_posts RPC, migrate_v14.sql) - 반환 컬럼이 FEED_COLUMNS를 포함해 PostCard에 그대로 사용
+async function searchPosts(query: string) {
+  const { data, error } = await supabase.rpc('search_posts', { p_query: query, p_limit: 30 })
+  if (error) {
+    console.error('Error searching posts:', error)
+    return []
+  }
+  return data || []
+}
 
-export default async function Home() {
-  const posts = await getPosts()
+
+export default async function Home({ searchParams }: { searchParams: Promise<{ q?: string }> }) {
+  const query = ((await searchParams).q || '').trim()
+  const [posts, results] = await Promise.all([
+    getPosts(),
+    query ? searchPosts(query) : Promise.resolve(null),
+  ])
 
   return (
     <AuthGuard>
@@ -88,6 +105,41 @@ export default async function Home() {
           </section>
         )}
 
+        {/* 🔎 지난 포스트 검색 */}
+        <section id="search" className="container mx-auto px-4 md:px-6 py-12">
+          <form action="/#search" method="get" className="flex gap-2 max-w-2xl">
+            <input
+              type="search"
+              name="q"
+              defaultValue={query}
+              placeholder="지난 글 검색 (예: RPM drop, 쇼츠 수익화)"
+              className="flex-1 border rounded-lg px-4 py-2 bg-card/50"
+            />
+            <button type="submit" className="flex items-center gap-2 border rounded-lg px-4 py-2 font-medium">
+              <Search className="h-4 w-4" />
+              검색
+            </button>
+          </form>
+
+          {results && (
+            <div className="mt-8">
+              <h2 className="text-2xl font-bold tracking-tighter mb-6">
+                &quot;{query}&quot; 검색 결과
+                <span className="text-lg font-normal text-muted-foreground ml-3">{results.length}개</span>
+              </h2>
+              {results.length === 0 ? (
+                <p className="text-muted-foreground">일치하는 글이 없습니다.</p>
+              ) : (
+                <div className="grid gap-6 md:grid-cols-2 lg:grid-cols-3">
+                  {results.map((post: any) => (
+                    <PostCard key={`search-${post.id}`} post={post} />
+                  ))}
+                </div>
+              )}
+            </div>
+          )}
+        </section>
+
         {/* Recent Posts Grid */}
         <section id="posts" className="container mx-auto px-4 md:px-6 py-12">
           <h2 className="text-3xl font-bold tracking-tighter mb-8 border-b pb-4">
@@ -4,12 +4,13 @@ import { useState } from 'react'
 import { MessageSquare, ThumbsUp, Globe, Sparkles } from 'lucide-react'
 import { formatDistanceToNow } from 'date-fns'
 import { ko } from 'date-fns/locale'
+import { supabase } from '@/lib/supabaseClient'
 
 interface PostProps {
     post: {
         id: string
         title: string
-        content: string
+        preview?: string | null
         subreddit: string
         url: string
         author: string
@@ -20,19 +21,60 @@ interface PostProps {
     }
 }
 
-export function PostCard({ post }: PostProps) {
-    // Simple parsing of content to separate Korean summary and English original
-    // Expected format: "### 🇰🇷 요약\n...\n\n---\n### 🇺🇸 원문\n..."
+interface PostBody {
+    korean: string
+    english: string
+}
 
-    const parts = post.content.split('---')
-    const koreanPart = parts[0] || post.content
-    const englishPart = parts[1] || ""
+// 목록 조회는 preview만 가져오고, 본문은 카드를 펼칠 때 한 번만 로드합니다.
+async function fetchPostBody(id: string): Promise<PostBody | null> {
+    const { data, error } = await supabase
+        .from('posts')
+        .select('content_ko,content_original,content')
+        .eq('id', id)
+        .single()
+
+    if (error || !data) {
+        console.error('Error fetching post body:', error)
+        return null
+    }
 
+    if (data.content_original !== null) {
+        // 본문 번역은 나중에 채워집니다 (migrate_v15.sql). 처음 읽은 글은 번역 대기열 맨 앞에 올립니다.
+        if (!data.content_ko) {
+            supabase.rpc('request_post_translation', { p_id: id }).then(({ error }) => {
+                if (error) console.error('Error requesting translation:', error)
+            })
+        }
+        return { korean: data.content_ko || '', english: data.content_original || '' }
+    }
+
+    // 백필 전 행: "### 🇰🇷 요약\n...\n\n---\n### 🇺🇸 원문\n..." 형식의 content를 나눠 씁니다.
+    const parts = (data.content || '').split('---')
+    return {
+        korean: (parts[0] || '').replace('### 🇰🇷 요약', '').trim(),
+        english: (parts[1] || '').replace('### 🇺🇸 원문', '').trim(),
+    }
+}
+
+export function PostCard({ post }: PostProps) {
+    const [body, setBody] = useState<PostBody | null>(null)
+    const [loading, setLoading] = useState(false)
     const [showOriginal, setShowOriginal] = useState(false)
 
-    // Clean up markdown headers if needed for display, or just render as is
-    // For now, simpler display
-    const displayContent = showOriginal ? englishPart.replace('### 🇺🇸 원문', '').trim() : koreanPart.replace('### 🇰🇷 요약', '').trim()
+    const toggleOriginal = async () => {
+        if (!showOriginal && !body) {
+            setLoading(true)
+            setBody(await fetchPostBody(post.id))
+            setLoading(false)
+        }
+        setShowOriginal(!showOriginal)
+    }
+
+    // 본문을 불러온 뒤 한글로 돌아오면 미리보기 대신 번역 전문을 보여 줍니다 (번역이 아직 없으면 미리보기).
+    const displayContent = showOriginal && body
+        ? body.english
+        : (body?.korean || post.preview || '')
 
     return (
         <div className="group rounded-lg border bg-card text-card-foreground shadow-sm hover:shadow-md transition-all">
@@ -65,15 +107,14 @@ export function PostCard({ post }: PostProps) {
                     </div>
                 )}
 
-                {englishPart && (
-                    <button
-                        onClick={() => setShowOriginal(!showOriginal)}
-                        className="text-xs flex items-center gap-1 text-blue-500 hover:underline"
-                    >
-                        <Globe className="h-3 w-3" />
-                        {showOriginal ? "한글 요약 보기" : "See Original (English)"}
-                    </button>
-                )}
+                <button
+                    onClick={toggleOriginal}
+                    disabled={loading}
+                    className="text-xs flex items-center gap-1 text-blue-500 hover:underline disabled:opacity-50"
+                >
+                    <Globe className="h-3 w-3" />
+                    {loading ? "불러오는 중..." : showOriginal ? "한글 요약 보기" : "See Original (English)"}
+                </button>
 
                 <div className="flex items-center space-x-4 pt-2">
                     <div className="flex items-center space-x-1 text-sm text-muted-foreground">
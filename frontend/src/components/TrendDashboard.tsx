@@ -125,18 +125,30 @@ export function TrendDashboard() {
                 setLoading(true)
                 setError(null)
 
-                // YouTube Trends - 넉넉하게 가져와서 프론트에서 필터
-                const yt = await supabaseFetch(
-                    'youtube_trends',
-                    'select=*&order=view_count.desc&limit=300'
+                // YouTube Trends - 서버 집계 뷰(카테고리/지역별 TOP 20), 없으면 원본 테이블
+                let yt = await supabaseFetch(
+                    'youtube_category_top',
+                    'select=*&order=view_count.desc'
                 )
+                if (!Array.isArray(yt) || yt.length === 0) {
+                    yt = await supabaseFetch(
+                        'youtube_trends',
+                        'select=*&order=view_count.desc&limit=300'
+                    )
+                }
                 setYoutubeData(Array.isArray(yt) ? yt : [])
 
-                // Google Trends
-                const gt = await supabaseFetch(
-                    'google_trends',
+                // Google Trends - 키워드별 최신 방향 요약, 없으면 원본 테이블
+                let gt = await supabaseFetch(
+                    'google_keyword_summary',
                     'select=*&order=crawled_at.desc&limit=30'
                 )
+                if (!Array.isArray(gt) || gt.length === 0) {
+                    gt = await supabaseFetch(
+                        'google_trends',
+                        'select=*&order=crawled_at.desc&limit=30'
+                    )
+                }
                 setGoogleData(Array.isArray(gt) ? gt : [])
 
                 // Weekly Report (latest)
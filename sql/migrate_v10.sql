@@ -0,0 +1,81 @@
+-- =====================================================
+-- posts.content (한국어 요약 + 영어 원문을 합친 마크다운) 분리
+--   content_original : Reddit 원문 (AI 분석/주간 리포트가 읽는 컬럼)
+--   content_ko       : 한국어 번역 (상세 보기에서만 필요할 때 로드)
+--   preview          : 피드 카드용 짧은 미리보기 (목록 조회는 이 컬럼만 선택)
+-- 기존 content 컬럼은 구버전 호환을 위해 남겨 둡니다 (새 행에는 기록하지 않음).
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+-- 1. 새 컬럼
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS content_original text;
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS content_ko text;
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS preview text;
+
+-- 2. 기존 행 분리 (한 번에 p_batch개씩, 처리한 행 수 반환)
+--    crawler.py가 저장하던 형식: "### 🇰🇷 요약\n{번역}\n\n---\n### 🇺🇸 원문\n{원문}"
+CREATE OR REPLACE FUNCTION public.backfill_post_content(p_batch integer DEFAULT 1000)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    ko_header constant text := E'### 🇰🇷 요약\n';
+    separator constant text := E'\n\n---\n### 🇺🇸 원문\n';
+    updated integer;
+BEGIN
+    WITH batch AS (
+        SELECT id FROM public.posts
+        WHERE content_original IS NULL AND content IS NOT NULL
+        LIMIT p_batch
+        FOR UPDATE SKIP LOCKED
+    ),
+    parsed AS (
+        SELECT
+            p.id,
+            CASE WHEN p.content LIKE ko_header || '%' AND strpos(p.content, separator) > 0
+                 THEN split_part(p.content, separator, 2)
+                 ELSE p.content END AS original,
+            CASE WHEN p.content LIKE ko_header || '%' AND strpos(p.content, separator) > 0
+                 THEN substr(split_part(p.content, separator, 1), length(ko_header) + 1) END AS ko
+        FROM public.posts p JOIN batch USING (id)
+    )
+    UPDATE public.posts p
+    SET content_original = parsed.original,
+        content_ko = parsed.ko,
+        preview = left(btrim(coalesce(nullif(parsed.ko, ''), parsed.original)), 300)
+    FROM parsed
+    WHERE p.id = parsed.id;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.backfill_post_content(integer) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.backfill_post_content(integer) TO service_role;
+
+-- 3. 전체 백필: 배치마다 커밋하므로 긴 잠금/거대한 트랜잭션이 생기지 않습니다.
+--    이 파일을 실행한 뒤 아래 중 하나를 "별도로" 실행하세요.
+--      CALL public.backfill_post_content_all();
+--      python crawler/migrate_split_content.py   (REST RPC로 배치 반복, 진행 상황 출력)
+CREATE OR REPLACE PROCEDURE public.backfill_post_content_all(p_batch integer DEFAULT 1000)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated integer;
+BEGIN
+    LOOP
+        updated := public.backfill_post_content(p_batch);
+        COMMIT;
+        EXIT WHEN updated = 0;
+    END LOOP;
+END;
+$$;
+
+-- 4. 주간 리포트 로더의 계산 컬럼(migrate_v6)이 원문만 읽도록 변경
+CREATE OR REPLACE FUNCTION public.content_head(public.posts)
+RETURNS text
+LANGUAGE sql STABLE
+AS $$
+    SELECT left(coalesce($1.content_original, $1.content), 800);
+$$;
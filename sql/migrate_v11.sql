@@ -0,0 +1,30 @@
+-- =====================================================
+-- 저장된 Reddit 포스트의 참여 지표(업보트/댓글 수/업보트 비율) 일괄 갱신 RPC
+-- reddit_engagement.py가 Reddit /api/info로 다시 받은 값 중 바뀐 필드만 보내면,
+-- 한 번의 UPDATE ... FROM 으로 모두 반영합니다 (행마다 PATCH 요청을 보내지 않음).
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+-- p_rows: [{"post_id": "abc", "upvotes": 120, "comment_count": 30}, ...]
+-- 행에 없는 필드(NULL)는 기존 값을 유지합니다. 갱신된 행 수를 반환합니다.
+CREATE OR REPLACE FUNCTION public.update_post_engagement(p_rows jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated integer;
+BEGIN
+    UPDATE public.posts p
+    SET upvotes = coalesce(r.upvotes, p.upvotes),
+        comment_count = coalesce(r.comment_count, p.comment_count),
+        upvote_ratio = coalesce(r.upvote_ratio, p.upvote_ratio)
+    FROM jsonb_to_recordset(p_rows) AS r(post_id text, upvotes integer, comment_count integer, upvote_ratio double precision)
+    WHERE p.post_id = r.post_id;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.update_post_engagement(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.update_post_engagement(jsonb) TO service_role;
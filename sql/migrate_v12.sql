@@ -0,0 +1,48 @@
+-- =====================================================
+-- comments 테이블 수집 (schema.sql에 정의만 되어 있던 테이블)
+--   reddit_comments.py가 포스트별 1단계 댓글 전체를 일괄 upsert하고,
+--   posts.comments_synced_* 워터마크로 다음 실행에서는 댓글이 바뀐 포스트만 다시 받습니다.
+--   주간 리포트는 posts?select=...,comments(...)&comments.order=ups.desc&comments.limit=3
+--   임베딩으로 포스트별 상위 댓글을 인덱스 조회합니다 (top_comments jsonb 파싱 대신).
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+-- 1. 댓글 지표 컬럼
+ALTER TABLE public.comments ADD COLUMN IF NOT EXISTS ups integer DEFAULT 0;
+ALTER TABLE public.comments ADD COLUMN IF NOT EXISTS edited_at timestamptz;
+ALTER TABLE public.comments ADD COLUMN IF NOT EXISTS crawled_at timestamptz DEFAULT now();
+
+-- 포스트별 상위 k개 댓글 (임베딩 시 LATERAL ... ORDER BY ups DESC LIMIT k가 인덱스만 읽음)
+CREATE INDEX IF NOT EXISTS comments_post_id_ups_idx
+    ON public.comments (post_id, ups DESC);
+
+-- 2. 포스트별 동기화 워터마크 (마지막 동기화 시점의 댓글 수 / 시각)
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS comments_synced_count integer;
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS comments_synced_at timestamptz;
+
+-- 3. 워터마크 일괄 갱신 RPC (크롤러 전용)
+--    p_rows: [{"post_id": "abc", "comments_synced_count": 42}, ...]
+--    댓글 목록과 함께 받은 최신 댓글 수로 posts.comment_count도 맞춰, 다음 실행의 비교 기준을 일치시킵니다.
+CREATE OR REPLACE FUNCTION public.mark_comments_synced(p_rows jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated integer;
+BEGIN
+    UPDATE public.posts p
+    SET comment_count = r.comments_synced_count,
+        comments_synced_count = r.comments_synced_count,
+        comments_synced_at = now()
+    FROM jsonb_to_recordset(p_rows) AS r(post_id text, comments_synced_count integer)
+    WHERE p.post_id = r.post_id;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.mark_comments_synced(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.mark_comments_synced(jsonb) TO service_role;
+
+ANALYZE public.comments;
@@ -0,0 +1,68 @@
+-- =====================================================
+-- 수집 작업 실행 임대(lease) 테이블
+--   crawler.yml(매시간)과 crawlers.yml(2시간마다), 오케스트레이터가 같은 작업을 동시에 돌리면
+--   같은 포스트를 두 번 번역하고 gpt-4o에 두 번 보내게 됩니다.
+--   각 작업은 시작 전에 임대를 얻고(acquire), 실행 중에는 주기적으로 연장(renew)하며, 끝나면 반납(release)합니다.
+--   프로세스가 죽어 연장이 끊기면 expires_at이 지나 다른 실행이 가져갈 수 있습니다.
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS public.job_leases (
+    job text PRIMARY KEY,
+    holder text NOT NULL,
+    acquired_at timestamptz NOT NULL DEFAULT now(),
+    heartbeat_at timestamptz NOT NULL DEFAULT now(),
+    expires_at timestamptz NOT NULL
+);
+
+-- 정책 없이 RLS만 켜 두어 anon/authenticated는 읽거나 쓸 수 없습니다 (크롤러는 service role).
+ALTER TABLE public.job_leases ENABLE ROW LEVEL SECURITY;
+
+-- 비어 있거나 만료됐거나 이미 내 것이면 가져옵니다. 가져왔으면 true
+CREATE OR REPLACE FUNCTION public.acquire_job_lease(p_job text, p_holder text, p_ttl_seconds integer)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    INSERT INTO public.job_leases AS l (job, holder, acquired_at, heartbeat_at, expires_at)
+    VALUES (p_job, p_holder, now(), now(), now() + make_interval(secs => p_ttl_seconds))
+    ON CONFLICT (job) DO UPDATE
+        SET holder = EXCLUDED.holder,
+            acquired_at = CASE WHEN l.holder = EXCLUDED.holder THEN l.acquired_at ELSE now() END,
+            heartbeat_at = now(),
+            expires_at = EXCLUDED.expires_at
+        WHERE l.expires_at < now() OR l.holder = EXCLUDED.holder;
+    RETURN FOUND;
+END;
+$$;
+
+-- 내가 가진 임대의 만료 시각을 늘립니다. 이미 빼앗겼으면 false
+CREATE OR REPLACE FUNCTION public.renew_job_lease(p_job text, p_holder text, p_ttl_seconds integer)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    UPDATE public.job_leases
+    SET heartbeat_at = now(),
+        expires_at = now() + make_interval(secs => p_ttl_seconds)
+    WHERE job = p_job AND holder = p_holder;
+    RETURN FOUND;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.release_job_lease(p_job text, p_holder text)
+RETURNS boolean
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    DELETE FROM public.job_leases WHERE job = p_job AND holder = p_holder;
+    RETURN FOUND;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.acquire_job_lease(text, text, integer) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.renew_job_lease(text, text, integer) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.release_job_lease(text, text) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.acquire_job_lease(text, text, integer) TO service_role;
+GRANT EXECUTE ON FUNCTION public.renew_job_lease(text, text, integer) TO service_role;
+GRANT EXECUTE ON FUNCTION public.release_job_lease(text, text) TO service_role;
@@ -0,0 +1,104 @@
+-- =====================================================
+-- posts 전문 검색 (제목 + 원문 + AI 인사이트 + 한국어 번역)
+--   search_tsv : 저장형 생성 컬럼 (행을 쓸 때마다 Postgres가 다시 계산하므로 크롤러 수정 불필요)
+--   GIN 인덱스로 전체 기록에서 일치하는 행만 찾고, search_posts RPC가 순위를 매겨 상위 N개를 반환합니다.
+--
+--   영어: 'english' 설정으로 어간 추출 ("monetized" → "monet", "drops" → "drop")
+--   한국어: 같은 설정에서 어간 추출 없이 어절 그대로 저장되므로, 검색어의 한글 단어는 접두사 검색으로 바꿔
+--           "수익화"가 "수익화가", "수익화를" 같은 조사 붙은 어절과도 일치합니다.
+--
+-- Supabase SQL Editor에서 실행하세요
+-- (생성 컬럼 추가는 posts 테이블을 다시 쓰므로 행 수에 비례해 시간이 걸리고 그동안 쓰기가 막힙니다.
+--  크롤러가 돌지 않는 시간에 실행하세요)
+-- 효과 측정: python crawler/bench_search.py
+-- =====================================================
+
+-- 1. 검색 문서: 제목(A) > AI 인사이트(B) > 원문(C) > 한국어 번역(D) 가중치
+--    content_original이 비어 있는 구버전 행은 content를 대신 사용 (migrate_v10.sql)
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS search_tsv tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(ai_insight, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(content_original, content, '')), 'C') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(content_ko, '')), 'D')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS posts_search_tsv_idx
+    ON public.posts USING gin (search_tsv);
+
+-- 2. 검색어 → tsquery
+--    단어를 모두 AND로 묶고, 한글이 들어간 단어에는 접두사(:*) 검색을 붙입니다.
+--    영어 불용어("the", "how" 등)는 to_tsquery가 제외합니다.
+CREATE OR REPLACE FUNCTION public.post_search_query(p_query text)
+RETURNS tsquery
+LANGUAGE sql STABLE
+AS $$
+    SELECT coalesce(
+        to_tsquery('english'::regconfig, string_agg(
+            quote_literal(word) || CASE WHEN word ~ '[가-힣]' THEN ':*' ELSE '' END,
+            ' & '
+        )),
+        ''::tsquery
+    )
+    FROM regexp_split_to_table(lower(coalesce(p_query, '')), '[^[:alnum:]]+') AS word
+    WHERE word <> '';
+$$;
+
+-- 3. 검색 RPC: 순위(ts_rank_cd) → 업보트 → 최신순 상위 p_limit개 (최대 100)
+--    검색어를 변수로 한 번만 만들어 GIN 인덱스 조건과 순위 계산에 같이 씁니다.
+--    ts_headline(일치 부분 발췌)은 비용이 커서 LIMIT로 추린 행에만 계산합니다.
+--    SECURITY INVOKER(기본값)이므로 posts의 RLS 정책이 그대로 적용됩니다.
+CREATE OR REPLACE FUNCTION public.search_posts(
+    p_query text,
+    p_limit integer DEFAULT 20,
+    p_subreddit text DEFAULT NULL
+)
+RETURNS TABLE (
+    id uuid,
+    post_id text,
+    title text,
+    subreddit text,
+    url text,
+    author text,
+    created_at timestamptz,
+    upvotes integer,
+    comment_count integer,
+    ai_insight text,
+    preview text,
+    rank real,
+    headline text
+)
+LANGUAGE plpgsql STABLE
+AS $$
+#variable_conflict use_column
+DECLARE
+    q tsquery := public.post_search_query(p_query);
+BEGIN
+    IF q = ''::tsquery THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    WITH hits AS (
+        SELECT p.id AS hit_id, ts_rank_cd(p.search_tsv, q) AS score
+        FROM public.posts p
+        WHERE p.search_tsv @@ q
+          AND (p_subreddit IS NULL OR p.subreddit = p_subreddit)
+        ORDER BY score DESC, p.upvotes DESC NULLS LAST, p.created_at DESC
+        LIMIT least(greatest(coalesce(p_limit, 20), 1), 100)
+    )
+    SELECT
+        p.id, p.post_id, p.title, p.subreddit, p.url, p.author, p.created_at,
+        p.upvotes, p.comment_count, p.ai_insight, p.preview, hits.score,
+        ts_headline('english'::regconfig,
+                    coalesce(p.ai_insight, p.content_original, p.content, ''),
+                    q,
+                    'MaxWords=30, MinWords=10, MaxFragments=2, StartSel=<<, StopSel=>>')
+    FROM hits
+    JOIN public.posts p ON p.id = hits.hit_id
+    ORDER BY hits.score DESC, p.upvotes DESC NULLS LAST, p.created_at DESC;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.post_search_query(text) TO anon, authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.search_posts(text, integer, text) TO anon, authenticated, service_role;
@@ -0,0 +1,69 @@
+-- =====================================================
+-- 본문 번역 지연 (on-demand translation)
+--   크롤러는 제목만 번역하고 content_ko는 비워 둔 채 저장합니다.
+--   본문은 translate_bodies.py가 나중에 번역해 content_ko와 preview를 채웁니다.
+--     1) 독자가 카드에서 본문을 열었는데 번역이 없으면 request_post_translation으로 요청 시각을 기록 → 가장 먼저 처리
+--     2) 나머지는 업보트/댓글 수가 많은 순서로 실행당 정해진 개수만 처리
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+-- 1. 독자 요청 시각 (번역이 저장되면 NULL로 되돌림)
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS translation_requested_at timestamptz;
+
+-- 2. 번역 대기열 조회용 부분 인덱스 (번역이 없는 행만 들어가므로 작게 유지됨)
+--    요청된 글: WHERE content_ko IS NULL AND translation_requested_at IS NOT NULL ORDER BY translation_requested_at
+--    참여도 순: WHERE content_ko IS NULL ORDER BY upvotes DESC, comment_count DESC
+CREATE INDEX IF NOT EXISTS posts_translation_requested_idx
+    ON public.posts (translation_requested_at)
+    WHERE content_ko IS NULL AND translation_requested_at IS NOT NULL;
+CREATE INDEX IF NOT EXISTS posts_untranslated_engagement_idx
+    ON public.posts (upvotes DESC, comment_count DESC)
+    WHERE content_ko IS NULL;
+
+-- 3. 프론트엔드(anon)가 부르는 번역 요청 RPC
+--    posts 쓰기 권한이 없는 역할도 이 컬럼 하나만 바꿀 수 있도록 SECURITY DEFINER로 실행합니다.
+--    이미 번역됐거나 이미 요청된 글은 바꾸지 않습니다. 새로 요청했으면 true
+CREATE OR REPLACE FUNCTION public.request_post_translation(p_id uuid)
+RETURNS boolean
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE public.posts
+    SET translation_requested_at = now()
+    WHERE id = p_id
+      AND content_ko IS NULL
+      AND translation_requested_at IS NULL;
+    RETURN FOUND;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.request_post_translation(uuid) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION public.request_post_translation(uuid) TO anon, authenticated, service_role;
+
+-- 4. translate_bodies.py가 번역 결과를 한 번에 저장하는 RPC
+-- p_rows: [{"post_id": "abc", "content_ko": "...", "preview": "..."}, ...]
+-- 갱신된 행 수를 반환합니다.
+CREATE OR REPLACE FUNCTION public.store_post_translations(p_rows jsonb)
+RETURNS integer
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    updated integer;
+BEGIN
+    UPDATE public.posts p
+    SET content_ko = r.content_ko,
+        preview = coalesce(r.preview, p.preview),
+        translation_requested_at = NULL
+    FROM jsonb_to_recordset(p_rows) AS r(post_id text, content_ko text, preview text)
+    WHERE p.post_id = r.post_id
+      AND r.content_ko IS NOT NULL;
+
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.store_post_translations(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.store_post_translations(jsonb) TO service_role;
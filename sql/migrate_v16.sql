@@ -0,0 +1,32 @@
+-- =====================================================
+-- weekly_reports.updated_at
+--   주간 리포트는 week_label로 upsert되므로 --daily/--incremental 실행이 같은 주의 행을 여러 번 고쳐 씁니다.
+--   created_at은 upsert로 바뀌지 않아 parquet_export.py의 워터마크로 쓸 수 없으므로,
+--   행이 바뀔 때마다 갱신되는 updated_at을 추가하고 내보내기 워터마크로 사용합니다.
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+ALTER TABLE public.weekly_reports ADD COLUMN IF NOT EXISTS updated_at timestamptz;
+UPDATE public.weekly_reports SET updated_at = coalesce(created_at, now()) WHERE updated_at IS NULL;
+ALTER TABLE public.weekly_reports ALTER COLUMN updated_at SET DEFAULT now();
+ALTER TABLE public.weekly_reports ALTER COLUMN updated_at SET NOT NULL;
+
+-- upsert(ON CONFLICT DO UPDATE)를 포함한 모든 UPDATE에서 갱신
+CREATE OR REPLACE FUNCTION public.touch_updated_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.updated_at := now();
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS weekly_reports_touch_updated_at ON public.weekly_reports;
+CREATE TRIGGER weekly_reports_touch_updated_at
+    BEFORE UPDATE ON public.weekly_reports
+    FOR EACH ROW EXECUTE FUNCTION public.touch_updated_at();
+
+-- 내보내기 키셋 조회: WHERE (updated_at, id) > (?, ?) ORDER BY updated_at, id
+CREATE INDEX IF NOT EXISTS weekly_reports_updated_at_id_idx
+    ON public.weekly_reports (updated_at, id);
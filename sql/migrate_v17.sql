@@ -0,0 +1,24 @@
+-- =====================================================
+-- posts.updated_at
+--   참여도 갱신(update_post_engagement, migrate_v11.sql), 댓글 동기화(mark_comments_synced, migrate_v12.sql),
+--   번역 저장(store_post_translations, migrate_v15.sql)은 crawled_at을 건드리지 않으므로
+--   crawled_at 워터마크로는 parquet_export.py가 이미 내보낸 포스트의 변경을 놓칩니다.
+--   weekly_reports(migrate_v16.sql)와 같이 행이 바뀔 때마다 갱신되는 updated_at을 추가하고 내보내기 워터마크로 사용합니다.
+--   public.touch_updated_at()은 migrate_v16.sql에서 만든 함수를 그대로 씁니다.
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+ALTER TABLE public.posts ADD COLUMN IF NOT EXISTS updated_at timestamptz;
+UPDATE public.posts SET updated_at = coalesce(crawled_at, created_at, now()) WHERE updated_at IS NULL;
+ALTER TABLE public.posts ALTER COLUMN updated_at SET DEFAULT now();
+ALTER TABLE public.posts ALTER COLUMN updated_at SET NOT NULL;
+
+-- upsert(ON CONFLICT DO UPDATE)와 RPC 일괄 UPDATE를 포함한 모든 UPDATE에서 갱신
+DROP TRIGGER IF EXISTS posts_touch_updated_at ON public.posts;
+CREATE TRIGGER posts_touch_updated_at
+    BEFORE UPDATE ON public.posts
+    FOR EACH ROW EXECUTE FUNCTION public.touch_updated_at();
+
+-- 내보내기 키셋 조회: WHERE (updated_at, id) > (?, ?) ORDER BY updated_at, id
+CREATE INDEX IF NOT EXISTS posts_updated_at_id_idx
+    ON public.posts (updated_at, id);
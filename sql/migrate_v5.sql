@@ -0,0 +1,18 @@
+-- =====================================================
+-- 증분 주간 리포트용 일자별 부분 요약 캐시 테이블
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+CREATE TABLE IF NOT EXISTS public.weekly_report_partials (
+    id bigserial PRIMARY KEY,
+    day date NOT NULL,                     -- 포스트 작성일 (UTC)
+    prompt_version text NOT NULL,          -- PARTIAL_PROMPT_VERSION (프롬프트 변경 시 캐시 무효화)
+    source_hash text NOT NULL,             -- 해당 일자 post_id 목록 해시 (포스트 추가 시 재계산)
+    post_count integer DEFAULT 0,          -- 요약에 사용된 포스트 수
+    items jsonb DEFAULT '[]'::jsonb,       -- 주간 리포트 후보 목록
+    created_at timestamptz DEFAULT now(),
+    UNIQUE(day, prompt_version)
+);
+
+-- RLS 활성화 (크롤러 전용, Service Role Key는 RLS를 우회)
+ALTER TABLE public.weekly_report_partials ENABLE ROW LEVEL SECURITY;
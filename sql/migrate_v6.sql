@@ -0,0 +1,12 @@
+-- =====================================================
+-- 주간 리포트 로더용 posts.content 미리보기 계산 컬럼
+-- PostgREST에서 select=content_head 로 본문 앞 800자만 전송합니다
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+CREATE OR REPLACE FUNCTION public.content_head(public.posts)
+RETURNS text
+LANGUAGE sql STABLE
+AS $$
+    SELECT left($1.content, 800);
+$$;
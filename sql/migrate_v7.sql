@@ -0,0 +1,56 @@
+-- =====================================================
+-- YouTube 조회수 스냅샷 (append-only) + 급상승 집계 테이블
+-- youtube_trends는 video_id 기준 upsert라 이전 수치가 덮어써지므로,
+-- 크롤링마다 수치를 별도 테이블에 쌓아 성장 속도를 계산합니다.
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+-- 1. 크롤링 시점별 수치 스냅샷 (INSERT만 수행)
+CREATE TABLE IF NOT EXISTS public.youtube_video_snapshots (
+    id bigserial PRIMARY KEY,
+    video_id text NOT NULL,
+    category text,
+    region text,
+    view_count bigint DEFAULT 0,
+    like_count bigint DEFAULT 0,
+    comment_count bigint DEFAULT 0,
+    captured_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS youtube_video_snapshots_captured_at_idx
+    ON public.youtube_video_snapshots (captured_at);
+
+-- 2. 영상별 급상승 순위 (youtube_velocity.py가 매 크롤링 후 갱신)
+CREATE TABLE IF NOT EXISTS public.youtube_rising (
+    video_id text PRIMARY KEY,
+    title text,
+    channel_title text,
+    category text,
+    region text,
+    view_count bigint DEFAULT 0,
+    views_per_hour real DEFAULT 0,     -- 직전 스냅샷 대비 시간당 조회수 증가
+    like_rate real DEFAULT 0,          -- 좋아요 / 조회수
+    acceleration real DEFAULT 0,       -- 시간당 조회수 증가량의 변화 (views/hour²)
+    computed_at timestamptz DEFAULT now()
+);
+
+-- 3. 카테고리 + 지역별 성장 속도 요약
+CREATE TABLE IF NOT EXISTS public.youtube_category_velocity (
+    category text NOT NULL,
+    region text NOT NULL,
+    video_count integer DEFAULT 0,
+    total_views_per_hour real DEFAULT 0,
+    median_views_per_hour real DEFAULT 0,
+    avg_like_rate real DEFAULT 0,
+    avg_acceleration real DEFAULT 0,
+    computed_at timestamptz DEFAULT now(),
+    PRIMARY KEY (category, region)
+);
+
+-- 4. RLS 정책 (집계 테이블은 읽기 공개, 스냅샷은 크롤러 전용)
+ALTER TABLE public.youtube_video_snapshots ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.youtube_rising ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.youtube_category_velocity ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "youtube_rising_public_read" ON public.youtube_rising FOR SELECT USING (true);
+CREATE POLICY "youtube_category_velocity_public_read" ON public.youtube_category_velocity FOR SELECT USING (true);
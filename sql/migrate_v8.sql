@@ -0,0 +1,46 @@
+-- =====================================================
+-- 조회 경로별 인덱스
+-- 크롤러/분석 스크립트의 반복 조회가 기록이 쌓여도 최근 구간만 읽도록 합니다.
+-- Supabase SQL Editor에서 실행하세요
+-- (데이터가 많은 운영 DB에서는 각 문장을 CONCURRENTLY로 하나씩 실행하면 쓰기가 막히지 않습니다)
+-- 효과 측정: python crawler/bench_queries.py
+-- =====================================================
+
+-- 1. posts: 최근 수집 글 (trend_analyzer.fetch_recent_reddit_posts)
+--    WHERE crawled_at >= ? ORDER BY crawled_at DESC LIMIT 50
+CREATE INDEX IF NOT EXISTS posts_crawled_at_idx
+    ON public.posts (crawled_at DESC);
+
+-- 2. posts: 작성일 키셋 페이지네이션 (weekly_report_generator.iter_posts, regen_insights)
+--    WHERE created_at >= ? AND (created_at, id) > (?, ?) ORDER BY created_at, id
+--    ORDER BY created_at DESC LIMIT 10 은 같은 인덱스를 역방향으로 읽습니다.
+CREATE INDEX IF NOT EXISTS posts_created_at_id_idx
+    ON public.posts (created_at, id);
+
+-- 3. youtube_trends: 최근 N일 인기 영상 (trend_analyzer.fetch_recent_youtube_trends)
+--    WHERE trending_date >= ? ORDER BY view_count DESC LIMIT 50
+--    이 인덱스가 줄이는 것은 읽는 행 수입니다: 최근 N일 구간만 범위 스캔하고, 조회 컬럼을 INCLUDE해
+--    테이블 접근 없이(index-only scan) 읽습니다. 여러 날짜에 걸친 범위라 view_count 순서는 이어지지 않으므로
+--    상위 50개는 그 구간 행 전체에 대한 top-N 정렬로 고릅니다 (view_count DESC는 trending_date = ? 한 날짜 조회에만 정렬을 생략).
+--    (YouTube 제목/채널명은 최대 100자라 인덱스 행 크기 제한에 걸리지 않습니다)
+CREATE INDEX IF NOT EXISTS youtube_trends_trending_date_views_idx
+    ON public.youtube_trends (trending_date, view_count DESC)
+    INCLUDE (title, channel_title, category, region);
+
+-- 4. google_trends: 최근 N일 키워드 (trend_analyzer.fetch_recent_google_trends)
+--    WHERE trending_date >= ? ORDER BY crawled_at DESC LIMIT 50
+--    3번과 같이 최근 N일 구간의 index-only 범위 스캔 + top-N 정렬입니다 (정렬 생략은 한 날짜 조회에만 해당).
+CREATE INDEX IF NOT EXISTS google_trends_trending_date_crawled_at_idx
+    ON public.google_trends (trending_date, crawled_at DESC)
+    INCLUDE (keyword, region, traffic_volume);
+
+-- 5. youtube_rising: 급상승 순위 (trend_analyzer.fetch_rising_videos)
+--    ORDER BY views_per_hour DESC LIMIT 20, 정리 시 WHERE computed_at < ?
+CREATE INDEX IF NOT EXISTS youtube_rising_views_per_hour_idx
+    ON public.youtube_rising (views_per_hour DESC);
+
+-- 플래너 통계 갱신
+ANALYZE public.posts;
+ANALYZE public.youtube_trends;
+ANALYZE public.google_trends;
+ANALYZE public.youtube_rising;
@@ -0,0 +1,151 @@
+-- =====================================================
+-- 트렌드 대시보드/분석기용 서버 측 집계 (머티리얼라이즈드 뷰 + RPC)
+-- 원본 테이블 전체를 내려받아 클라이언트에서 집계하는 대신, 미리 계산된 몇 개 행만 읽습니다.
+-- 뷰 갱신: 각 크롤러가 끝날 때 refresh_trend_views() RPC 호출 (CONCURRENTLY, 읽기 차단 없음)
+-- Supabase SQL Editor에서 실행하세요
+-- =====================================================
+
+-- 1. 카테고리 + 지역별 최근 7일 인기 영상 TOP 20
+--    대시보드 YouTube 탭과 trend_analyzer가 사용 (컬럼은 youtube_trends와 동일 + rank)
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.youtube_category_top AS
+SELECT *
+FROM (
+    SELECT
+        id, video_id, title, channel_title, category, view_count, like_count, comment_count,
+        region, thumbnail_url, trending_date, crawled_at,
+        row_number() OVER (PARTITION BY category, region ORDER BY view_count DESC, video_id) AS rank
+    FROM public.youtube_trends
+    WHERE trending_date >= CURRENT_DATE - 7
+) ranked
+WHERE rank <= 20;
+
+-- REFRESH ... CONCURRENTLY에는 WHERE 없는 고유 인덱스가 필요합니다.
+CREATE UNIQUE INDEX IF NOT EXISTS youtube_category_top_key
+    ON public.youtube_category_top (category, region, rank);
+
+-- 2. 키워드 + 지역별 최신 방향과 최근 7일 방향 분포
+--    traffic_volume은 google_trends.py가 "📈 급상승 (현재:.., 평균:.., 최고:..)" 형식으로 저장합니다.
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.google_keyword_summary AS
+WITH recent AS (
+    SELECT *, split_part(traffic_volume, ' (', 1) AS direction
+    FROM public.google_trends
+    WHERE trending_date >= CURRENT_DATE - 7
+)
+SELECT
+    latest.id, latest.keyword, latest.region, latest.traffic_volume, latest.related_topics,
+    latest.direction, latest.trending_date, latest.crawled_at,
+    stats.days_seen, stats.days_rising, stats.days_falling
+FROM (
+    SELECT DISTINCT ON (keyword, region) *
+    FROM recent
+    ORDER BY keyword, region, trending_date DESC, crawled_at DESC
+) latest
+JOIN (
+    SELECT
+        keyword, region,
+        count(DISTINCT trending_date) AS days_seen,
+        count(*) FILTER (WHERE direction IN ('📈 급상승', '↗️ 상승')) AS days_rising,
+        count(*) FILTER (WHERE direction = '📉 하락') AS days_falling
+    FROM recent
+    GROUP BY keyword, region
+) stats USING (keyword, region);
+
+CREATE UNIQUE INDEX IF NOT EXISTS google_keyword_summary_key
+    ON public.google_keyword_summary (keyword, region);
+
+-- 3. 서브레딧별 일자별 활동량 (최근 30일)
+CREATE MATERIALIZED VIEW IF NOT EXISTS public.subreddit_activity AS
+SELECT
+    subreddit,
+    (created_at AT TIME ZONE 'UTC')::date AS day,
+    count(*) AS post_count,
+    sum(upvotes) AS total_upvotes,
+    sum(comment_count) AS total_comments,
+    round(avg(upvote_ratio)::numeric, 3) AS avg_upvote_ratio,
+    count(*) FILTER (WHERE ai_insight IS NOT NULL) AS insight_count
+FROM public.posts
+WHERE created_at >= CURRENT_DATE - 30
+GROUP BY subreddit, (created_at AT TIME ZONE 'UTC')::date;
+
+CREATE UNIQUE INDEX IF NOT EXISTS subreddit_activity_key
+    ON public.subreddit_activity (subreddit, day);
+
+-- 4. 읽기 RPC
+CREATE OR REPLACE FUNCTION public.top_videos_by_category(
+    p_region text DEFAULT NULL,
+    p_category text DEFAULT NULL,
+    p_limit integer DEFAULT 10
+)
+RETURNS SETOF public.youtube_category_top
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM public.youtube_category_top
+    WHERE (p_region IS NULL OR region = p_region)
+      AND (p_category IS NULL OR category = p_category)
+      AND rank <= p_limit
+    ORDER BY view_count DESC;
+$$;
+
+CREATE OR REPLACE FUNCTION public.keyword_direction_summary(p_region text DEFAULT NULL)
+RETURNS SETOF public.google_keyword_summary
+LANGUAGE sql STABLE
+AS $$
+    SELECT * FROM public.google_keyword_summary
+    WHERE p_region IS NULL OR region = p_region
+    ORDER BY days_rising DESC, crawled_at DESC;
+$$;
+
+CREATE OR REPLACE FUNCTION public.subreddit_activity_summary(p_days integer DEFAULT 7)
+RETURNS TABLE (
+    subreddit text,
+    post_count bigint,
+    total_upvotes bigint,
+    total_comments bigint,
+    avg_upvote_ratio numeric,
+    insight_count bigint
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        subreddit,
+        sum(post_count)::bigint,
+        sum(total_upvotes)::bigint,
+        sum(total_comments)::bigint,
+        round(sum(avg_upvote_ratio * post_count) / nullif(sum(post_count), 0), 3),
+        sum(insight_count)::bigint
+    FROM public.subreddit_activity
+    WHERE day >= CURRENT_DATE - p_days
+    GROUP BY subreddit
+    ORDER BY sum(post_count) DESC;
+$$;
+
+-- 5. 갱신 RPC (크롤러 전용: service role만 실행)
+--    p_views가 NULL이면 세 뷰를 모두 갱신합니다.
+CREATE OR REPLACE FUNCTION public.refresh_trend_views(p_views text[] DEFAULT NULL)
+RETURNS text[]
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    view_name text;
+    refreshed text[] := '{}';
+BEGIN
+    FOREACH view_name IN ARRAY coalesce(p_views, ARRAY['youtube_category_top', 'google_keyword_summary', 'subreddit_activity'])
+    LOOP
+        IF view_name NOT IN ('youtube_category_top', 'google_keyword_summary', 'subreddit_activity') THEN
+            RAISE EXCEPTION 'unknown view: %', view_name;
+        END IF;
+        EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY public.%I', view_name);
+        refreshed := refreshed || view_name;
+    END LOOP;
+    RETURN refreshed;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.refresh_trend_views(text[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.refresh_trend_views(text[]) TO service_role;
+
+-- 6. 권한 (머티리얼라이즈드 뷰에는 RLS가 없으므로 GRANT로 읽기 공개)
+GRANT SELECT ON public.youtube_category_top, public.google_keyword_summary, public.subreddit_activity
+    TO anon, authenticated;